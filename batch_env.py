@@ -0,0 +1,130 @@
+"""
+Environnement Puissance 4 par lots : N parties avancent ensemble, coup par coup.
+
+L'état de toutes les parties tient dans quelques tableaux (N, ...) : un bitboard
+par joueur (player_0, player_1), la hauteur des colonnes, le joueur au trait et
+l'issue. La gravité, la détection de victoire et les masques d'actions sont
+vectorisés ; il n'y a pas de boucle Python par partie.
+
+Les observations suivent le format PettingZoo : canal 0 = joueur au trait.
+Un agent qui définit choose_actions(observations, action_masks) reçoit tous
+ses coups d'un même pas en un seul appel ; sinon choose_action est appelé
+partie par partie.
+"""
+
+import numpy as np
+from bitboard import ROWS, COLS, H1, CELL_BITS
+
+# Issue d'une partie : en cours, nulle, ou gagnée par player_0 / player_1
+ONGOING, DRAW = -2, -1
+
+
+
+def has_four_array(bb):
+    """has_four sur un tableau de bitboards (décalage et masque, élément par élément)."""
+    result = np.zeros(bb.shape, dtype=bool)
+    for shift in (1, H1, H1 + 1, H1 - 1):
+        m = bb & (bb >> shift)
+        result |= (m & (m >> (2 * shift))) != 0
+    return result
+
+
+class BatchConnectFour:
+    """N parties de Puissance 4 jouées en parallèle."""
+
+    def __init__(self, num_games):
+        self.num_games = num_games
+        self.boards = np.zeros((num_games, 2), dtype=np.int64)
+        self.heights = np.zeros((num_games, COLS), dtype=np.int8)
+        self.turn = np.zeros(num_games, dtype=np.int8)
+        self.result = np.full(num_games, ONGOING, dtype=np.int8)
+        self.moves = np.zeros(num_games, dtype=np.int8)
+
+    def reset(self):
+        self.boards[:] = 0
+        self.heights[:] = 0
+        self.turn[:] = 0
+        self.result[:] = ONGOING
+        self.moves[:] = 0
+
+    @property
+    def active(self):
+        """Masque des parties en cours."""
+        return self.result == ONGOING
+
+    def action_masks(self, games=None):
+        """Masques (n, 7) des colonnes jouables ; tout à 0 pour une partie terminée."""
+        games = np.arange(self.num_games) if games is None else games
+        masks = (self.heights[games] < ROWS).astype(np.int8)
+        masks[~self.active[games]] = 0
+        return masks
+
+    def observations(self, games=None):
+        """Tenseurs (n, 6, 7, 2) du point de vue du joueur au trait de chaque partie."""
+        games = np.arange(self.num_games) if games is None else games
+        turn = self.turn[games].astype(np.int64)
+        current = self.boards[games, turn]
+        opponent = self.boards[games, 1 - turn]
+        observations = np.empty((len(games), ROWS, COLS, 2), dtype=np.int8)
+        observations[..., 0] = (current[:, None, None] & CELL_BITS) != 0
+        observations[..., 1] = (opponent[:, None, None] & CELL_BITS) != 0
+        return observations
+
+    def step(self, actions, games=None):
+        """
+        Joue actions[i] dans la partie games[i] (toutes les parties par défaut).
+        Les parties terminées ou hors de games ne bougent pas.
+        """
+        games = np.arange(self.num_games) if games is None else np.asarray(games)
+        actions = np.asarray(actions, dtype=np.int64)
+        playing = self.active[games]
+        games, actions = games[playing], actions[playing]
+        if np.any((actions < 0) | (actions >= COLS)) or np.any(self.heights[games, actions] >= ROWS):
+            raise ValueError("Coup illégal dans une partie en cours")
+
+        turn = self.turn[games].astype(np.int64)
+        bits = np.left_shift(1, actions * H1 + self.heights[games, actions])
+        self.boards[games, turn] |= bits
+        self.heights[games, actions] += 1
+        self.moves[games] += 1
+
+        won = has_four_array(self.boards[games, turn])
+        full = self.moves[games] == ROWS * COLS
+        self.result[games[won]] = turn[won]
+        self.result[games[~won & full]] = DRAW
+        self.turn[games] = 1 - turn
+
+
+def play_games(agent_a, agent_b, num_games):
+    """
+    Fait jouer num_games parties entre deux agents, toutes en même temps.
+    Les couleurs alternent : agent_a commence les parties paires.
+    Retourne {nom de agent_a: victoires, nom de agent_b: victoires, "Draw": nuls}.
+    """
+    env = BatchConnectFour(num_games)
+    agents = (agent_a, agent_b)
+    # first[g] : indice dans agents de player_0 pour la partie g
+    first = np.arange(num_games) % 2
+
+    while env.active.any():
+        for k, agent in enumerate(agents):
+            # Parties où c'est à cet agent de jouer
+            games = np.flatnonzero(env.active & ((first ^ env.turn) == k))
+            if len(games) == 0:
+                continue
+            observations = env.observations(games)
+            masks = env.action_masks(games)
+            if hasattr(agent, "choose_actions"):
+                actions = agent.choose_actions(observations, masks)
+            else:
+                actions = [agent.choose_action({"observation": obs, "action_mask": mask}, action_mask=mask)
+                           for obs, mask in zip(observations, masks)]
+            env.step(actions, games)
+
+    winners = env.result[env.result >= 0]
+    first_wins = first[env.result >= 0] ^ winners
+    return {
+        agent_a.player_name: int(np.sum(first_wins == 0)),
+        agent_b.player_name: int(np.sum(first_wins == 1)),
+        "Draw": int(np.sum(env.result == DRAW)),
+    }
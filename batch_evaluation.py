@@ -0,0 +1,98 @@
+"""
+Évaluation d'un lot de positions en un seul appel.
+
+Les positions sont données soit en tenseurs (N, 6, 7, 2) comme l'observation
+PettingZoo, soit en N paires de bitboards (N, 2). Une heuristique est décrite
+par deux tables, comme pour l'évaluation incrémentale (voir bitboard.py) :
+    window_scores[n0][n1] : score d'une fenêtre avec n0 pions du canal 0 et n1 du canal 1
+    cell_scores[channel][index] : score d'un pion de channel sur le bit index
+
+evaluate_batch est la version NumPy vectorisée, evaluate_batch_parallel la
+version Numba répartie sur les coeurs (prange). Les deux donnent exactement
+les scores des évaluateurs d'origine :
+    fast_evaluate(board, player)  ->  evaluate_batch(boards, *fast_evaluate_tables(), player=player)
+    Agent._evaluate(pos)          ->  evaluate_batch(boards, *minimax_tables())
+"""
+
+import numpy as np
+from numba import njit, prange
+from bitboard import COLS, H1, WINDOWS, CELL_BITS
+# Primitives compilées, fenêtres et tables de fast_evaluate partagées avec le moteur compilé
+from numba_agent import bb_popcount, WINDOW_MASKS, WINDOW_SCORES, CELL_SCORES
+
+# Les 4 bits de chaque fenêtre, pour compter les pions sans bitboard
+WINDOW_BITS = np.array([[index for index in range(COLS * H1) if window >> index & 1] for window in WINDOWS],
+                       dtype=np.int64)
+# Positions traitées à la fois par la version NumPy (borne la mémoire des tableaux intermédiaires)
+CHUNK_SIZE = 1 << 15
+
+
+def fast_evaluate_tables():
+    """Tables de fast_evaluate (numba_agent) : fenêtres et colonne centrale."""
+    return WINDOW_SCORES, CELL_SCORES
+
+
+def minimax_tables(agent=None):
+    """Tables de Agent._evaluate (minimax_agent) : fenêtres et heatmap."""
+    if agent is None:
+        from minimax_agent import Agent
+        agent = Agent(env=None)
+    return np.array(agent._window_scores, dtype=np.int64), np.array(agent._cell_scores, dtype=np.int64)
+
+
+def to_bitboards(boards):
+    """Tenseurs (N, 6, 7, 2) vers bitboards (N, 2)."""
+    occupied = (np.asarray(boards) != 0).astype(np.int64)
+    return (occupied * CELL_BITS[:, :, None]).sum(axis=(1, 2))
+
+
+def _as_bitboards(positions, player):
+    """Bitboards (N, 2) des positions, canal player en premier."""
+    positions = np.asarray(positions)
+    bitboards = to_bitboards(positions) if positions.ndim == 4 else positions.astype(np.int64)
+    if player == 1:
+        bitboards = bitboards[:, ::-1]
+    return np.ascontiguousarray(bitboards)
+
+
+def evaluate_batch(positions, window_scores, cell_scores, player=0):
+    """Scores des N positions pour le canal player (NumPy vectorisé)."""
+    bitboards = _as_bitboards(positions, player)
+    window_scores = np.asarray(window_scores, dtype=np.int64)
+    cell_scores = np.asarray(cell_scores, dtype=np.int64)
+    shifts = np.arange(COLS * H1)
+
+    scores = np.empty(len(bitboards), dtype=np.int64)
+    for start in range(0, len(bitboards), CHUNK_SIZE):
+        chunk = bitboards[start:start + CHUNK_SIZE]
+        # cells[i, channel, index] : 1 si le bit index du canal est occupé
+        cells = ((chunk[:, :, None] >> shifts) & 1).astype(np.int8)
+        counts = cells[:, :, WINDOW_BITS].sum(axis=-1)
+        scores[start:start + CHUNK_SIZE] = (window_scores[counts[:, 0], counts[:, 1]].sum(axis=1)
+                                            + (cells * cell_scores).sum(axis=(1, 2)))
+    return scores
+
+
+@njit(parallel=True, cache=True)
+def _evaluate_bitboards(bitboards, window_scores, cell_scores):
+    n = bitboards.shape[0]
+    scores = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        us = bitboards[i, 0]
+        them = bitboards[i, 1]
+        score = 0
+        for w in range(WINDOW_MASKS.shape[0]):
+            score += window_scores[bb_popcount(us & WINDOW_MASKS[w]), bb_popcount(them & WINDOW_MASKS[w])]
+        for index in range(COLS * H1):
+            if us >> index & 1:
+                score += cell_scores[0, index]
+            elif them >> index & 1:
+                score += cell_scores[1, index]
+        scores[i] = score
+    return scores
+
+
+def evaluate_batch_parallel(positions, window_scores, cell_scores, player=0):
+    """Scores des N positions pour le canal player (Numba, positions réparties entre les coeurs)."""
+    return _evaluate_bitboards(_as_bitboards(positions, player), np.asarray(window_scores, dtype=np.int64),
+                               np.asarray(cell_scores, dtype=np.int64))
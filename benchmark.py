@@ -0,0 +1,314 @@
+"""
+Banc d'essai des moteurs sur des jeux de positions fixes.
+
+Chaque position est une suite de coups (colonnes 0 à 6) depuis la grille vide ;
+le moteur joue pour le joueur au trait après ces coups. Les positions tactiques
+et de fin de partie ont une solution vérifiée : les coups qui atteignent la
+valeur exacte de la position (victoire, ou nul pour "draw").
+
+Mesures, par moteur et par position :
+    minimax, numba : temps (cumulé), noeuds et noeuds/s de chaque profondeur ;
+                     profondeur et temps à partir desquels le meilleur coup
+                     est toujours dans la solution ; pour les fins de partie,
+                     temps et noeuds du solveur exact
+    mcts           : simulations/s, taille de l'arbre, temps à partir duquel
+                     le coup le plus visité (le coup joué) est toujours dans
+                     la solution
+
+Les résultats sont écrits en JSON (clés triées, une entrée par position) pour
+être comparés d'une exécution à l'autre :
+    python benchmark.py --output bench.json
+    python benchmark.py --output new.json --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import time
+import numpy as np
+import numba
+from bitboard import Position, CENTER_ORDER
+import minimax_agent
+import numba_agent
+from mcts_agent import MCTSAgent, best_root_move, ROOT
+
+POSITION_SETS = {
+    "openings": [
+        {"name": "empty", "moves": ""},
+        {"name": "center", "moves": "3"},
+        {"name": "center_center", "moves": "33"},
+        {"name": "center_side", "moves": "32"},
+    ],
+    "midgames": [
+        {"name": "mid_10a", "moves": "2421340362"},
+        {"name": "mid_10b", "moves": "0333025233"},
+        {"name": "mid_12", "moves": "322333232432"},
+    ],
+    # Gain forcé par un seul coup, trouvé à la profondeur indiquée dans le nom
+    "tactical": [
+        {"name": "win_d3", "moves": "563165653642126331", "solution": [2], "value": "win"},
+        {"name": "win_d5a", "moves": "245066135451656506", "solution": [4], "value": "win"},
+        {"name": "win_d5b", "moves": "565125216052211214", "solution": [4], "value": "win"},
+        {"name": "win_d9", "moves": "626615635161461105", "solution": [3], "value": "win"},
+    ],
+    # 14 cases vides
+    "endgames": [
+        {"name": "win_a", "moves": "0543020530145150355242141122", "solution": [4], "value": "win"},
+        {"name": "win_b", "moves": "0354455352132526333251101110", "solution": [2], "value": "win"},
+        {"name": "win_c", "moves": "4650110406004426611411206463", "solution": [2], "value": "win"},
+        {"name": "draw", "moves": "5246145330345465314420622316", "solution": [3], "value": "draw"},
+    ],
+}
+
+ENGINES = ("minimax", "numba", "mcts")
+# Relevés du coup le plus visité pendant la recherche MCTS, à des temps doublant jusqu'à la limite
+MCTS_CHECKPOINTS = 11
+
+
+def solved_since(moves, solution):
+    """Indice à partir duquel tous les coups de la liste sont dans la solution (None sinon)."""
+    index = None
+    for i, move in enumerate(moves):
+        if move not in solution:
+            index = None
+        elif index is None:
+            index = i
+    return index
+
+
+def _rounded(value):
+    return float(f"{value:.4g}")
+
+
+def _depth_summary(record, iterations, solution):
+    """Complète record avec les itérations de l'approfondissement et le moment où le coup est résolu."""
+    record["iterations"] = iterations
+    record["depth"] = iterations[-1]["depth"] if iterations else 0
+    nodes = sum(it["nodes"] for it in iterations)
+    elapsed = iterations[-1]["time"] if iterations else 0.0
+    record["nodes"] = nodes
+    record["nps"] = _rounded(nodes / elapsed) if elapsed > 0 else 0.0
+    if solution is not None:
+        index = solved_since([it["move"] for it in iterations], solution)
+        record["solved_depth"] = None if index is None else iterations[index]["depth"]
+        record["solved_time"] = None if index is None else iterations[index]["time"]
+
+
+def bench_minimax(agent, pos, spec, max_depth, time_limit, exact=False):
+    """
+    Approfondissement itératif de minimax_agent, puis (exact) son solveur de fin de partie.
+    Les noeuds sont ceux décomptés par le SearchPoller de l'agent (appels de _minimax, de _solve).
+    """
+    solution = spec.get("solution")
+    candidates = [col for col in CENTER_ORDER if pos.can_play(col)]
+    agent.time_limit = time_limit
+    agent._evaluator = minimax_agent.IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+
+    iterations = []
+    start_time = time.monotonic()
+    agent._poller.start(start_time + time_limit)
+    try:
+        for depth in range(1, max_depth + 1):
+            before = agent._poller.counted()
+            # Sur une copie : une interruption laisse des coups joués
+            score, move = agent._search_depth(pos.copy(), candidates, depth)
+            iterations.append({"depth": depth, "time": _rounded(time.monotonic() - start_time),
+                               "nodes": agent._poller.counted() - before,
+                               "move": move, "score": score})
+            if score > 900000:
+                break
+    except TimeoutError:
+        pass
+    record = {}
+    _depth_summary(record, iterations, solution)
+
+    if exact:
+        agent._solver_table.clear()
+        start_time = time.monotonic()
+        try:
+            value, move = agent._solve_root(pos.copy(), candidates, start_time + time_limit)
+            record["solve"] = {"time": _rounded(time.monotonic() - start_time), "nodes": agent._poller.counted(),
+                               "value": value, "move": move, "correct": move in solution}
+        except TimeoutError:
+            record["solve"] = None
+    return record
+
+
+def bench_numba(agent, pos, spec, max_depth, time_limit, exact=False):
+    """Approfondissement itératif du noyau compilé, puis (exact) son solveur de fin de partie."""
+    solution = spec.get("solution")
+    current, opponent = pos.boards
+    heights = np.array(pos.heights, dtype=np.int8)
+    counts = numba_agent.line_counts(current, opponent)
+    key = numba_agent.zobrist_key(pos)
+    candidates = [col for col in CENTER_ORDER if pos.can_play(col)]
+    # Tables neuves à chaque position : les mesures ne dépendent pas de l'ordre des positions
+    agent.tt = numba_agent.new_transposition_table()
+    agent.ordering = numba_agent.new_move_ordering()
+    agent.search_age = 1
+    counters = agent.counters
+
+    iterations = []
+    guess = None
+    start_time = time.monotonic()
+    # Arrêt par le minuteur à time_limit, comme dans choose_action
+    stop_timer = numba_agent.arm_stop(start_time + time_limit, counters)
+    for depth in range(1, max_depth + 1):
+        score, move, nodes = agent._search_iteration((current, opponent, heights, counts, key), depth,
+                                                     np.array(candidates, dtype=np.int64), guess,
+                                                     numba_agent.NO_NODE_BUDGET)
+        if counters[numba_agent.ABORTED]:
+            break
+        iterations.append({"depth": depth, "time": _rounded(time.monotonic() - start_time), "nodes": int(nodes),
+                           "move": int(move), "score": int(score)})
+        if score > 90000:
+            break
+        guess = int(score)
+        candidates.remove(move)
+        candidates.insert(0, int(move))
+    numba_agent.disarm_stop(stop_timer, counters)
+    record = {}
+    _depth_summary(record, iterations, solution)
+
+    if exact:
+        start_time = time.monotonic()
+        stop_timer = numba_agent.arm_stop(start_time + time_limit, counters)
+        value, move = numba_agent.solve_root(current, opponent, heights, key,
+                                             np.array([col for col in CENTER_ORDER if pos.can_play(col)],
+                                                      dtype=np.int64),
+                                             numba_agent.NO_NODE_BUDGET, numba_agent.new_transposition_table(
+                                                 numba_agent.SOLVER_TT_BITS), counters)
+        numba_agent.disarm_stop(stop_timer, counters)
+        if counters[numba_agent.ABORTED]:
+            record["solve"] = None
+        else:
+            record["solve"] = {"time": _rounded(time.monotonic() - start_time), "nodes": int(counters[numba_agent.NODES]),
+                               "value": int(value), "move": int(move), "correct": int(move) in solution}
+    return record
+
+
+def bench_mcts(agent, pos, spec, max_depth, time_limit, exact=False):
+    """
+    Recherche MCTS sur un arbre neuf, interrompue aux relevés pour suivre le coup que l'agent
+    jouerait (best_root_move : le plus visité parmi les enfants de la racine).
+    """
+    solution = spec.get("solution")
+    agent.tree.reset(pos)
+    nodes, children = agent.tree.nodes, agent.tree.children
+
+    moves, times = [], []
+    start_time = time.monotonic()
+    for k in reversed(range(MCTS_CHECKPOINTS)):
+        agent._grow(start_time + time_limit / 2 ** k)
+        moves.append(int(best_root_move(nodes, children, ROOT)))
+        times.append(_rounded(time.monotonic() - start_time))
+    elapsed = time.monotonic() - start_time
+
+    simulations = int(nodes[ROOT]["visits"])
+    record = {"simulations": simulations, "sps": _rounded(simulations / elapsed),
+              "tree_size": int(agent.tree.size[0]), "move": moves[-1]}
+    if solution is not None:
+        index = solved_since(moves, solution)
+        record["solved_time"] = None if index is None else times[index]
+    return record
+
+
+def make_agent(engine, driver="aspiration"):
+    """Agent (compilé) utilisé pour toutes les positions d'un moteur ; driver : pilote du moteur compilé."""
+    if engine == "minimax":
+        return minimax_agent.Agent(env=None)
+    if engine == "numba":
+        return numba_agent.Agent(env=None, driver=driver, warm_up="blocking")
+    return MCTSAgent(env=None, reuse_tree=False)
+
+
+BENCHMARKS = {"minimax": bench_minimax, "numba": bench_numba, "mcts": bench_mcts}
+
+
+def run_benchmark(engines=ENGINES, sets=tuple(POSITION_SETS), max_depth=12, time_limit=2.0, verbose=False,
+                  driver="aspiration"):
+    """
+    Mesure chaque moteur sur chaque position des jeux demandés.
+    Retourne {"meta": ..., "results": {moteur: {"jeu/position": mesures}}}.
+    """
+    report = {
+        "meta": {"max_depth": max_depth, "time_limit": time_limit, "driver": driver,
+                 "python": platform.python_version(),
+                 "numba": numba.__version__, "machine": platform.machine()},
+        "results": {},
+    }
+    for engine in engines:
+        agent = make_agent(engine, driver)
+        results = report["results"][engine] = {}
+        for set_name in sets:
+            for spec in POSITION_SETS[set_name]:
+                pos = Position.from_moves(spec["moves"])
+                record = BENCHMARKS[engine](agent, pos, spec, max_depth, time_limit, exact=set_name == "endgames")
+                results[f"{set_name}/{spec['name']}"] = record
+                if verbose:
+                    print(f"{engine:8s} {set_name}/{spec['name']}: {summary(engine, record)}")
+        if hasattr(agent, "close"):
+            agent.close()
+    return report
+
+
+def summary(engine, record):
+    """Ligne de résumé d'une mesure."""
+    if engine == "mcts":
+        text = f"{record['sps']:.0f} sim/s, {record['tree_size']} noeuds"
+    else:
+        text = f"profondeur {record['depth']}, {record['nps']:.0f} noeuds/s"
+    if "solved_time" in record:
+        text += f", résolu à {record['solved_time']} s"
+    if record.get("solve"):
+        text += f", solveur {record['solve']['time']} s"
+    return text
+
+
+def compare(old, new):
+    """
+    Lignes comparant deux rapports : rapport nouveau / ancien des vitesses
+    (noeuds/s ou simulations/s) et temps de résolution des deux exécutions.
+    """
+    lines = []
+    for engine, results in sorted(new["results"].items()):
+        for position, record in sorted(results.items()):
+            previous = old["results"].get(engine, {}).get(position)
+            if previous is None:
+                continue
+            speed = "sps" if engine == "mcts" else "nps"
+            ratio = record[speed] / previous[speed] if previous[speed] else float("nan")
+            line = f"{engine:8s} {position:24s} {speed} x{ratio:.2f}"
+            if "solved_time" in record:
+                line += f"  résolu {previous['solved_time']} -> {record['solved_time']}"
+            if "depth" in record:
+                line += f"  profondeur {previous['depth']} -> {record['depth']}"
+            lines.append(line)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai des moteurs sur des positions fixes")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--sets", nargs="+", choices=list(POSITION_SETS), default=list(POSITION_SETS))
+    parser.add_argument("--depth", type=int, default=12, help="profondeur maximale des moteurs minimax")
+    parser.add_argument("--time", type=float, default=2.0, help="temps maximal par position et par moteur")
+    parser.add_argument("--driver", choices=numba_agent.SEARCH_DRIVERS, default="aspiration",
+                        help="pilote de l'approfondissement du moteur compilé")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="rapport précédent à comparer")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.engines, args.sets, args.depth, args.time, verbose=True, driver=args.driver)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"Rapport écrit dans {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print("\n".join(compare(old, report)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Représentation bitboard d'une position de Puissance 4, partagée par tous les agents.
+
+Chaque joueur a un entier de 49 bits. Chaque colonne occupe 7 bits (6 cases
+plus 1 bit sentinelle toujours vide), numérotés du bas vers le haut :
+
+     6 13 20 27 34 41 48   <- sentinelles
+     5 12 19 26 33 40 47
+     4 11 18 25 32 39 46
+     3 10 17 24 31 38 45
+     2  9 16 23 30 37 44
+     1  8 15 22 29 36 43
+     0  7 14 21 28 35 42
+
+Le canal 0 est le joueur qui doit jouer dans l'observation PettingZoo et le
+canal 1 son adversaire, comme dans le tenseur (6, 7, 2).
+
+Les fonctions de ce module n'utilisent que des entiers, ce qui permet de les
+compiler telles quelles avec Numba (voir numba_agent.py).
+
+La carte des menaces d'un joueur (winning_cells) est le bitboard des cases
+vides qui lui donneraient 4 pions alignés : victoires, parades, coups qui
+offrent une victoire à l'adversaire et doubles menaces s'en déduisent par
+quelques opérations bit à bit, sans jouer de coup d'essai.
+
+Une position et son symétrique gauche-droite (mirror) ont la même valeur : les
+caches (tables de transposition, bibliothèque d'ouvertures, arbre MCTS) les
+rangent sous une même forme canonique (canonical), et une position symétrique
+n'a que la moitié de ses coups à examiner (Position.distinct_moves).
+"""
+
+import numpy as np
+
+ROWS = 6
+COLS = 7
+H1 = ROWS + 1
+
+BOTTOM_MASK = sum(1 << (col * H1) for col in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+COLUMN_MASKS = tuple(((1 << ROWS) - 1) << (col * H1) for col in range(COLS))
+
+# Ordre d'exploration des colonnes : le centre d'abord
+CENTER_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+
+def cell_bit(row, col):
+    """Bit de la case (row, col) du tenseur (row 0 = ligne du haut)."""
+    return 1 << (col * H1 + ROWS - 1 - row)
+
+
+# cell_bit de chaque case du tenseur (6, 7), pour convertir des observations en bitboards par NumPy
+CELL_BITS = np.array([[cell_bit(row, col) for col in range(COLS)] for row in range(ROWS)], dtype=np.int64)
+
+
+def has_four(bb):
+    """Vrai si le bitboard contient 4 pions alignés (décalage et masque)."""
+    # Vertical
+    m = bb & (bb >> 1)
+    if m & (m >> 2):
+        return True
+    # Horizontal
+    m = bb & (bb >> H1)
+    if m & (m >> (2 * H1)):
+        return True
+    # Diagonale /
+    m = bb & (bb >> (H1 + 1))
+    if m & (m >> (2 * (H1 + 1))):
+        return True
+    # Diagonale \
+    m = bb & (bb >> (H1 - 1))
+    if m & (m >> (2 * (H1 - 1))):
+        return True
+    return False
+
+
+def winning_cells(bb, mask):
+    """
+    Cases vides (hors de mask) qui compléteraient 4 pions alignés avec ceux de bb,
+    jouables ou non : la carte des menaces de bb. Les sentinelles empêchent les
+    alignements de déborder d'une colonne à l'autre.
+    """
+    # Vertical : trois pions juste en dessous
+    r = (bb << 1) & (bb << 2) & (bb << 3)
+    # Horizontal puis les deux diagonales : trois pions parmi les voisins de la ligne
+    for shift in (H1, H1 - 1, H1 + 1):
+        p = (bb << shift) & (bb << 2 * shift)
+        r |= p & (bb << 3 * shift)
+        r |= p & (bb >> shift)
+        p = (bb >> shift) & (bb >> 2 * shift)
+        r |= p & (bb << shift)
+        r |= p & (bb >> 3 * shift)
+    return r & (BOARD_MASK ^ mask)
+
+
+def possible_moves(mask):
+    """Bitboard des cases où tomberait un pion dans chaque colonne non pleine."""
+    return (mask + BOTTOM_MASK) & BOARD_MASK
+
+
+def heights_from_mask(mask):
+    """Hauteur de chaque colonne d'un plateau sans trou."""
+    return [bin((mask >> (col * H1)) & ((1 << ROWS) - 1)).count("1") for col in range(COLS)]
+
+
+def popcount(bb):
+    """Nombre de bits à 1 (boucle de Kernighan, peu de bits attendus)."""
+    count = 0
+    while bb:
+        bb &= bb - 1
+        count += 1
+    return count
+
+
+def mirror(bb):
+    """Symétrique du bitboard par rapport à la colonne centrale (chaque colonne déplacée d'un bloc)."""
+    return (((bb & 0x7F) << 6 * H1) | ((bb >> H1 & 0x7F) << 5 * H1) | ((bb >> 2 * H1 & 0x7F) << 4 * H1)
+            | (bb & (0x7F << 3 * H1))
+            | (bb >> 4 * H1 & 0x7F) << 2 * H1 | (bb >> 5 * H1 & 0x7F) << H1 | (bb >> 6 * H1 & 0x7F))
+
+
+def mirror_move(col):
+    """Colonne symétrique de col."""
+    return COLS - 1 - col
+
+
+def position_key(board0, board1):
+    """Clé unique d'une position où le canal 0 est au trait (pions du trait + masque + ligne du bas)."""
+    return board0 + (board0 | board1) + BOTTOM_MASK
+
+
+def canonical(board0, board1):
+    """
+    Forme canonique d'une position et de son symétrique : (clé, board0, board1, miroir),
+    la plus petite des deux clés ; miroir vaut True si c'est le symétrique. Un cache
+    indexé par cette clé sert aux deux formes : un coup qu'il garde est retourné
+    (mirror_move) quand miroir est vrai, à l'écriture comme à la lecture.
+    """
+    key = position_key(board0, board1)
+    mirror0, mirror1 = mirror(board0), mirror(board1)
+    mirror_key = position_key(mirror0, mirror1)
+    if mirror_key < key:
+        return mirror_key, mirror0, mirror1, True
+    return key, board0, board1, False
+
+
+def canonical_key(board0, board1):
+    """Clé canonique seule (voir canonical), pour les caches dont les valeurs sont symétriques."""
+    return min(position_key(board0, board1), position_key(mirror(board0), mirror(board1)))
+
+
+def is_symmetric(board0, board1):
+    """Vrai si la position est son propre symétrique : un coup et son symétrique se valent."""
+    return mirror(board0) == board0 and mirror(board1) == board1
+
+
+def _build_windows():
+    """Les 69 fenêtres de 4 cases alignées, sous forme de masques."""
+    windows = []
+    for col in range(COLS):
+        for row in range(ROWS):
+            for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                end_col, end_row = col + 3 * dc, row + 3 * dr
+                if 0 <= end_col < COLS and 0 <= end_row < ROWS:
+                    mask = 0
+                    for k in range(4):
+                        mask |= 1 << ((col + k * dc) * H1 + row + k * dr)
+                    windows.append(mask)
+    return tuple(windows)
+
+
+WINDOWS = _build_windows()
+
+# Pour chaque bit du plateau, indices des fenêtres qui passent par cette case (13 au plus)
+CELL_WINDOWS = tuple(
+    tuple(w for w, window in enumerate(WINDOWS) if window >> index & 1)
+    for index in range(COLS * H1)
+)
+
+
+def window_deltas(window_scores):
+    """
+    Variation du score d'une fenêtre quand un canal y ajoute un pion.
+    deltas[channel][n][m] : passage de n à n + 1 pions de channel, m pions adverses.
+    """
+    deltas = [[[0] * 5 for _ in range(5)] for _ in range(2)]
+    for n in range(4):
+        for m in range(4 - n):
+            deltas[0][n][m] = window_scores[n + 1][m] - window_scores[n][m]
+            deltas[1][n][m] = window_scores[m][n + 1] - window_scores[m][n]
+    return deltas
+
+
+class IncrementalEvaluator:
+    """
+    Évaluation par fenêtres mise à jour coup par coup.
+    Chaque fenêtre garde le nombre de pions de chaque canal : poser ou retirer
+    un pion ne recalcule que les fenêtres qui passent par sa case.
+
+    window_scores[n0][n1] : score d'une fenêtre avec n0 pions du canal 0 et n1 du canal 1.
+    cell_scores[channel][index] : score positionnel d'un pion de channel sur le bit index.
+    """
+
+    __slots__ = ("deltas", "cell_scores", "counts", "score")
+
+    def __init__(self, window_scores, cell_scores, boards=(0, 0)):
+        self.deltas = window_deltas(window_scores)
+        self.cell_scores = cell_scores
+        self.counts = ([0] * len(WINDOWS), [0] * len(WINDOWS))
+        self.score = window_scores[0][0] * len(WINDOWS)
+        for channel in range(2):
+            bb = boards[channel]
+            while bb:
+                low = bb & -bb
+                self.add(low.bit_length() - 1, channel)
+                bb ^= low
+
+    def add(self, index, channel):
+        """Pose un pion de channel sur le bit index."""
+        deltas = self.deltas[channel]
+        counts = self.counts[channel]
+        other = self.counts[1 - channel]
+        score = self.score + self.cell_scores[channel][index]
+        for w in CELL_WINDOWS[index]:
+            n = counts[w]
+            score += deltas[n][other[w]]
+            counts[w] = n + 1
+        self.score = score
+
+    def remove(self, index, channel):
+        """Retire le pion de channel du bit index (inverse exact de add)."""
+        deltas = self.deltas[channel]
+        counts = self.counts[channel]
+        other = self.counts[1 - channel]
+        score = self.score - self.cell_scores[channel][index]
+        for w in CELL_WINDOWS[index]:
+            n = counts[w] - 1
+            score -= deltas[n][other[w]]
+            counts[w] = n
+        self.score = score
+
+
+class Position:
+    """
+    Position de jeu : un bitboard par canal et la hauteur de chaque colonne.
+    Jouer et annuler un coup se fait en O(1), sans copie de plateau.
+    """
+
+    __slots__ = ("boards", "heights", "turn", "moves")
+
+    def __init__(self, boards=(0, 0), heights=None, turn=0):
+        self.boards = list(boards)
+        self.heights = list(heights) if heights is not None else [0] * COLS
+        self.turn = turn
+        self.moves = bin(self.boards[0] | self.boards[1]).count("1")
+
+    @classmethod
+    def from_boards(cls, board0, board1, turn=0):
+        """Construit la position depuis les deux bitboards (plateau sans trou)."""
+        return cls((board0, board1), heights_from_mask(board0 | board1), turn)
+
+    @classmethod
+    def from_moves(cls, moves):
+        """Position après la suite de coups (colonnes 0 à 6, ex. "334"), le joueur au trait sur le canal 0."""
+        pos = cls()
+        for col in moves:
+            pos.play(int(col))
+        return cls.from_boards(pos.boards[pos.turn], pos.boards[1 - pos.turn], 0)
+
+    @classmethod
+    def from_observation(cls, observation):
+        """Construit la position depuis l'observation PettingZoo (dict ou tenseur (6, 7, 2))."""
+        if isinstance(observation, dict):
+            observation = observation["observation"]
+        cells = observation.tolist() if hasattr(observation, "tolist") else observation
+
+        boards = [0, 0]
+        heights = [ROWS] * COLS
+        for col in range(COLS):
+            for row in range(ROWS - 1, -1, -1):
+                cell = cells[row][col]
+                bit = 1 << (col * H1 + ROWS - 1 - row)
+                if cell[0] == 1:
+                    boards[0] |= bit
+                elif cell[1] == 1:
+                    boards[1] |= bit
+                elif heights[col] == ROWS:
+                    # Première case vide en partant du bas
+                    heights[col] = ROWS - 1 - row
+        return cls(boards, heights)
+
+    def to_observation(self):
+        """Tenseur (6, 7, 2) de l'observation PettingZoo : le joueur au trait sur le canal 0."""
+        observation = np.zeros((ROWS, COLS, 2), dtype=np.int8)
+        observation[..., 0] = (CELL_BITS & self.boards[self.turn]) != 0
+        observation[..., 1] = (CELL_BITS & self.boards[1 - self.turn]) != 0
+        return observation
+
+    @property
+    def mask(self):
+        """Bitboard de toutes les cases occupées."""
+        return self.boards[0] | self.boards[1]
+
+    def copy(self):
+        return Position(self.boards, self.heights, self.turn)
+
+    def can_play(self, col):
+        return self.heights[col] < ROWS
+
+    def valid_moves(self):
+        """Colonnes jouables, de gauche à droite."""
+        return [col for col in range(COLS) if self.heights[col] < ROWS]
+
+    def next_row(self, col):
+        """Ligne du tenseur où tomberait un pion joué en col (None si pleine)."""
+        height = self.heights[col]
+        return ROWS - 1 - height if height < ROWS else None
+
+    def play(self, col, channel=None):
+        """Joue en col pour channel (par défaut le joueur au trait)."""
+        if channel is None:
+            channel = self.turn
+        self.boards[channel] |= 1 << (col * H1 + self.heights[col])
+        self.heights[col] += 1
+        self.turn = 1 - channel
+        self.moves += 1
+
+    def undo(self, col):
+        """Retire le dernier pion de la colonne col."""
+        self.heights[col] -= 1
+        bit = 1 << (col * H1 + self.heights[col])
+        channel = 0 if self.boards[0] & bit else 1
+        self.boards[channel] ^= bit
+        self.turn = channel
+        self.moves -= 1
+
+    def is_winning_move(self, col, channel=None):
+        """Vrai si jouer en col donne la victoire à channel."""
+        if channel is None:
+            channel = self.turn
+        height = self.heights[col]
+        if height >= ROWS:
+            return False
+        return has_four(self.boards[channel] | (1 << (col * H1 + height)))
+
+    def threats(self, channel):
+        """Carte des menaces de channel : cases vides qui lui donneraient 4 pions alignés."""
+        return winning_cells(self.boards[channel], self.boards[0] | self.boards[1])
+
+    def winning_moves(self, channel):
+        """Cases jouables tout de suite qui donnent la victoire à channel (bitboard)."""
+        mask = self.boards[0] | self.boards[1]
+        return winning_cells(self.boards[channel], mask) & possible_moves(mask)
+
+    def unsafe_moves(self, channel):
+        """Cases jouables par channel juste sous une menace adverse : l'adversaire y jouerait ensuite."""
+        mask = self.boards[0] | self.boards[1]
+        return possible_moves(mask) & (winning_cells(self.boards[1 - channel], mask) >> 1)
+
+    def creates_double_threat(self, col, channel):
+        """Vrai si jouer en col donne à channel au moins deux coups gagnants au tour suivant."""
+        mask = self.boards[0] | self.boards[1]
+        bit = possible_moves(mask) & COLUMN_MASKS[col]
+        if not bit:
+            return False
+        mask |= bit
+        wins = winning_cells(self.boards[channel] | bit, mask) & possible_moves(mask)
+        return wins & (wins - 1) != 0
+
+    def is_symmetric(self):
+        return is_symmetric(self.boards[0], self.boards[1])
+
+    def distinct_moves(self, moves):
+        """moves sans le symétrique d'un autre de ses coups si la position est symétrique."""
+        if not is_symmetric(self.boards[0], self.boards[1]):
+            return moves
+        return [col for col in moves if col <= mirror_move(col) or mirror_move(col) not in moves]
+
+    def has_won(self, channel):
+        return has_four(self.boards[channel])
+
+    def is_full(self):
+        return all(height >= ROWS for height in self.heights)
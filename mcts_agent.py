@@ -1,237 +1,660 @@
-import numpy as np
-import random
 import math
+import numpy as np
+import secrets
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from numba import njit
+import bitboard
+from bitboard import Position, H1, COLS, BOTTOM_MASK, BOARD_MASK
+from opening_book import OpeningBook
+from search_stats import SearchStats
+from time_manager import SearchPoller
+
+bb_has_four = njit(cache=True)(bitboard.has_four)
+bb_possible_moves = njit(cache=True)(bitboard.possible_moves)
+bb_mirror = njit(cache=True)(bitboard.mirror)
+# Colonnes 0 à 3 : les seuls coups développés dans une position symétrique
+LEFT_HALF = (1 << (COLS // 2 + 1)) - 1
+
+# Arbre en structure de tableaux : un enregistrement de 32 octets par noeud,
+# plus une ligne de 7 indices d'enfants (-1 = coup pas encore développé)
+NODE_DTYPE = np.dtype([
+    ("board0", np.int64),     # pions du canal 0 (l'agent)
+    ("board1", np.int64),     # pions du canal 1
+    ("wins", np.float32),     # victoires du joueur qui a joué move (0.5 par nul)
+    ("visits", np.int32),
+    ("parent", np.int32),
+    ("move", np.int8),
+    ("player", np.int8),      # canal du joueur au trait
+    ("untried", np.int8),     # masque des colonnes pas encore développées
+    ("terminal", np.int8),
+])
+ROOT = 0
+# Issues cumulées des parties simulées : victoires du canal 0, du canal 1, nuls
+WINS_0, WINS_1, DRAWS = 0, 1, 2
+# Résultat d'un noeud terminal : victoire du dernier joueur ou nul
+NOT_TERMINAL, TERMINAL_WIN, TERMINAL_DRAW = 0, 1, 2
+
+
+@njit(cache=True)
+def init_node(nodes, children, index, board0, board1, player, parent, move):
+    """Remplit le noeud index (terminal et coups possibles calculés une seule fois)."""
+    nodes[index]["board0"] = board0
+    nodes[index]["board1"] = board1
+    nodes[index]["wins"] = 0.0
+    nodes[index]["visits"] = 0
+    nodes[index]["parent"] = parent
+    nodes[index]["move"] = move
+    nodes[index]["player"] = player
+    for k in range(COLS):
+        children[index, k] = -1
+
+    last = board1 if player == 0 else board0
+    possible = bb_possible_moves(board0 | board1)
+    untried = 0
+    for col in range(COLS):
+        if (possible >> (col * H1)) & 0x3F:
+            untried |= 1 << col
+    # Position symétrique : le coup symétrique d'une colonne de droite donne le même sous-arbre
+    if bb_mirror(board0) == board0 and bb_mirror(board1) == board1:
+        untried &= LEFT_HALF
+    if bb_has_four(last):
+        nodes[index]["terminal"] = TERMINAL_WIN
+        untried = 0
+    elif untried == 0:
+        nodes[index]["terminal"] = TERMINAL_DRAW
+    else:
+        nodes[index]["terminal"] = NOT_TERMINAL
+    nodes[index]["untried"] = untried
+
+
+@njit(cache=True)
+def tree_select(nodes, children, root, c):
+    """Descend tant que le noeud est entièrement développé, en suivant UCB1."""
+    node = root
+    while nodes[node]["untried"] == 0 and nodes[node]["terminal"] == NOT_TERMINAL:
+        best_child = -1
+        best_score = -np.inf
+        log_visits = np.log(nodes[node]["visits"])
+        for k in range(COLS):
+            child = children[node, k]
+            if child < 0:
+                continue
+            visits = nodes[child]["visits"]
+            if visits == 0:
+                best_child = child
+                break
+            score = nodes[child]["wins"] / visits + c * np.sqrt(log_visits / visits)
+            if score > best_score:
+                best_score = score
+                best_child = child
+        if best_child < 0:
+            break
+        node = best_child
+    return node
+
+
+@njit(cache=True)
+def tree_expand(nodes, children, size, node):
+    """Ajoute un enfant au hasard parmi les coups non essayés (rien si l'arbre est plein)."""
+    if nodes[node]["untried"] == 0 or size[0] >= nodes.shape[0]:
+        return node
+    child = size[0]
+    size[0] += 1
+    add_random_child(nodes, children, node, child)
+    return child
 
 
-class MCTSNode:
+@njit(cache=True)
+def add_random_child(nodes, children, node, child):
+    """
+    Développe en child un coup tiré au hasard parmi les coups non essayés de node.
+    Retourne False s'il n'en reste plus (un autre thread a pu prendre le dernier).
     """
-    Noeud dans l'arbre de décisions
+    untried = nodes[node]["untried"]
+    count = 0
+    for col in range(COLS):
+        if untried >> col & 1:
+            count += 1
+    if count == 0:
+        return False
+    pick = np.random.randint(count)
+    move = 0
+    for col in range(COLS):
+        if untried >> col & 1:
+            if pick == 0:
+                move = col
+                break
+            pick -= 1
+
+    board0 = nodes[node]["board0"]
+    board1 = nodes[node]["board1"]
+    player = nodes[node]["player"]
+    mask = board0 | board1
+    bit = (mask + (1 << (move * H1))) & (0x3F << (move * H1))
+    if player == 0:
+        board0 |= bit
+    else:
+        board1 |= bit
+
+    init_node(nodes, children, child, board0, board1, 1 - player, node, move)
+    children[node, move] = child
+    nodes[node]["untried"] = untried & ~(1 << move)
+    return True
+
+
+@njit(cache=True)
+def random_playouts(board0, board1, player, n, results):
     """
+    Joue n parties aléatoires depuis la position et ajoute leurs issues à results.
+    Seul le bitboard du joueur qui vient de poser est testé : un alignement
+    ne peut passer que par le dernier pion.
+    """
+    columns = np.empty(COLS, dtype=np.int64)
+    for _ in range(n):
+        mover = board0 if player == 0 else board1
+        waiting = board1 if player == 0 else board0
+        mask = board0 | board1
+        turn = player
+        while True:
+            possible = (mask + BOTTOM_MASK) & BOARD_MASK
+            count = 0
+            for col in range(COLS):
+                if (possible >> (col * H1)) & 0x3F:
+                    columns[count] = col
+                    count += 1
+            if count == 0:
+                results[DRAWS] += 1
+                break
 
-    def __init__(self, board, player, parent=None, move=None):
-        self.board = board        
-        self.player = player      
-        self.parent = parent      
-        self.move = move          
-        self.children = []        
-        self.visits = 0           
-        self.wins = 0             
-
-    def is_fully_expanded(self):
-        """Regarde si tous les enfants ont été ajoutés"""
-        valid_moves = self._get_valid_moves()
-        return len(self.children) == len(valid_moves)
-
-    def best_child(self, c=1.41):
-        """
-        Sélectionne le meilleur enfant à explorer
-        """
-        best_score = float('-inf')
-        best_child = None
-        for child in self.children:
-            if child.visits==0:
-                return child
-            exploit = child.wins / child.visits
-            explore = c * math.sqrt(math.log(self.visits) / child.visits)
-            score = exploit + explore
+            col = columns[np.random.randint(count)]
+            bit = possible & (0x3F << (col * H1))
+            mover |= bit
+            mask |= bit
+            if bb_has_four(mover):
+                results[turn] += 1
+                break
 
-            if score > best_score:
-                best_score = score
-                best_child = child
-        return best_child
+            mover, waiting = waiting, mover
+            turn = 1 - turn
 
-    def _get_valid_moves(self):
-        """liste de colonnes valides"""
-        valid_moves = []
-        cols = self.board.shape[1]
-        # On parcourt les colonnes (0 à 6)
-        for col in range(cols):
-            # Si la case du haut (row 0) est vide pour les deux joueurs, la colonne est valide
-            if self.board[0, col, 0] == 0 and self.board[0, col, 1] == 0:
-                valid_moves.append(col)
-        return valid_moves
 
+@njit(cache=True)
+def seed_playouts(seed):
+    """
+    Fixe la graine du générateur des parties aléatoires (celui des noyaux compilés, pas celui
+    de NumPy). Ce générateur est commun à tout le processus : voir MCTSAgent._search.
+    """
+    np.random.seed(seed)
+
+
+@njit(cache=True)
+def tree_backpropagate(nodes, node, results):
+    """Remonte les issues cumulées (victoires par canal, nuls) jusqu'à la racine."""
+    games = results[WINS_0] + results[WINS_1] + results[DRAWS]
+    while node >= 0:
+        nodes[node]["visits"] += games
+        parent = nodes[node]["parent"]
+        wins = 0.5 * results[DRAWS]
+        if parent >= 0:
+            wins += results[nodes[parent]["player"]]
+        nodes[node]["wins"] += wins
+        node = parent
+
+
+@njit(cache=True)
+def simulate_node(nodes, node, n, results):
+    """Évalue node par n parties aléatoires ; un noeud terminal donne directement son issue."""
+    results[:] = 0
+    player = nodes[node]["player"]
+    terminal = nodes[node]["terminal"]
+    if terminal == TERMINAL_WIN:
+        # Le coup qui a mené au noeud est gagnant : toutes les parties le sont
+        results[1 - player] = n
+    elif terminal == TERMINAL_DRAW:
+        results[DRAWS] = n
+    else:
+        random_playouts(nodes[node]["board0"], nodes[node]["board1"], player, n, results)
+
+
+@njit(cache=True, nogil=True)
+def tree_parallel_iterations(nodes, children, slab, root, c, n, iterations, virtual_loss):
+    """
+    iterations itérations MCTS sur l'arbre partagé, sans le GIL : plusieurs threads
+    l'appellent en même temps. Chaque thread alloue ses noeuds dans sa propre tranche
+    [slab[0], slab[1]) du tableau. Pendant la descente, virtual_loss visites sans victoire
+    sont ajoutées au chemin pour écarter les autres threads, puis retirées à la remontée.
+    Les mises à jour concurrentes ne sont pas atomiques : une visite perdue de temps en
+    temps est tolérée plutôt que de verrouiller l'arbre.
+    """
+    results = np.zeros(3, dtype=np.int64)
+    for _ in range(iterations):
+        node = root
+        nodes[node]["visits"] += virtual_loss
+        while nodes[node]["untried"] == 0 and nodes[node]["terminal"] == NOT_TERMINAL:
+            best_child = -1
+            best_score = -np.inf
+            log_visits = np.log(nodes[node]["visits"])
+            for k in range(COLS):
+                child = children[node, k]
+                if child < 0:
+                    continue
+                visits = nodes[child]["visits"]
+                if visits == 0:
+                    best_child = child
+                    break
+                score = nodes[child]["wins"] / visits + c * np.sqrt(log_visits / visits)
+                if score > best_score:
+                    best_score = score
+                    best_child = child
+            if best_child < 0:
+                break
+            node = best_child
+            nodes[node]["visits"] += virtual_loss
 
-class MCTSAgent:
-    
+        leaf = node
+        if nodes[node]["terminal"] == NOT_TERMINAL and slab[0] < slab[1]:
+            if add_random_child(nodes, children, node, slab[0]):
+                leaf = slab[0]
+                slab[0] += 1
 
-    def __init__(self, env, time_limit=0.95, player_name=None):
-        """
-        Initialise un agent MCTS
-        """
-        self.env = env
-        self.time_limit = time_limit
-        self.player_name = player_name or "MCTS"
+        simulate_node(nodes, leaf, n, results)
+        tree_backpropagate(nodes, leaf, results)
+        # Retire la perte virtuelle du chemin (le nouveau noeud n'en a pas reçu)
+        while node >= 0:
+            nodes[node]["visits"] -= virtual_loss
+            node = nodes[node]["parent"]
 
-    def choose_action(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
+
+@njit(cache=True)
+def best_root_move(nodes, children, root):
+    """
+    Coup de la racine le plus visité, les victoires départageant les égalités : la même règle
+    que la parallélisation à la racine, qui additionne les visites de plusieurs arbres.
+    """
+    best_move = -1
+    best_visits = -1
+    best_wins = -np.inf
+    for k in range(COLS):
+        child = children[root, k]
+        if child < 0:
+            continue
+        visits = nodes[child]["visits"]
+        wins = nodes[child]["wins"]
+        if visits > best_visits or (visits == best_visits and wins > best_wins):
+            best_visits = visits
+            best_wins = wins
+            best_move = k
+    return best_move
+
+
+@njit(cache=True)
+def find_grandchild(nodes, children, root, board0, board1):
+    """Cherche, deux coups sous la racine, le noeud de la position (board0, board1) ; -1 si absent."""
+    for i in range(COLS):
+        child = children[root, i]
+        if child < 0:
+            continue
+        for k in range(COLS):
+            grandchild = children[child, k]
+            if (grandchild >= 0 and nodes[grandchild]["board0"] == board0
+                    and nodes[grandchild]["board1"] == board1):
+                return grandchild
+    return -1
+
+
+@njit(cache=True)
+def compact_subtree(nodes, children, size, new_root, limit, new_index, order):
+    """
+    Fait de new_root la racine (indice 0) en ne gardant que ses descendants,
+    limit noeuds au plus (parcours en largeur). Les noeuds gardés sont renumérotés
+    dans l'ordre de leurs anciens indices : le nouvel indice n'est jamais plus grand
+    que l'ancien, on peut donc les déplacer sur place. Un enfant abandonné redevient
+    un coup à essayer.
+    """
+    order[0] = new_root
+    count = 1
+    head = 0
+    while head < count:
+        node = order[head]
+        head += 1
+        for k in range(COLS):
+            child = children[node, k]
+            if child < 0:
+                continue
+            if count < limit:
+                order[count] = child
+                count += 1
+            else:
+                new_index[child] = -1
+
+    kept = np.sort(order[:count])
+    for j in range(count):
+        new_index[kept[j]] = j
+
+    for j in range(count):
+        i = kept[j]
+        nodes[j]["board0"] = nodes[i]["board0"]
+        nodes[j]["board1"] = nodes[i]["board1"]
+        nodes[j]["wins"] = nodes[i]["wins"]
+        nodes[j]["visits"] = nodes[i]["visits"]
+        nodes[j]["parent"] = -1 if i == new_root else new_index[nodes[i]["parent"]]
+        nodes[j]["move"] = nodes[i]["move"]
+        nodes[j]["player"] = nodes[i]["player"]
+        nodes[j]["terminal"] = nodes[i]["terminal"]
+        untried = nodes[i]["untried"]
+        for k in range(COLS):
+            child = children[i, k]
+            if child >= 0 and new_index[child] >= 0:
+                children[j, k] = new_index[child]
+            else:
+                if child >= 0:
+                    untried |= 1 << k
+                children[j, k] = -1
+        nodes[j]["untried"] = untried
+    size[0] = count
+
+
+class MCTSTree:
+    """
+    Arbre de recherche préalloué : tableaux NumPy indexés par numéro de noeud,
+    pas d'objet Python par noeud.
+    """
+
+    def __init__(self, capacity):
+        self.nodes = np.zeros(capacity, dtype=NODE_DTYPE)
+        self.children = np.full((capacity, COLS), -1, dtype=np.int32)
+        self.size = np.zeros(1, dtype=np.int64)
+        self.new_index = np.zeros(capacity, dtype=np.int32)
+        self.order = np.zeros(capacity, dtype=np.int32)
+
+    def reset(self, position):
+        """Vide l'arbre et place position à la racine."""
+        self.size[0] = 1
+        init_node(self.nodes, self.children, ROOT, position.boards[0], position.boards[1],
+                  position.turn, -1, -1)
+
+    def reuse(self, position, limit):
         """
-        Choisit le meilleur coup selon MCTS
+        Si position est un petit-enfant de la racine (notre coup puis la réponse adverse),
+        en fait la nouvelle racine en gardant au plus limit noeuds de son sous-arbre.
+        Retourne False si la position n'est pas dans l'arbre.
         """
-        
-        if isinstance(observation, dict) and "observation" in observation:
-            board = observation["observation"]
-        else:
-            board = observation
-        #Crée le noeud de départ (la racine)
-        root = MCTSNode(board, player=0)
+        if self.size[0] == 0:
+            return False
+        node = find_grandchild(self.nodes, self.children, ROOT, position.boards[0], position.boards[1])
+        if node < 0:
+            return False
+        compact_subtree(self.nodes, self.children, self.size, node, limit, self.new_index, self.order)
+        return True
+
+    def root_statistics(self):
+        """Visites et victoires de chaque coup de la racine (0 pour un coup non développé)."""
+        visits = [0] * COLS
+        wins = [0.0] * COLS
+        for move in range(COLS):
+            child = self.children[ROOT, move]
+            if child >= 0:
+                visits[move] = int(self.nodes[child]["visits"])
+                wins[move] = float(self.nodes[child]["wins"])
+        return visits, wins
+
+    def principal_variation(self):
+        """Suite des coups les plus visités depuis la racine."""
+        pv = []
+        node = ROOT
+        while True:
+            kids = [child for child in self.children[node] if child >= 0]
+            if not kids:
+                return pv
+            node = max(kids, key=lambda child: self.nodes[child]["visits"])
+            pv.append(int(self.nodes[node]["move"]))
 
-        start_time = time.time()
 
-        #Utilise le maximum de temps disponible
-        simulations = 0
-        while time.time() - start_time < self.time_limit:
-            # Sélection de l'enfant
-            node = self._select(root)
+# Recherche parallèle : arbres indépendants dans des processus (racine) ou arbre partagé entre threads
+ROOT_PARALLEL, TREE_PARALLEL = "root", "tree"
+# Itérations d'un thread entre deux lectures de l'horloge
+TREE_BATCH = 64
+# Temps laissé aux processus pour renvoyer leurs statistiques
+PARALLEL_MARGIN = 0.02
 
-            # Expansion
-            if not self._is_terminal(node):
-                node = self._expand(node)
+# Agent propre à chaque processus de la parallélisation à la racine
+_worker_agent = None
 
-            # Simulation
-            result = self._simulate(node)
 
-            # Backpropagation
-            self._backpropagate(node, result)
+def _init_root_worker(tree_capacity, playouts_per_leaf, c):
+    """Construit (et compile) l'agent du processus une seule fois."""
+    global _worker_agent
+    _worker_agent = MCTSAgent(None, tree_capacity=tree_capacity, playouts_per_leaf=playouts_per_leaf)
+    _worker_agent.c = c
 
-            simulations += 1
 
-        # Choisit le meilleur coup
-        best_child = root.best_child(c=0)
-        return best_child.move
+def _root_worker_search(board0, board1, player, time_limit, simulations=None):
+    """Recherche indépendante dans un processus ; renvoie les statistiques de la racine."""
+    _worker_agent._search(Position.from_boards(board0, board1, player), time.monotonic(), time_limit, simulations)
+    return _worker_agent.tree.root_statistics()
 
-    def _select(self, node):
-        """
-        Sélectionne un noeud prometteur à explorer
-        """
 
-        while node.is_fully_expanded() and not self._is_terminal(node):
-            if not node.children:
-                break
-            node=node.best_child()
-        return node
+class MCTSAgent:
 
-    def _expand(self, node):
-        """
-        Ajoute un nouvel enfant au noeud
-        """
-        valid_moves = node._get_valid_moves()
-        tried_moves = [child.move for child in node.children]
-        
-        untried_moves = [m for m in valid_moves if m not in tried_moves]
-        
-        if not untried_moves:
-            return node 
-            
-        move = random.choice(untried_moves)
-        
-
-        new_board = node.board.copy()
-        rows = new_board.shape[0]
-        for r in range(rows - 1, -1, -1):
-            if new_board[r, move, 0] == 0 and new_board[r, move, 1] == 0:
-                new_board[r, move, node.player] = 1
-                break
-     
-        new_player = 1 - node.player
-        child = MCTSNode(new_board, player=new_player, parent=node, move=move)
-        node.children.append(child)
-        
-        return child
 
-    def _simulate(self, node):
-        """
-        Joue aléatoirement à partir du noeud
+    def __init__(self, env, time_limit=0.95, player_name=None, tree_capacity=1 << 18, playouts_per_leaf=4,
+                 reuse_tree=True, workers=1, parallel=ROOT_PARALLEL, virtual_loss=1, book=None, stats=False,
+                 stats_path=None, simulation_budget=None, seed=None):
         """
-        current_board = node.board.copy()
-        current_player = node.player
-        
+        Initialise un agent MCTS
 
-        while True:
+        Avec workers > 1, la recherche est répartie sur plusieurs coeurs :
+        parallel="root" lance des arbres indépendants dans des processus et additionne
+        les visites de la racine, parallel="tree" fait travailler des threads sur le même
+        arbre (perte virtuelle de virtual_loss visites).
 
-            prev_player = 1 - current_player
-            rows, cols = current_board.shape[0], current_board.shape[1]
-            winner = None
-            
-   
-            for r in range(rows):
-                for c in range(cols - 3):
-                    if np.all(current_board[r, c:c+4, prev_player] == 1): winner = prev_player
-            if winner is None:
-                for r in range(rows - 3):
-                    for c in range(cols):
-                        if np.all(current_board[r:r+4, c, prev_player] == 1): winner = prev_player
-            if winner is None:
-                for r in range(rows - 3):
-                    for c in range(cols - 3):
-                        if all(current_board[r+i, c+i, prev_player] == 1 for i in range(4)): winner = prev_player
-                        if all(current_board[r+3-i, c+i, prev_player] == 1 for i in range(4)): winner = prev_player
-            
-            if winner is not None:
-                return winner 
-
-            valid_moves = []
-            for c in range(cols):
-                if current_board[0, c, 0] == 0 and current_board[0, c, 1] == 0:
-                    valid_moves.append(c)
-            
-            if not valid_moves:
-                return 0.5 
-            
-            move = random.choice(valid_moves)
- 
-            for r in range(rows - 1, -1, -1):
-                if current_board[r, move, 0] == 0 and current_board[r, move, 1] == 0:
-                    current_board[r, move, current_player] = 1
-                    break
+        simulation_budget fixe le nombre de parties simulées par coup à la place du temps ;
+        avec seed et un seul worker, les coups joués sont alors reproductibles. Le générateur
+        des noyaux est commun au processus : il n'est fixé que le temps de chaque recherche.
+        """
+        if parallel not in (ROOT_PARALLEL, TREE_PARALLEL):
+            raise ValueError(f"Mode parallèle inconnu : {parallel}")
+        self.env = env
+        self.time_limit = time_limit
+        self.player_name = player_name or "MCTS"
+        self.c = 1.41
+        self.tree = MCTSTree(tree_capacity)
+        # Nombre de parties aléatoires jouées (en un seul appel compilé) pour évaluer une feuille
+        self.playouts_per_leaf = playouts_per_leaf
+        self.results = np.zeros(3, dtype=np.int64)
+        # Sous-arbre gardé d'un coup à l'autre, borné pour laisser de la place à la nouvelle recherche
+        self.reuse_tree = reuse_tree
+        self.reuse_limit = tree_capacity // 2
+        self.workers = workers
+        self.parallel = parallel
+        self.virtual_loss = virtual_loss
+        self._pool = None
+        # Bibliothèque d'ouvertures (chemin ou OpeningBook) : un coup trouvé évite la recherche
+        self.book = OpeningBook.load(book)
+        # Statistiques par coup (voir search_stats.py)
+        SearchStats.attach(self, "mcts", stats, stats_path)
+        self.simulation_budget = simulation_budget
+        # Horloge lue tous les quelques centaines d'itérations seulement
+        self._poller = SearchPoller()
+
+        # Compile les noyaux avant le premier coup, hors du budget de temps
+        self.tree.reset(Position())
+        node = tree_expand(self.tree.nodes, self.tree.children, self.tree.size,
+                           tree_select(self.tree.nodes, self.tree.children, ROOT, self.c))
+        self._simulate(node)
+        tree_backpropagate(self.tree.nodes, node, self.results)
+        best_root_move(self.tree.nodes, self.tree.children, ROOT)
+        find_grandchild(self.tree.nodes, self.tree.children, ROOT, 0, 0)
+        compact_subtree(self.tree.nodes, self.tree.children, self.tree.size, ROOT, self.reuse_limit,
+                        self.tree.new_index, self.tree.order)
+
+        if workers > 1 and parallel == TREE_PARALLEL:
+            tree_parallel_iterations(self.tree.nodes, self.tree.children, np.array([1, 2], dtype=np.int64),
+                                     ROOT, self.c, 1, 1, virtual_loss)
+            self._pool = ThreadPoolExecutor(workers - 1)
+        elif workers > 1:
+            # Processus lancés en spawn : un fork hérite mal des threads Numba du processus parent
+            self._pool = ProcessPoolExecutor(workers - 1, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_root_worker,
+                                             initargs=(tree_capacity, playouts_per_leaf, self.c))
+            # Démarre les processus maintenant plutôt que pendant le premier coup
+            for future in [self._pool.submit(_root_worker_search, 0, 0, 0, 0.0) for _ in range(workers - 1)]:
+                future.result()
+        self.tree.size[0] = 0
+        self.seed = seed
+        self._searches = 0
+
+    def close(self):
+        """Arrête les processus ou threads de la recherche parallèle."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
+    def choose_action(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
+        """
+        Choisit le meilleur coup selon MCTS
+        """
+        start_time = time.monotonic()
+        if self.stats is not None:
+            self.stats.start()
+        position = Position.from_observation(observation)
+
+        if self.book is not None:
+            book_move = self.book.probe(position)
+            if book_move is not None:
+                return SearchStats.end_move(self, book_move, "book")
+            if self.stats is not None:
+                self.stats.phase("book")
 
-            current_player = 1 - current_player
+        if self.workers > 1 and self.parallel == ROOT_PARALLEL:
+            return SearchStats.end_move(self, self._root_parallel_move(position, start_time), "search")
 
+        simulations = self._search(position, start_time, self.time_limit, self.simulation_budget)
 
+        # Choisit le meilleur coup
+        move = int(best_root_move(self.tree.nodes, self.tree.children, ROOT))
+        if self.stats is not None:
+            visits, wins = self.tree.root_statistics()
+            self._record_search(simulations, wins[move] / visits[move] if visits[move] else None)
+        return SearchStats.end_move(self, move, "search")
+
+    def _record_search(self, simulations, score):
+        """Ajoute au relevé du coup les statistiques de l'arbre."""
+        self.stats.current.update(simulations=simulations, tree_size=int(self.tree.size[0]), score=score,
+                                  pv=self.tree.principal_variation())
+
+    def _search(self, position, start_time, time_limit, simulations=None):
+        """
+        Construit l'arbre de position jusqu'à start_time + time_limit (ou jusqu'à simulations parties)
+        Retourne le nombre de parties simulées
+        """
 
-    def _backpropagate(self, node, result):
+        # Avec seed, le générateur (commun au processus) est fixé pour cette recherche seulement,
+        # d'après la graine et le rang du coup, puis remis au hasard : les autres agents du
+        # processus ne rejouent pas les mêmes parties
+        if self.seed is not None:
+            seed_playouts((self.seed + self._searches) % (1 << 32))
+            self._searches += 1
+
+        #Place la position à la racine, en gardant si possible l'arbre du coup précédent
+        if not (self.reuse_tree and self.tree.reuse(position, self.reuse_limit)):
+            self.tree.reset(position)
+
+        visits = int(self.tree.nodes[ROOT]["visits"])
+        try:
+            self._grow(start_time + time_limit, simulations)
+        finally:
+            if self.seed is not None:
+                seed_playouts(secrets.randbits(32))
+        return int(self.tree.nodes[ROOT]["visits"]) - visits
+
+    def _grow(self, deadline, simulations=None):
         """
-        Ajuste les statistiques
+        Fait grandir l'arbre courant jusqu'à deadline, ou jusqu'à simulations parties de plus
         """
+        if self.workers > 1 and self.parallel == TREE_PARALLEL:
+            self._tree_parallel_search(deadline, simulations)
+            return
 
-        while node !=None:
-            node.visits+=1
-            if result == 0.5:
-                node.wins += 0.5
-            elif node.parent is not None:
-                
-                if result == node.parent.player:
-                    node.wins += 1
-            
-            node = node.parent
+        nodes, children, size = self.tree.nodes, self.tree.children, self.tree.size
 
+        # Chaque itération simule playouts_per_leaf parties
+        iterations = None if simulations is None else math.ceil(simulations / self.playouts_per_leaf)
+        poller = self._poller
+        poller.start(deadline, iterations)
 
+        #Utilise le maximum de temps disponible
+        while True:
+            poller.countdown -= 1
+            if poller.countdown <= 0 and poller.poll():
+                break
+
+            # Sélection de l'enfant
+            node = tree_select(nodes, children, ROOT, self.c)
 
+            # Expansion
+            if nodes[node]["terminal"] == NOT_TERMINAL:
+                node = tree_expand(nodes, children, size, node)
 
-    def _is_terminal(self, node):
-        """Indique si la partie est finie ou non"""
+            # Simulation
+            self._simulate(node)
 
-        board = node.board
-        rows, cols = board.shape[0], board.shape[1]
+            # Backpropagation
+            tree_backpropagate(nodes, node, self.results)
 
-        check_player = 1 - node.player
+    def _tree_parallel_search(self, deadline, simulations=None):
+        """
+        Parallélisation dans l'arbre : chaque thread (le thread courant compris) appelle le
+        noyau sans GIL par lots de TREE_BATCH itérations, avec sa tranche de noeuds libres.
+        Avec simulations, l'arrêt se fait au lot près (la recherche n'est pas reproductible).
+        """
+        nodes, children, size = self.tree.nodes, self.tree.children, self.tree.size
+        bounds = size[0] + (len(nodes) - size[0]) * np.arange(self.workers + 1) // self.workers
+        slabs = np.stack([bounds[:-1], bounds[1:]], axis=1).astype(np.int64)
+        target = float("inf") if simulations is None else nodes[ROOT]["visits"] + simulations
+
+        def run(slab):
+            while time.monotonic() < deadline and nodes[ROOT]["visits"] < target:
+                tree_parallel_iterations(nodes, children, slab, ROOT, self.c, self.playouts_per_leaf,
+                                         TREE_BATCH, self.virtual_loss)
+
+        futures = [self._pool.submit(run, slabs[k]) for k in range(1, self.workers)]
+        run(slabs[0])
+        for future in futures:
+            future.result()
+        # Les tranches laissent des trous : la taille ne sert plus qu'à savoir que l'arbre existe
+        size[0] = slabs[:, 0].max()
+
+    def _root_parallel_move(self, position, start_time):
+        """
+        Parallélisation à la racine : chaque processus construit son propre arbre pendant que
+        le processus courant construit le sien, puis les visites de la racine sont additionnées.
+        """
+        # Le budget de parties est partagé entre les arbres
+        share = None if self.simulation_budget is None else -(-self.simulation_budget // self.workers)
+        futures = [self._pool.submit(_root_worker_search, position.boards[0], position.boards[1],
+                                     position.turn, self.time_limit - PARALLEL_MARGIN, share)
+                   for _ in range(self.workers - 1)]
+        simulations = self._search(position, start_time, self.time_limit - PARALLEL_MARGIN, share)
+        visits, wins = self.tree.root_statistics()
+        for future in futures:
+            worker_visits, worker_wins = future.result()
+            simulations += sum(worker_visits)
+            for move in range(COLS):
+                visits[move] += worker_visits[move]
+                wins[move] += worker_wins[move]
+
+        # Coup le plus visité sur l'ensemble des arbres (même règle que best_root_move)
+        valid = position.valid_moves()
+        move = max(valid, key=lambda move: (visits[move], wins[move]))
+        if self.stats is not None:
+            self._record_search(simulations, wins[move] / visits[move] if visits[move] else None)
+        return move
 
-        for r in range(rows):
-            for c in range(cols - 3):
-                if np.all(board[r, c:c+4, check_player] == 1): return True
-        for r in range(rows - 3):
-            for c in range(cols):
-                if np.all(board[r:r+4, c, check_player] == 1): return True
-        for r in range(rows - 3):
-            for c in range(cols - 3):
-                if all(board[r+i, c+i, check_player] == 1 for i in range(4)): return True
-                if all(board[r+3-i, c+i, check_player] == 1 for i in range(4)): return True
-  
-        valid = False
-        for c in range(cols):
-            if board[0, c, 0] == 0 and board[0, c, 1] == 0:
-                valid = True
-                break
-        
-        return not valid
\ No newline at end of file
+    def _simulate(self, node):
+        """
+        Joue aléatoirement à partir du noeud ; les issues sont écrites dans self.results
+        """
+        simulate_node(self.tree.nodes, node, self.playouts_per_leaf, self.results)
@@ -1,18 +1,100 @@
 import random
 import numpy as np
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bitboard import (Position, IncrementalEvaluator, ROWS, COLS, H1, WINDOWS, CENTER_ORDER, BOTTOM_MASK, COLUMN_MASKS,
+                      has_four, winning_cells, possible_moves)
+from opening_book import OpeningBook
+from search_stats import SearchStats, STAT_CUTOFFS, STAT_EVALS
+from time_manager import IterationTimer, SearchPoller
+
+# Profondeur à partir de laquelle la racine est partagée entre les processus
+# (en dessous, l'envoi des tâches coûte plus que la recherche)
+PARALLEL_MIN_DEPTH = 4
+
+# Résolution exacte de fin de partie : valeur pour le joueur au trait
+SOLVE_WIN, SOLVE_DRAW, SOLVE_LOSS = 1, 0, -1
+SOLVE_EXACT, SOLVE_LOWER, SOLVE_UPPER = 0, 1, 2
+# Taille au-delà de laquelle la table du solveur est vidée entre deux coups
+SOLVER_TABLE_MAX = 1 << 20
+
+# Ordre des coups de _minimax : killers du demi-coup, puis du centre vers les bords,
+# l'historique des coupures départageant les colonnes symétriques. Juste au-dessus
+# des feuilles, l'ordre statique suffit
+ORDER_MIN_DEPTH = 2
+CENTER_RANK = [abs(col - 3) for col in range(COLS)]
+
+# Coups jouables dans l'ordre du centre, selon les cases du haut occupées (colonnes pleines) :
+# un tuple partagé par tous les noeuds, au lieu d'une liste construite à chaque noeud
+TOP_MASK = BOTTOM_MASK << (ROWS - 1)
+PLAYABLE = {sum(1 << (col * H1 + ROWS - 1) for col in range(COLS) if full >> col & 1):
+            tuple(col for col in CENTER_ORDER if not full >> col & 1)
+            for full in range(1 << COLS)}
+
+# Agent propre à chaque processus de la recherche parallèle
+_worker_agent = None
+
+
+def _init_worker():
+    global _worker_agent
+    _worker_agent = Agent(env=None)
+
+
+def _search_root_move(boards, heights, action, depth, alpha, deadline):
+    """Valeur d'un coup de la racine, calculée dans un processus ; None si le temps est écoulé."""
+    agent = _worker_agent
+    agent._poller.start(deadline)
+    pos = Position(boards, heights)
+    agent._evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+    try:
+        return agent._search_move(pos, action, depth, alpha)
+    except TimeoutError:
+        return None
+
 
 class Agent:
     """
     Agent Minimax Expert
     Utilise une Heuristique "Heatmap" issue de la recherche et des poids exponentiels.
     """
-    def __init__(self, env, player_name=None):
+    def __init__(self, env, player_name=None, workers=1, book=None, solver_empty=12, stats=False, stats_path=None,
+                 node_budget=None):
         self.env = env
         self.rows = 6
         self.cols = 7
         self.time_limit = 2.85
+        # Budget de noeuds par coup à la place du temps : la recherche est alors reproductible
+        # (séquentielle, le solveur de fin de partie en prend au plus la moitié)
+        self.node_budget = node_budget
+        # Horloge lue tous les quelques centaines de noeuds seulement
+        self._poller = SearchPoller()
         self.player_name = player_name or "Minimax_Expert"
+        # Bibliothèque d'ouvertures (chemin ou OpeningBook) : un coup trouvé évite la recherche
+        self.book = OpeningBook.load(book)
+        # En dessous de solver_empty cases vides, la position est d'abord résolue exactement
+        self.solver_empty = solver_empty
+        self._solver_table = {}
+
+        # Killers (deux par demi-coup de la partie) et historique des coupures par (canal, case),
+        # gardés d'une itération à l'autre ; l'historique est vieilli à chaque coup
+        self._killers = [[-1, -1] for _ in range(ROWS * COLS + 1)]
+        self._history = [[0] * (COLS * H1) for _ in range(2)]
+
+        # Statistiques par coup (voir search_stats.py). Noeuds de la recherche et du solveur lus
+        # sur le poller ; coupures et feuilles comptées par _minimax dans _search_stats, comme le
+        # noyau compilé. La recherche n'a pas de table de transposition (tt_hits vaut 0) et sa
+        # variante principale se réduit au coup joué
+        SearchStats.attach(self, "minimax", stats, stats_path)
+        self._search_stats = [0, 0, 0] if self.stats is not None else None
+
+        # Avec plus d'un worker, les coups de la racine sont cherchés dans des processus
+        self.workers = workers
+        self._pool = None
+        if workers > 1:
+            self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker)
+            self._pool.submit(int).result()
         
         
 
@@ -25,154 +107,422 @@ class Agent:
             [3, 4, 5, 7, 5, 4, 3]   
         ])
 
+        # Heatmap par colonne : pour chaque motif de 6 bits, somme des poids des cases occupées
+        self._column_heat = []
+        for col in range(COLS):
+            weights = [int(self.evaluation_table[ROWS - 1 - h, col]) for h in range(ROWS)]
+            table = [sum(w for h, w in enumerate(weights) if pattern >> h & 1) for pattern in range(1 << ROWS)]
+            self._column_heat.append(table)
+
+        # Tables de l'évaluation incrémentale (mêmes poids que _evaluate)
+        self._window_scores = [[self._score_window(us, them) if us + them <= 4 else 0 for them in range(5)]
+                               for us in range(5)]
+        cell_heat = [0] * (COLS * H1)
+        for col in range(COLS):
+            for h in range(ROWS):
+                cell_heat[col * H1 + h] = int(self.evaluation_table[ROWS - 1 - h, col])
+        self._cell_scores = (cell_heat, [-w for w in cell_heat])
+
     def choose_action(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
-        start_time = time.time()
+        start_time = time.monotonic()
+        stats = self.stats
+        if stats is not None:
+            stats.start()
 
-        if isinstance(observation, dict) and "observation" in observation:
-            board = observation["observation"]
-        else:
-            board = observation
+        pos = Position.from_observation(observation)
+
+        if self.book is not None:
+            book_move = self.book.probe(pos)
+            if book_move is not None: return SearchStats.end_move(self, book_move, "book")
+            if stats is not None:
+                stats.phase("book")
 
         if action_mask is not None:
             valid_actions = [i for i, valid in enumerate(action_mask) if valid == 1]
         else:
-            valid_actions = self._get_valid_moves(board)
+            valid_actions = pos.valid_moves()
 
  
        
-        winning = self._find_winning_move(board, valid_actions, 0)
-        if winning is not None: return winning
+        winning = self._find_winning_move(pos, valid_actions, 0)
+        if winning is not None: return SearchStats.end_move(self, winning, "tactic")
 
         
-        blocking = self._find_winning_move(board, valid_actions, 1)
-        if blocking is not None: return blocking
+        blocking = self._find_winning_move(pos, valid_actions, 1)
+        if blocking is not None: return SearchStats.end_move(self, blocking, "tactic")
 
        
-        safe_actions = []
-        for col in valid_actions:
-            if not self._gives_opponent_win(board, col, 0):
-                safe_actions.append(col)
+        # Un coup sous une menace adverse lui donne la victoire (cartes des menaces, voir bitboard.py)
+        unsafe = pos.unsafe_moves(0)
+        safe_actions = [col for col in valid_actions if not unsafe & COLUMN_MASKS[col]]
         
         candidates = safe_actions if safe_actions else valid_actions
+        # Position symétrique : un coup et son symétrique se valent, un seul des deux est cherché
+        candidates = pos.distinct_moves(candidates)
 
        
         for col in candidates:
-            if self._move_creates_double_threat(board, col, 0): return col
+            if pos.creates_double_threat(col, 0): return SearchStats.end_move(self, col, "tactic")
         for col in candidates:
-            if self._move_creates_double_threat(board, col, 1): return col
+            if pos.creates_double_threat(col, 1): return SearchStats.end_move(self, col, "tactic")
 
   
         center_col = 3
         candidates.sort(key=lambda x: abs(x - center_col))
         best_move = candidates[0] if candidates else 0
-
+        if stats is not None:
+            stats.phase("tactic")
+
+        # Fin de partie : un résultat prouvé (victoire ou nul) est joué sans approfondissement.
+        # Le solveur a la moitié du temps ; s'il n'a pas fini, la recherche habituelle prend le reste
+        used = 0
+        if ROWS * COLS - pos.moves <= self.solver_empty:
+            deadline = start_time + self.time_limit / 2
+            solver_budget = None if self.node_budget is None else self.node_budget // 2
+            try:
+                # Sur une copie : une interruption laisse des coups joués
+                value, move = self._solve_root(pos.copy(), candidates, deadline, solver_budget)
+            except TimeoutError:
+                value = None
+            used = self._poller.counted()
+            if stats is not None:
+                stats.current["solver_nodes"] = used
+            if value is not None and value != SOLVE_LOSS:
+                if stats is not None:
+                    stats.current["score"] = value
+                return SearchStats.end_move(self, move, "solver")
+            if stats is not None:
+                stats.phase("solver")
+
+        # Score de la position tenu à jour à chaque coup joué / annulé pendant la recherche
+        self._evaluator = IncrementalEvaluator(self._window_scores, self._cell_scores, pos.boards)
+        if stats is not None:
+            self._search_stats[:] = [0, 0, 0]
+            stats.current.update(depth=0, score=None, nodes=0)
+
+        self._age_move_ordering()
+
+        # Une profondeur n'est commencée que si son coût prévu tient dans le temps restant
+        timer = IterationTimer(self.time_limit, start_time)
+        self._poller.start(timer.deadline, None if self.node_budget is None else self.node_budget - used)
         try:
             for depth in range(1, 43): 
-                current_duration = time.time() - start_time
-                if current_duration > 0.01:
-                    if current_duration + (current_duration * 6) > self.time_limit:
-                        break 
-
-                best_val = float('-inf')
-                best_move_depth = candidates[0]
-                
-                for action in candidates:
-                    if time.time() - start_time > self.time_limit:
-                        raise TimeoutError()
-
-                    new_board = self._simulate_move(board, action, 0)
-                    val = self._minimax(new_board, depth - 1, float('-inf'), float('inf'), False, start_time)
-                    
-                    if val > best_val:
-                        best_val = val
-                        best_move_depth = action
-                
-                best_move = best_move_depth
-                
+                if self.node_budget is None and not timer.next_iteration_fits():
+                    break
+                iteration_start = time.monotonic()
+
+                if self._pool is not None and self.node_budget is None and depth >= PARALLEL_MIN_DEPTH:
+                    best_val, best_move = self._search_depth_parallel(pos, candidates, depth)
+                else:
+                    best_val, best_move = self._search_depth(pos, candidates, depth)
+                timer.record(time.monotonic() - iteration_start)
+
+                if stats is not None:
+                    stats.current.update(depth=depth, score=best_val, nodes=self._poller.counted())
                 if best_val > 900000: break
 
-        except TimeoutError:
-            pass 
-            
-        return best_move
+                # Le meilleur coup de cette profondeur est cherché en premier à la suivante
+                candidates.remove(best_move)
+                candidates.insert(0, best_move)
+
+        except TimeoutError as timeout:
+            # Itération interrompue après son premier coup : son meilleur coup partiel est gardé
+            if timeout.args:
+                best_val, best_move = timeout.args
+                if stats is not None:
+                    stats.current["score"] = best_val
+            if stats is not None:
+                stats.current["nodes"] = self._poller.counted()
 
-    def _minimax(self, board, depth, alpha, beta, maximizing, start_time):
-        if (time.time() - start_time) > self.time_limit:
+        if stats is not None:
+            stats.record_counters(self._search_stats, pv=[best_move])
+        return SearchStats.end_move(self, best_move, "search")
+
+    def _search_depth(self, pos, candidates, depth):
+        """
+        Une itération de l'approfondissement : (meilleure valeur, meilleur coup) à la profondeur depth.
+        Si le temps s'écoule après le premier coup (le meilleur de l'itération précédente), lève
+        TimeoutError(meilleure valeur, meilleur coup) parmi les coups déjà cherchés : le coup rendu
+        vaut au moins le précédent. Avant, lève TimeoutError() ; pos n'est alors plus à jour.
+        """
+        best_val = float('-inf')
+        best_move = candidates[0]
+
+        for action in candidates:
+            try:
+                if self._poller.exhausted():
+                    raise TimeoutError()
+
+                self._play(pos, action, 0)
+                if action == candidates[0]:
+                    val = self._minimax(pos, depth - 1, float('-inf'), float('inf'), False)
+                else:
+                    # PVS : fenêtre nulle, le coup n'est re-cherché que s'il fait mieux
+                    val = self._minimax(pos, depth - 1, best_val, best_val + 1, False)
+                    if val > best_val:
+                        # Prouvé meilleur : retenu même si la re-recherche est interrompue
+                        best_val, best_move = val, action
+                        val = self._minimax(pos, depth - 1, val, float('inf'), False)
+                self._undo(pos, action)
+            except TimeoutError:
+                if action != candidates[0]:
+                    raise TimeoutError(best_val, best_move)
+                raise
+
+            if val > best_val or action == best_move:
+                best_val = val
+                best_move = action
+        return best_val, best_move
+
+    def _search_depth_parallel(self, pos, candidates, depth):
+        """
+        Young brothers wait à la racine : le premier coup est cherché ici avec une fenêtre
+        complète, puis les suivants sont répartis entre les processus avec sa valeur comme
+        alpha. Le résultat est celui de la boucle séquentielle, coup pour coup. Interrompue,
+        l'itération lève TimeoutError comme _search_depth.
+        """
+        best_move = candidates[0]
+        best_val = self._search_move(pos, best_move, depth, float('-inf'))
+
+        futures = [(action, self._pool.submit(_search_root_move, pos.boards, pos.heights, action, depth,
+                                              best_val, self._poller.deadline))
+                   for action in candidates[1:]]
+        try:
+            for action, future in futures:
+                val = future.result()
+                if val is None:
+                    raise TimeoutError(best_val, best_move)
+                if val > best_val:
+                    best_val = val
+                    best_move = action
+        finally:
+            for action, future in futures:
+                future.cancel()
+        return best_val, best_move
+
+    def _search_move(self, pos, action, depth, alpha):
+        """Valeur du coup action de la racine (au plus alpha si le coup ne fait pas mieux)."""
+        self._play(pos, action, 0)
+        val = self._minimax(pos, depth - 1, alpha, float('inf'), False)
+        self._undo(pos, action)
+        return val
+
+    def close(self):
+        """Arrête les processus de la recherche parallèle."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _minimax(self, pos, depth, alpha, beta, maximizing):
+        """
+        Minimax alpha-bêta du point de vue du canal 0. Les coups sont joués puis annulés
+        sur place (bitboard, hauteur, compteurs de l'évaluation), sans passer par
+        Position.play / undo : le canal est connu et pos.turn n'est pas tenu à jour dans l'arbre.
+        """
+        poller = self._poller
+        poller.countdown -= 1
+        if poller.countdown <= 0 and poller.poll():
             raise TimeoutError()
 
-        if self._check_win(board, 0): return 1000000 + depth
-        if self._check_win(board, 1): return -1000000 - depth
+        # Seul le joueur qui vient de jouer peut avoir aligné 4 pions
+        boards = pos.boards
+        if maximizing:
+            if has_four(boards[1]): return -1000000 - depth
+        elif has_four(boards[0]): return 1000000 + depth
 
-        valid_moves = self._get_valid_moves(board)
+        valid_moves = PLAYABLE[(boards[0] | boards[1]) & TOP_MASK]
         if depth == 0 or not valid_moves:
-            return self._evaluate(board)
-            
-        center = 3
-        valid_moves.sort(key=lambda x: abs(x - center))
-
+            if self._search_stats is not None:
+                self._search_stats[STAT_EVALS] += 1
+            return self._evaluator.score
+        channel = 0 if maximizing else 1
+        if depth >= ORDER_MIN_DEPTH:
+            valid_moves = self._order_moves(pos, valid_moves, channel)
+
+        heights = pos.heights
+        evaluator = self._evaluator
+        # PVS : le premier coup en fenêtre pleine, les suivants en fenêtre nulle,
+        # re-cherchés seulement s'ils tombent dans la fenêtre
         if maximizing:
             max_eval = float('-inf')
             for col in valid_moves:
-                new_board = self._simulate_move(board, col, 0)
-                score = self._minimax(new_board, depth - 1, alpha, beta, False, start_time)
-                max_eval = max(max_eval, score)
-                alpha = max(alpha, score)
-                if beta <= alpha: break
+                index = col * H1 + heights[col]
+                evaluator.add(index, 0)
+                boards[0] |= 1 << index
+                heights[col] += 1
+                pos.moves += 1
+                if max_eval == float('-inf'):
+                    score = self._minimax(pos, depth - 1, alpha, beta, False)
+                else:
+                    score = self._minimax(pos, depth - 1, alpha, alpha + 1, False)
+                    if alpha < score < beta:
+                        score = self._minimax(pos, depth - 1, score, beta, False)
+                pos.moves -= 1
+                heights[col] -= 1
+                boards[0] ^= 1 << index
+                evaluator.remove(index, 0)
+                if score > max_eval: max_eval = score
+                if score > alpha: alpha = score
+                if beta <= alpha:
+                    if depth >= ORDER_MIN_DEPTH: self._record_cutoff(pos, col, depth, 0)
+                    if self._search_stats is not None: self._search_stats[STAT_CUTOFFS] += 1
+                    break
             return max_eval
         else:
             min_eval = float('inf')
             for col in valid_moves:
-                new_board = self._simulate_move(board, col, 1)
-                score = self._minimax(new_board, depth - 1, alpha, beta, True, start_time)
-                min_eval = min(min_eval, score)
-                beta = min(beta, score)
-                if beta <= alpha: break
+                index = col * H1 + heights[col]
+                evaluator.add(index, 1)
+                boards[1] |= 1 << index
+                heights[col] += 1
+                pos.moves += 1
+                if min_eval == float('inf'):
+                    score = self._minimax(pos, depth - 1, alpha, beta, True)
+                else:
+                    score = self._minimax(pos, depth - 1, beta - 1, beta, True)
+                    if alpha < score < beta:
+                        score = self._minimax(pos, depth - 1, alpha, score, True)
+                pos.moves -= 1
+                heights[col] -= 1
+                boards[1] ^= 1 << index
+                evaluator.remove(index, 1)
+                if score < min_eval: min_eval = score
+                if score < beta: beta = score
+                if beta <= alpha:
+                    if depth >= ORDER_MIN_DEPTH: self._record_cutoff(pos, col, depth, 1)
+                    if self._search_stats is not None: self._search_stats[STAT_CUTOFFS] += 1
+                    break
             return min_eval
 
+    def _order_moves(self, pos, moves, channel):
+        """Killers du demi-coup d'abord, puis du centre vers les bords (l'historique départage les symétriques)."""
+        history = self._history[channel]
+        heights = pos.heights
+        moves = sorted(moves, key=lambda col: (CENTER_RANK[col], -history[col * H1 + heights[col]]))
+        for killer in reversed(self._killers[pos.moves]):
+            if killer in moves:
+                moves.remove(killer)
+                moves.insert(0, killer)
+        return moves
+
+    def _record_cutoff(self, pos, col, depth, channel):
+        """Le coup col a provoqué une coupure : il devient le premier killer du demi-coup et gagne en historique."""
+        killers = self._killers[pos.moves]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self._history[channel][col * H1 + pos.heights[col]] += depth * depth
+
+    def _age_move_ordering(self):
+        """Entre deux coups : l'historique est divisé par 4 (les killers, indexés par demi-coup de la partie, restent)."""
+        for history in self._history:
+            for index, value in enumerate(history):
+                history[index] = value >> 2
+
+
+    def _solve_root(self, pos, candidates, deadline, node_limit=None):
+        """
+        Résout la position : (valeur, coup) pour l'agent, parmi les coups candidats.
+        Deux passes à fenêtre nulle : un coup gagne-t-il ? sinon, un coup tient-il le nul ?
+        """
+        if len(self._solver_table) > SOLVER_TABLE_MAX:
+            self._solver_table.clear()
+        self._poller.start(deadline, node_limit)
+        for target in (SOLVE_WIN, SOLVE_DRAW):
+            for col in candidates:
+                if pos.is_winning_move(col, 0): return SOLVE_WIN, col
+                pos.play(col, 0)
+                value = -self._solve(pos, -target, -target + 1)
+                pos.undo(col)
+                if value >= target: return target, col
+        return SOLVE_LOSS, candidates[0]
+
+    def _solve(self, pos, alpha, beta):
+        """
+        Recherche exacte victoire / nul / défaite du joueur au trait (alpha-bêta sur {-1, 0, 1}).
+        La table garde les bornes prouvées d'un coup à l'autre.
+        """
+        poller = self._poller
+        poller.countdown -= 1
+        if poller.countdown <= 0 and poller.poll():
+            raise TimeoutError()
+
+        channel = pos.turn
+        boards = pos.boards
+        mask = boards[0] | boards[1]
+        moves = PLAYABLE[mask & TOP_MASK]
+        if not moves: return SOLVE_DRAW
+        possible = possible_moves(mask)
+        if winning_cells(boards[channel], mask) & possible: return SOLVE_WIN
+
+        # Une menace adverse doit être bloquée ; deux ne peuvent pas l'être. Jouer
+        # juste sous une menace adverse la lui donne : ces coups sont écartés
+        threats = winning_cells(boards[1 - channel], mask)
+        forced = threats & possible
+        if forced:
+            if forced & (forced - 1): return SOLVE_LOSS
+            possible = forced
+        possible &= ~(threats >> 1)
+        if not possible: return SOLVE_LOSS
+
+        key = (pos.boards[channel], pos.boards[1 - channel])
+        entry = self._solver_table.get(key)
+        if entry is not None:
+            flag, value = entry
+            if flag == SOLVE_EXACT: return value
+            if flag == SOLVE_LOWER and value >= beta: return value
+            if flag == SOLVE_UPPER and value <= alpha: return value
+
+        alpha_orig = alpha
+        best = SOLVE_LOSS
+        for col in moves:
+            if not possible & COLUMN_MASKS[col]: continue
+            pos.play(col, channel)
+            value = -self._solve(pos, -beta, -alpha)
+            pos.undo(col)
+            best = max(best, value)
+            alpha = max(alpha, value)
+            if alpha >= beta: break
+
+        if best <= alpha_orig: flag = SOLVE_UPPER
+        elif best >= beta: flag = SOLVE_LOWER
+        else: flag = SOLVE_EXACT
+        self._solver_table[key] = (flag, best)
+        return best
+
+    def _play(self, pos, col, channel):
+        self._evaluator.add(col * H1 + pos.heights[col], channel)
+        pos.play(col, channel)
+
+    def _undo(self, pos, col):
+        pos.undo(col)
+        # Après undo, turn est le canal du pion retiré
+        self._evaluator.remove(col * H1 + pos.heights[col], pos.turn)
+
   
 
-    def _evaluate(self, board):
+    def _evaluate(self, pos):
+        """Évaluation complète (référence de l'évaluation incrémentale)."""
+        us, them = pos.boards
         score = 0
-        player = 0
-        opp = 1
-        
-  
-        my_pieces = (board[:, :, player] == 1)
-        opp_pieces = (board[:, :, opp] == 1)
-        
-        score += np.sum(self.evaluation_table * my_pieces)
-        score -= np.sum(self.evaluation_table * opp_pieces)
 
+        for col in range(COLS):
+            shift = col * H1
+            score += self._column_heat[col][(us >> shift) & 0x3F]
+            score -= self._column_heat[col][(them >> shift) & 0x3F]
 
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                window = board[r, c:c+4, :]
-                score += self._score_window(window, player, opp)
-    
-        for r in range(self.rows - 3):
-            for c in range(self.cols):
-                window = board[r:r+4, c, :]
-                score += self._score_window(window, player, opp)
-      
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                w1 = np.array([board[r+i, c+i, :] for i in range(4)])
-                score += self._score_window(w1, player, opp)
-                
-                w2 = np.array([board[r+3-i, c+i, :] for i in range(4)])
-                score += self._score_window(w2, player, opp)
+        for window in WINDOWS:
+            score += self._score_window(bin(us & window).count("1"), bin(them & window).count("1"))
 
         return score
 
-    def _score_window(self, window, player, opp):
+    def _score_window(self, us, them):
         """
-        Calcule le score d'une fenêtre de 4 cases.
+        Calcule le score d'une fenêtre de 4 cases à partir du nombre de pions de chaque joueur.
         Poids basés sur la littérature Connect 4.
         """
         score = 0
-        us = np.count_nonzero(window[:, player] == 1)
-        them = np.count_nonzero(window[:, opp] == 1)
-        empty = np.count_nonzero((window[:, 0] == 0) & (window[:, 1] == 0)) 
+        empty = 4 - us - them
 
     
         if us == 4: score += 1000000
@@ -188,90 +538,11 @@ class Agent:
         return score
 
  
-    def _find_winning_move(self, board, valid_actions, channel):
-        for col in valid_actions:
-            row = self._get_next_row(board, col)
-            if row is not None:
-                if self._check_win_from_position(board, row, col, channel):
+    def _find_winning_move(self, pos, valid_actions, channel):
+        """Premier coup de valid_actions qui donne tout de suite la victoire à channel."""
+        wins = pos.winning_moves(channel)
+        if wins:
+            for col in valid_actions:
+                if wins & COLUMN_MASKS[col]:
                     return col
         return None
-
-    def _gives_opponent_win(self, board, col, channel):
-        my_row = self._get_next_row(board, col)
-        if my_row is None: return False
-        opp_row = my_row - 1
-        if opp_row < 0: return False
-        
-        
-        board[my_row, col, channel] = 1
-        opponent = 1 - channel
-        gives_win = self._check_win_from_position(board, opp_row, col, opponent)
-        board[my_row, col, channel] = 0
-        return gives_win
-
-    def _move_creates_double_threat(self, board, col, channel):
-        temp_board = board.copy()
-        row = self._get_next_row(temp_board, col)
-        if row is None: return False
-        temp_board[row, col, channel] = 1
-        
-        threats = 0
-        valid = self._get_valid_moves(temp_board)
-        for c in valid:
-            r = self._get_next_row(temp_board, c)
-            if r is not None and self._check_win_from_position(temp_board, r, c, channel):
-                threats += 1
-        return threats >= 2
-
-    def _simulate_move(self, board, col, channel):
-        new_board = board.copy()
-        for r in range(self.rows - 1, -1, -1):
-            if new_board[r, col, 0] == 0 and new_board[r, col, 1] == 0:
-                new_board[r, col, channel] = 1
-                break
-        return new_board
-
-    def _get_valid_moves(self, board):
-        valid = []
-        for c in range(self.cols):
-            if board[0, c, 0] == 0 and board[0, c, 1] == 0:
-                valid.append(c)
-        return valid
-
-    def _get_next_row(self, board, col):
-        for r in range(self.rows - 1, -1, -1):
-            if board[r, col, 0] == 0 and board[r, col, 1] == 0:
-                return r
-        return None
-
-    def _check_win_from_position(self, board, row, col, channel):
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for dr, dc in directions:
-            count = 1
-            r, c = row + dr, col + dc
-            while 0 <= r < self.rows and 0 <= c < self.cols and board[r, c, channel] == 1:
-                count += 1
-                r += dr
-                c += dc
-            r, c = row - dr, col - dc
-            while 0 <= r < self.rows and 0 <= c < self.cols and board[r, c, channel] == 1:
-                count += 1
-                r -= dr
-                c -= dc
-            if count >= 4: return True
-        return False
-
-    def _check_win(self, board, channel):
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                if np.all(board[r, c:c+4, channel] == 1): return True
-        for r in range(self.rows - 3):
-            for c in range(self.cols):
-                if np.all(board[r:r+4, c, channel] == 1): return True
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                if all(board[r+i, c+i, channel] == 1 for i in range(4)): return True
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                if all(board[r-i, c+i, channel] == 1 for i in range(4)): return True
-        return False
\ No newline at end of file
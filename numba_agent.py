@@ -1,41 +1,83 @@
 from numba import njit 
 import numpy as np
+import threading
 import time
-from numba import njit
+from concurrent.futures import ThreadPoolExecutor
+import bitboard
+from bitboard import Position, ROWS, H1, CENTER_ORDER
+from opening_book import OpeningBook
+from search_stats import SearchStats, STAT_CUTOFFS, STAT_TT_HITS, STAT_EVALS
+from time_manager import IterationTimer
 
+# Versions compilées des primitives bitboard partagées
+bb_has_four = njit(cache=True)(bitboard.has_four)
+bb_popcount = njit(cache=True)(bitboard.popcount)
+bb_possible_moves = njit(cache=True)(bitboard.possible_moves)
+bb_winning_cells = njit(cache=True)(bitboard.winning_cells)
 
-@njit(fastmath=True, cache=True)
-def fast_check_win(board, player):
-    """
-    Vérification de victoire ultra-rapide (JIT compiled).
-    Ne vérifie que pour le joueur spécifié.
-    """
-    for r in range(6):
-        for c in range(4):
-            if (board[r, c, player] == 1 and board[r, c+1, player] == 1 and
-                board[r, c+2, player] == 1 and board[r, c+3, player] == 1):
-                return True
-    
-    for r in range(3):
-        for c in range(7):
-            if (board[r, c, player] == 1 and board[r+1, c, player] == 1 and
-                board[r+2, c, player] == 1 and board[r+3, c, player] == 1):
-                return True
-                
-    for r in range(3):
-        for c in range(4):
-            if (board[r, c, player] == 1 and board[r+1, c+1, player] == 1 and
-                board[r+2, c+2, player] == 1 and board[r+3, c+3, player] == 1):
-                return True
+WINDOW_MASKS = np.array(bitboard.WINDOWS, dtype=np.int64)
+CENTER_MASK = bitboard.COLUMN_MASKS[3]
+
+# Table de transposition : 2**TT_BITS entrées de 16 octets, indexées par hachage de Zobrist
+TT_BITS = 20
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_DTYPE = np.dtype([
+    ("key", np.int64),
+    ("score", np.int32),
+    ("depth", np.int8),
+    ("flag", np.int8),
+    ("move", np.int8),
+    ("age", np.uint8),
+])
+
+# Une clé aléatoire par (canal, bit) ; graine fixe pour des recherches reproductibles
+ZOBRIST = np.random.default_rng(4).integers(1, 2**63 - 1, size=(2, bitboard.COLS * H1), dtype=np.int64)
+_ZOBRIST_KEYS = ZOBRIST.tolist()
+# Ajouté à la clé quand le canal 1 est au trait : une même position peut survenir avec
+# l'un ou l'autre au trait selon la couleur de l'agent, et les tables servent d'une partie à l'autre
+ZOBRIST_TURN = int(np.random.default_rng(5).integers(1, 2**63 - 1))
+# Clés du symétrique : un pion en (col, h) y compte comme un pion en (6 - col, h). La clé
+# du symétrique suit celle de la position coup par coup ; la table de transposition range
+# les deux sous la plus petite, le coup gardé étant retourné pour la forme miroir
+MIRROR_INDEX = np.array([bitboard.mirror_move(index // H1) * H1 + index % H1 for index in range(bitboard.COLS * H1)],
+                        dtype=np.int64)
+ZOBRIST_MIRROR = ZOBRIST[:, MIRROR_INDEX].copy()
+
+# Recherche compilée. Numba ne sait pas recharger depuis le cache une fonction
+# récursive : negamax et search_root sont donc recompilés à chaque processus
+# (quelques secondes, voir start_warm_up).
+WIN_SCORE = 100000
+SCORE_INF = 1 << 30
+MOVE_ORDER = np.array(CENTER_ORDER, dtype=np.int64)
+# Ordre des coups : coup de la table, puis les deux coups meurtriers (killers) du
+# demi-coup, puis du centre vers les bords, l'historique des coupures départageant
+# les colonnes symétriques. Killers et historique partagent un seul tableau plat :
+# chaque tableau passé en argument ralentit sensiblement la récursion compilée
+MAX_PLY = 43
+HISTORY = 2 * MAX_PLY
+HISTORY_SIZE = 2 * bitboard.COLS * H1
+# Pilotes de l'approfondissement : fenêtre pleine, fenêtre d'aspiration de
+# ±ASPIRATION_WINDOW autour du score de l'itération précédente (élargie 4 fois
+# plus du côté d'un échec), ou MTD(f)
+SEARCH_DRIVERS = ("full", "aspiration", "mtdf")
+ASPIRATION_WINDOW = 100
+# Juste au-dessus des feuilles, l'ordre statique suffit : killers et historique y coûtent plus qu'ils ne gagnent
+ORDER_MIN_DEPTH = 2
+# Résolution exacte de fin de partie : valeur pour le joueur au trait
+SOLVE_WIN, SOLVE_DRAW, SOLVE_LOSS = 1, 0, -1
+SOLVER_TT_BITS = 20
+COLUMN_MASKS = np.array(bitboard.COLUMN_MASKS, dtype=np.int64)
+
+# Compteurs partagés avec la recherche : noeuds visités, budget de noeuds, interruption,
+# demande d'arrêt venue d'un autre thread (non remise à zéro par search_root)
+NODES, BUDGET, ABORTED, STOP = 0, 1, 2, 3
+# Budget d'une recherche chronométrée : c'est le minuteur (arm_stop) qui l'arrête
+NO_NODE_BUDGET = 1 << 62
+# Statistiques facultatives de la recherche (tableau stats indexé par STAT_*, ou None : rien n'est compté)
 
-    for r in range(3, 6):
-        for c in range(4):
-            if (board[r, c, player] == 1 and board[r-1, c+1, player] == 1 and
-                board[r-2, c+2, player] == 1 and board[r-3, c+3, player] == 1):
-                return True
-                
-    return False
 
+# Heuristique sur le tenseur de l'observation : l'agent ne s'en sert plus, elle reste la
+# référence de bb_evaluate et de batch_evaluation
 @njit(fastmath=True, cache=True)
 def fast_evaluate(board, player_idx):
     """
@@ -107,171 +149,854 @@ def fast_evaluate(board, player_idx):
 
     return score
 
-@njit(fastmath=True, cache=True)
-def fast_get_valid_moves(board):
-    """Retourne un tableau booléen des coups valides [True, True, False...]"""
-    valid = np.zeros(7, dtype=np.int8)
-    for c in range(7):
-        if board[0, c, 0] == 0 and board[0, c, 1] == 0:
-            valid[c] = 1
-    return valid
+
+def _window_score(n_us, n_them):
+    """Poids d'une fenêtre de 4 cases (mêmes règles que fast_evaluate)."""
+    if n_us == 3 and n_them == 0: return 5
+    elif n_us == 2 and n_them == 0: return 2
+    elif n_them == 3 and n_us == 0: return -1000
+    elif n_them == 2 and n_us == 0: return -10
+    return 0
+
+
+# Tables de l'évaluation, du point de vue de l'agent (canal 0)
+WINDOW_SCORES = np.array([[_window_score(n_us, n_them) for n_them in range(5)] for n_us in range(5)],
+                         dtype=np.int64)
+EVAL_DELTAS = np.array(bitboard.window_deltas(WINDOW_SCORES.tolist()), dtype=np.int64)
+CELL_SCORES = np.zeros((2, bitboard.COLS * H1), dtype=np.int64)
+for _h in range(ROWS):
+    CELL_SCORES[0, 3 * H1 + _h] = 3
+CELL_WINDOW_COUNTS = np.array([len(w) for w in bitboard.CELL_WINDOWS], dtype=np.int64)
+CELL_WINDOW_TABLE = np.full((bitboard.COLS * H1, CELL_WINDOW_COUNTS.max()), -1, dtype=np.int64)
+for _index, _windows in enumerate(bitboard.CELL_WINDOWS):
+    CELL_WINDOW_TABLE[_index, :len(_windows)] = _windows
+
 
 @njit(fastmath=True, cache=True)
-def fast_simulate_move(board, col, player):
+def bb_evaluate(us, them):
     """
-    Applique la gravité et retourne un NOUVEAU plateau.
+    Même heuristique que fast_evaluate, calculée sur les bitboards.
+    us : pions du joueur évalué, them : pions adverses.
     """
-    new_board = board.copy()
-    for r in range(5, -1, -1):
-        if new_board[r, col, 0] == 0 and new_board[r, col, 1] == 0:
-            new_board[r, col, player] = 1
+    score = bb_popcount(us & CENTER_MASK) * 3
+
+    for i in range(WINDOW_MASKS.shape[0]):
+        window = WINDOW_MASKS[i]
+        score += WINDOW_SCORES[bb_popcount(us & window), bb_popcount(them & window)]
+
+    return score
+
+
+@njit(cache=True)
+def line_counts(us, them):
+    """Nombre de pions de chaque canal dans chacune des 69 fenêtres."""
+    counts = np.zeros((2, WINDOW_MASKS.shape[0]), dtype=np.int8)
+    for i in range(WINDOW_MASKS.shape[0]):
+        counts[0, i] = bb_popcount(us & WINDOW_MASKS[i])
+        counts[1, i] = bb_popcount(them & WINDOW_MASKS[i])
+    return counts
+
+
+@njit(cache=True)
+def add_piece(counts, index, channel):
+    """
+    Pose un pion de channel sur le bit index dans les compteurs de fenêtres.
+    Retourne la variation de bb_evaluate (canal 0 contre canal 1).
+    """
+    delta = CELL_SCORES[channel, index]
+    for k in range(CELL_WINDOW_COUNTS[index]):
+        w = CELL_WINDOW_TABLE[index, k]
+        n = counts[channel, w]
+        delta += EVAL_DELTAS[channel, n, counts[1 - channel, w]]
+        counts[channel, w] = n + 1
+    return delta
+
+
+@njit(cache=True)
+def remove_piece(counts, index, channel):
+    """Annule add_piece (le score, passé par valeur, n'a pas à être corrigé)."""
+    for k in range(CELL_WINDOW_COUNTS[index]):
+        counts[channel, CELL_WINDOW_TABLE[index, k]] -= 1
+
+
+def new_transposition_table(bits=TT_BITS):
+    """Alloue une table vide (profondeur -1 = case libre)."""
+    table = np.zeros(1 << bits, dtype=TT_DTYPE)
+    table["depth"] = -1
+    return table
+
+
+def new_move_ordering():
+    """
+    Tables de l'ordre des coups, gardées d'une itération à l'autre : deux coups meurtriers
+    par demi-coup depuis la racine (ordering[2 * ply + k], -1 = vide), puis l'historique
+    des coupures par (canal, case) (ordering[HISTORY + canal * 49 + case]).
+    """
+    ordering = np.zeros(HISTORY + HISTORY_SIZE, dtype=np.int64)
+    ordering[:HISTORY] = -1
+    return ordering
+
+
+def age_move_ordering(ordering):
+    """Entre deux coups : les killers (relatifs à l'ancienne racine) sont effacés, l'historique divisé par 4."""
+    ordering[:HISTORY] = -1
+    ordering[HISTORY:] >>= 2
+
+
+def zobrist_key(pos):
+    """Hachage de Zobrist complet d'une position (mis à jour ensuite coup par coup)."""
+    key = 0
+    for channel in range(2):
+        bb = pos.boards[channel]
+        while bb:
+            low = bb & -bb
+            key ^= _ZOBRIST_KEYS[channel][low.bit_length() - 1]
+            bb ^= low
+    return key
+
+
+@njit(cache=True)
+def mirror_zobrist_key(current, opponent):
+    """Clé de Zobrist du symétrique de la position (current : canal 0, opponent : canal 1)."""
+    key = 0
+    for index in range(bitboard.COLS * H1):
+        if (current >> index) & 1:
+            key ^= ZOBRIST_MIRROR[0, index]
+        elif (opponent >> index) & 1:
+            key ^= ZOBRIST_MIRROR[1, index]
+    return key
+
+
+def principal_variation(table, pos, key, first_move):
+    """
+    Variante principale : first_move puis, tant que la table les connaît, les
+    meilleurs coups enregistrés pour chaque position (le canal 0 joue en premier).
+    """
+    pos = pos.copy()
+    pv = []
+    move = first_move
+    while move >= 0 and pos.can_play(move):
+        channel = len(pv) % 2
+        index = move * H1 + pos.heights[move]
+        won = pos.is_winning_move(move, channel)
+        pos.play(move, channel)
+        pv.append(int(move))
+        key ^= _ZOBRIST_KEYS[channel][index]
+        if won:
+            break
+        mirror_key = mirror_zobrist_key(pos.boards[0], pos.boards[1])
+        entry_key = min(key, mirror_key)
+        if len(pv) % 2:
+            entry_key ^= ZOBRIST_TURN
+        entry = table[entry_key & (len(table) - 1)]
+        move = int(entry["move"]) if entry["key"] == entry_key and entry["depth"] >= 0 else -1
+        if move >= 0 and mirror_key < key:
+            move = bitboard.mirror_move(move)
+    return pv
+
+
+@njit(cache=True)
+def tt_probe(table, key, depth, alpha, beta):
+    """
+    Cherche la position dans la table.
+    Retourne (coupure, score, coup) : coupure vaut True si l'entrée suffit à
+    conclure pour cette fenêtre ; coup vaut -1 si la position est absente.
+    """
+    index = key & (table.shape[0] - 1)
+    if table[index]["key"] != key or table[index]["depth"] < 0:
+        return False, 0, -1
+
+    move = table[index]["move"]
+    if table[index]["depth"] >= depth:
+        score = table[index]["score"]
+        flag = table[index]["flag"]
+        if flag == TT_EXACT:
+            return True, score, move
+        if flag == TT_LOWER and score >= beta:
+            return True, score, move
+        if flag == TT_UPPER and score <= alpha:
+            return True, score, move
+    return False, 0, move
+
+
+@njit(cache=True)
+def tt_store(table, key, depth, flag, score, move, age):
+    """
+    Enregistre un résultat. Remplacement « profondeur d'abord » avec vieillissement :
+    on écrase si la case est libre, contient la même position, date d'un coup
+    précédent (age différent) ou a été cherchée moins profondément.
+    """
+    index = key & (table.shape[0] - 1)
+    if (table[index]["key"] == key or table[index]["age"] != age
+            or depth >= table[index]["depth"]):
+        table[index]["key"] = key
+        table[index]["score"] = score
+        table[index]["depth"] = depth
+        table[index]["flag"] = flag
+        table[index]["move"] = move
+        table[index]["age"] = age
+
+
+@njit(cache=False, nogil=True)
+def negamax(current, opponent, heights, counts, score, key, mirror_key, depth, ply, alpha, beta, table, age, ordering,
+            counters, stats):
+    """
+    Alpha-bêta en négamax, entièrement compilé.
+    current / opponent : bitboards du joueur au trait et de son adversaire.
+    heights, counts : hauteurs des colonnes et compteurs de fenêtres (modifiés puis restaurés sur place).
+    score : évaluation incrémentale de la position, du point de vue de l'agent.
+    key, mirror_key : clés de Zobrist de la position et de son symétrique.
+    ply : demi-coups depuis la racine (pair = l'agent est au trait).
+    ordering : killers et historique (new_move_ordering), mis à jour à chaque coupure.
+    Retourne le score du point de vue du joueur au trait. Si le budget de
+    noeuds est épuisé ou l'arrêt demandé, counters[ABORTED] passe à 1 et le
+    score n'a pas de sens.
+    stats : tableau de statistiques (STAT_*) ou None ; avec None, Numba compile
+    une version sans les compteurs.
+    """
+    counters[NODES] += 1
+    if counters[NODES] >= counters[BUDGET] or counters[STOP]:
+        counters[ABORTED] = 1
+        return 0
+
+    if bb_has_four(opponent):
+        return -(WIN_SCORE + depth)
+
+    # L'heuristique est toujours celle de l'agent (canal 0)
+    if depth == 0:
+        if stats is not None:
+            stats[STAT_EVALS] += 1
+        if ply % 2 == 0:
+            return score
+        return -score
+
+    has_move = False
+    for col in range(7):
+        if heights[col] < ROWS:
+            has_move = True
+            break
+    if not has_move: # Match nul
+        return 0
+
+    mirrored = mirror_key < key
+    entry_key = mirror_key if mirrored else key
+    if ply % 2:
+        entry_key ^= ZOBRIST_TURN
+    cutoff, tt_score, tt_move = tt_probe(table, entry_key, depth, alpha, beta)
+    if stats is not None and tt_move >= 0:
+        stats[STAT_TT_HITS] += 1
+    if cutoff:
+        return tt_score
+    if mirrored and tt_move >= 0:
+        tt_move = 6 - tt_move
+
+    alpha_orig = alpha
+    best_score = -SCORE_INF
+    best_move = -1
+    channel = ply % 2
+
+    # Coup de la table, killers, puis du centre vers les bords ; entre deux colonnes
+    # symétriques, celle dont la case a le plus coupé passe d'abord
+    if depth >= ORDER_MIN_DEPTH:
+        killer0, killer1 = ordering[2 * ply], ordering[2 * ply + 1]
+    else:
+        killer0 = killer1 = -1
+    history = HISTORY + channel * (bitboard.COLS * H1)
+    tried = 0
+    swap = False
+    for step in range(10):
+        if step == 0:
+            col = tt_move
+        elif step == 1:
+            col = killer0
+        elif step == 2:
+            col = killer1
+        else:
+            i = step - 3
+            if i == 0:
+                col = MOVE_ORDER[0]
+            elif i % 2 == 1:
+                # Premier coup de la paire symétrique (MOVE_ORDER[i], MOVE_ORDER[i + 1])
+                first, second = MOVE_ORDER[i], MOVE_ORDER[i + 1]
+                swap = (depth >= ORDER_MIN_DEPTH and ordering[history + second * H1 + heights[second]]
+                        > ordering[history + first * H1 + heights[first]])
+                col = second if swap else first
+            else:
+                col = MOVE_ORDER[i - 1] if swap else MOVE_ORDER[i]
+        if col < 0 or (tried >> col) & 1 or heights[col] >= ROWS:
+            continue
+        tried |= 1 << col
+
+        index = col * H1 + heights[col]
+        heights[col] += 1
+        child_score = score + add_piece(counts, index, channel)
+        child = current | (1 << index)
+        child_key = key ^ ZOBRIST[channel, index]
+        child_mirror_key = mirror_key ^ ZOBRIST_MIRROR[channel, index]
+        # PVS : le premier coup en fenêtre pleine, les suivants en fenêtre nulle,
+        # re-cherchés en fenêtre pleine seulement s'ils font mieux que alpha
+        window = beta if best_move < 0 else alpha + 1
+        value = -negamax(opponent, child, heights, counts, child_score, child_key, child_mirror_key, depth - 1,
+                         ply + 1, -window, -alpha, table, age, ordering, counters, stats)
+        if alpha < value < beta and window < beta and not counters[ABORTED]:
+            value = -negamax(opponent, child, heights, counts, child_score, child_key, child_mirror_key, depth - 1,
+                             ply + 1, -beta, -alpha, table, age, ordering, counters, stats)
+        remove_piece(counts, index, channel)
+        heights[col] -= 1
+        if counters[ABORTED]:
+            return 0
+
+        if value > best_score:
+            best_score = value
+            best_move = col
+        if value > alpha:
+            alpha = value
+        if alpha >= beta:
+            if stats is not None:
+                stats[STAT_CUTOFFS] += 1
+            if depth >= ORDER_MIN_DEPTH:
+                if col != killer0:
+                    ordering[2 * ply + 1] = killer0
+                    ordering[2 * ply] = col
+                ordering[history + index] += depth * depth
             break
-    return new_board
+
+    if best_score <= alpha_orig:
+        flag = TT_UPPER
+    elif best_score >= beta:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    if mirrored and best_move >= 0:
+        best_move = 6 - best_move
+    tt_store(table, entry_key, depth, flag, best_score, best_move, age)
+    return best_score
+
+
+@njit(cache=False, nogil=True)
+def search_root(current, opponent, heights, counts, key, depth, candidates, node_budget, table, age, ordering, counters,
+                stats=None):
+    """
+    Cherche chaque coup candidat de la racine à la profondeur depth, en fenêtre pleine.
+    Retourne (score, meilleur coup, noeuds visités) ; counters[ABORTED]
+    vaut 1 si le budget a été atteint avant la fin de l'itération.
+    Sans le GIL : plusieurs threads peuvent chercher en même temps sur la même table.
+    """
+    return search_window(current, opponent, heights, counts, key, depth, -SCORE_INF, SCORE_INF, candidates,
+                         node_budget, table, age, ordering, counters, stats)
+
+
+@njit(cache=False, nogil=True)
+def search_window(current, opponent, heights, counts, key, depth, alpha, beta, candidates, node_budget, table, age,
+                  ordering, counters, stats):
+    """
+    search_root dans la fenêtre (alpha, beta), en PVS : le premier candidat (le meilleur de
+    l'itération précédente) en fenêtre pleine, les suivants en fenêtre nulle.
+    Le score rendu est une borne supérieure s'il vaut au plus alpha, inférieure s'il
+    vaut au moins beta. Interrompu, le meilleur coup rendu est celui d'un candidat
+    terminé ou prouvé meilleur que les précédents (score -SCORE_INF si aucun).
+    """
+    counters[NODES] = 0
+    counters[BUDGET] = node_budget
+    counters[ABORTED] = 0
+
+    root_score = bb_evaluate(current, opponent)
+    mirror_key = mirror_zobrist_key(current, opponent)
+    best_score = -SCORE_INF
+    best_move = candidates[0]
+    for i in range(candidates.shape[0]):
+        col = candidates[i]
+        index = col * H1 + heights[col]
+        heights[col] += 1
+        child_score = root_score + add_piece(counts, index, 0)
+        child = current | (1 << index)
+        child_key = key ^ ZOBRIST[0, index]
+        child_mirror_key = mirror_key ^ ZOBRIST_MIRROR[0, index]
+        window = beta if i == 0 else alpha + 1
+        score = -negamax(opponent, child, heights, counts, child_score, child_key, child_mirror_key, depth - 1, 1,
+                         -window, -alpha, table, age, ordering, counters, stats)
+        if alpha < score < beta and window < beta and not counters[ABORTED]:
+            # Prouvé meilleur que les précédents : retenu même si la re-recherche est interrompue
+            best_score = score
+            best_move = col
+            score = -negamax(opponent, child, heights, counts, child_score, child_key, child_mirror_key, depth - 1, 1,
+                             -beta, -alpha, table, age, ordering, counters, stats)
+        remove_piece(counts, index, 0)
+        heights[col] -= 1
+        if counters[ABORTED]:
+            break
+
+        if score > best_score:
+            best_score = score
+            best_move = col
+        if score > alpha:
+            alpha = score
+        if alpha >= beta:
+            break
+    return best_score, best_move, counters[NODES]
+
+
+@njit(cache=False, nogil=True)
+def solve(current, opponent, heights, key, ply, alpha, beta, table, counters):
+    """
+    Recherche exacte victoire / nul / défaite : alpha-bêta en négamax sur {-1, 0, 1},
+    avec sa propre table (les valeurs exactes ne dépendent pas de la profondeur).
+    Le joueur au trait n'a jamais déjà perdu : un coup gagnant est joué avant de descendre.
+    """
+    counters[NODES] += 1
+    if counters[NODES] >= counters[BUDGET] or counters[STOP]:
+        counters[ABORTED] = 1
+        return 0
+
+    mask = current | opponent
+    possible = bb_possible_moves(mask)
+    if possible == 0:
+        return SOLVE_DRAW
+    if bb_winning_cells(current, mask) & possible:
+        return SOLVE_WIN
+
+    # Une menace adverse doit être bloquée ; deux ne peuvent pas l'être. Jouer
+    # juste sous une menace adverse la lui donne : ces coups sont écartés
+    threats = bb_winning_cells(opponent, mask)
+    forced = threats & possible
+    if forced:
+        if forced & (forced - 1):
+            return SOLVE_LOSS
+        possible = forced
+    possible &= ~(threats >> 1)
+    if possible == 0:
+        return SOLVE_LOSS
+
+    entry_key = key ^ ZOBRIST_TURN if ply % 2 else key
+    cutoff, tt_score, tt_move = tt_probe(table, entry_key, 0, alpha, beta)
+    if cutoff:
+        return tt_score
+
+    alpha_orig = alpha
+    best_score = SOLVE_LOSS - 1
+    best_move = -1
+    channel = ply % 2
+    for i in range(-1, 7):
+        if i < 0:
+            col = tt_move
+            if col < 0:
+                continue
+        else:
+            col = MOVE_ORDER[i]
+            if col == tt_move:
+                continue
+        bit = possible & COLUMN_MASKS[col]
+        if not bit:
+            continue
+
+        index = col * H1 + heights[col]
+        heights[col] += 1
+        value = -solve(opponent, current | bit, heights, key ^ ZOBRIST[channel, index], ply + 1,
+                       -beta, -alpha, table, counters)
+        heights[col] -= 1
+        if counters[ABORTED]:
+            return 0
+
+        if value > best_score:
+            best_score = value
+            best_move = col
+        if value > alpha:
+            alpha = value
+        if alpha >= beta:
+            break
+
+    if best_score <= alpha_orig:
+        flag = TT_UPPER
+    elif best_score >= beta:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    tt_store(table, entry_key, 0, flag, best_score, best_move, 1)
+    return best_score
+
+
+@njit(cache=False, nogil=True)
+def solve_root(current, opponent, heights, key, candidates, node_budget, table, counters):
+    """
+    Résout la position parmi les coups candidats : (valeur, coup) pour le joueur au trait.
+    Deux passes à fenêtre nulle : un coup gagne-t-il ? sinon, un coup tient-il le nul ?
+    Sans coup gagnant ni nul, la valeur est SOLVE_LOSS et le coup n'a pas de sens.
+    """
+    counters[NODES] = 0
+    counters[BUDGET] = node_budget
+    counters[ABORTED] = 0
+
+    possible = bb_possible_moves(current | opponent)
+    for target in (SOLVE_WIN, SOLVE_DRAW):
+        for i in range(candidates.shape[0]):
+            col = candidates[i]
+            bit = possible & COLUMN_MASKS[col]
+            if bb_has_four(current | bit):
+                return SOLVE_WIN, col
+            index = col * H1 + heights[col]
+            heights[col] += 1
+            value = -solve(opponent, current | bit, heights, key ^ ZOBRIST[0, index], 1,
+                           -target, -target + 1, table, counters)
+            heights[col] -= 1
+            if counters[ABORTED]:
+                return SOLVE_LOSS, -1
+            if value >= target:
+                return target, col
+    return SOLVE_LOSS, candidates[0]
+
+
+# Compilation des noyaux : dans un thread (l'agent joue le minimax Python en attendant)
+# ou bloquante dans le constructeur
+WARM_UP_MODES = ("background", "blocking")
+# Une compilation par processus et par variante (avec ou sans statistiques)
+_warm_up_threads = {}
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(stats=False):
+    """Compile les noyaux de l'agent en les appelant sur des positions factices."""
+    bb_has_four(0)
+    bb_evaluate(0, 0)
+    table = new_transposition_table(4)
+    counters = np.zeros(4, dtype=np.int64)
+    search_stats = np.zeros(3, dtype=np.int64) if stats else None
+    search_root(0, 0, np.zeros(7, dtype=np.int8), line_counts(0, 0), 0, 1, MOVE_ORDER, 1000,
+                table, 0, new_move_ordering(), counters, search_stats)
+    # Appelée depuis search_root, search_window y est compilée pour des bornes constantes : les
+    # pilotes lui passent des bornes variables, une autre version à compiler ici aussi
+    search_window(0, 0, np.zeros(7, dtype=np.int8), line_counts(0, 0), 0, 1, -SCORE_INF, SCORE_INF, MOVE_ORDER,
+                  1000, table, 0, new_move_ordering(), counters, search_stats)
+    solve_root(0, 0, np.zeros(7, dtype=np.int8), 0, MOVE_ORDER, 1000, table, counters)
+
+
+def start_warm_up(stats=False, background=True):
+    """
+    Lance warm_up(stats) une seule fois par processus, dans un thread, et l'attend si
+    background est faux. Le thread n'est pas un démon : un processus qui se termine
+    pendant la compilation l'attend plutôt que d'interrompre LLVM.
+    """
+    with _warm_up_lock:
+        thread = _warm_up_threads.get(stats)
+        if thread is None:
+            thread = threading.Thread(target=warm_up, args=(stats,), name="numba-warm-up")
+            _warm_up_threads[stats] = thread
+            thread.start()
+    if not background:
+        thread.join()
+    return thread
+
+
+def arm_stop(deadline, *counters):
+    """
+    Minuteur qui met counters[STOP] à 1 à deadline (horloge monotone) : les noyaux,
+    qui relâchent le GIL, s'arrêtent au noeud suivant. disarm_stop l'annule.
+    """
+    def stop():
+        for stop_counters in counters:
+            stop_counters[STOP] = 1
+
+    timer = threading.Timer(max(0.0, deadline - time.monotonic()), stop)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+def disarm_stop(timer, counters):
+    """Annule le minuteur (ou attend qu'il ait fini) puis remet la demande d'arrêt de counters à zéro."""
+    timer.cancel()
+    timer.join()
+    counters[STOP] = 0
+
+
+def kernels_ready(stats=False):
+    """Les noyaux de la variante stats sont-ils compilés ?"""
+    thread = _warm_up_threads.get(stats)
+    return thread is not None and not thread.is_alive()
+
 
 class Agent:
     """
     Agent Minimax Numba-Accelerated
     Utilise Iterative Deepening + Numba JIT pour une profondeur maximale.
     """
-    def __init__(self, env, player_name=None):
+    def __init__(self, env, player_name=None, workers=1, book=None, solver_empty=20, stats=False, stats_path=None,
+                 node_budget=None, driver="aspiration", warm_up="background"):
+        if driver not in SEARCH_DRIVERS:
+            raise ValueError(f"Pilote de recherche inconnu : {driver}")
+        if warm_up not in WARM_UP_MODES:
+            raise ValueError(f"Mode de compilation inconnu : {warm_up}")
         self.env = env
         self.cols = 7
         self.rows = 6
         self.time_limit = 2.85
+        # Budget de noeuds par coup à la place du temps : la recherche est alors reproductible
+        # (sans threads auxiliaires, le solveur de fin de partie en prend au plus la moitié)
+        self.node_budget = node_budget
+        # Fenêtres de chaque itération (voir SEARCH_DRIVERS)
+        self.driver = driver
         self.player_name = player_name or "Minimax_Numba"
-        
-   
-        print("Compiling Numba functions...")
-        dummy_board = np.zeros((6, 7, 2), dtype=np.int8)
-        fast_check_win(dummy_board, 0)
-        fast_evaluate(dummy_board, 0)
-        fast_simulate_move(dummy_board, 3, 0)
-        fast_get_valid_moves(dummy_board)
-        print("Numba Ready!")
+        # Bibliothèque d'ouvertures (chemin ou OpeningBook) : un coup trouvé évite la recherche
+        self.book = OpeningBook.load(book)
+        # En dessous de solver_empty cases vides, la position est d'abord résolue exactement
+        self.solver_empty = solver_empty
+        self.solver_tt = new_transposition_table(SOLVER_TT_BITS)
+
+        # Lazy SMP : workers - 1 threads auxiliaires remplissent la table partagée pendant
+        # la recherche principale (avec 1 seul worker, la recherche reste déterministe)
+        self.workers = workers
+        self._helpers = ThreadPoolExecutor(workers - 1) if workers > 1 else None
+
+        # Conservée d'un coup à l'autre ; l'âge distingue les entrées des recherches précédentes
+        self.tt = new_transposition_table()
+        self.search_age = 0
+        # Killers et historique, partagés par les itérations (et les threads auxiliaires), vieillis à chaque coup
+        self.ordering = new_move_ordering()
+
+        # Statistiques par coup (voir search_stats.py). Les compteurs du noyau (coupures,
+        # table, évaluations) incluent le travail des threads auxiliaires
+        SearchStats.attach(self, "numba", stats, stats_path)
+        self._search_stats = np.zeros(3, dtype=np.int64) if self.stats is not None else None
+        self.counters = np.zeros(4, dtype=np.int64)
+
+        # Compilation partagée par les agents du processus. Tant qu'elle n'est pas finie, le
+        # minimax Python (self._fallback, créé au besoin) joue à la place de la recherche compilée.
+        # Avec un budget de noeuds, elle est attendue : la recherche reste reproductible
+        start_warm_up(self.stats is not None, background=warm_up == "background" and node_budget is None)
+        self._fallback = None
 
     def choose_action(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
-        start_time = time.time()
+        start_time = time.monotonic()
+        stats = self.stats
+        if stats is not None:
+            stats.start()
 
-        if isinstance(observation, dict) and "observation" in observation:
-            board = observation["observation"]
-        else:
-            board = observation
-        
-        board = board.astype(np.int8)
+        pos = Position.from_observation(observation)
+
+        if self.book is not None:
+            book_move = self.book.probe(pos)
+            if book_move is not None: return SearchStats.end_move(self, book_move, "book")
+            if stats is not None:
+                stats.phase("book")
 
         if action_mask is not None:
             valid_actions = [i for i, valid in enumerate(action_mask) if valid == 1]
         else:
-            mask = fast_get_valid_moves(board)
-            valid_actions = [i for i, v in enumerate(mask) if v == 1]
+            valid_actions = pos.valid_moves()
 
      
+        # Coups gagnants, parades et coups sûrs lus sur les cartes des menaces (voir bitboard.py)
+        wins = pos.winning_moves(0)
         for col in valid_actions:
-            temp = fast_simulate_move(board, col, 0)
-            if fast_check_win(temp, 0): return col
-            
-        for col in valid_actions:
-            temp = fast_simulate_move(board, col, 1) 
-            if fast_check_win(temp, 1): return col
+            if wins & bitboard.COLUMN_MASKS[col]: return SearchStats.end_move(self, col, "tactic")
 
-        safe_actions = []
+        wins = pos.winning_moves(1)
         for col in valid_actions:
-            if not self._gives_opponent_win(board, col, 0):
-                safe_actions.append(col)
+            if wins & bitboard.COLUMN_MASKS[col]: return SearchStats.end_move(self, col, "tactic")
+
+        unsafe = pos.unsafe_moves(0)
+        safe_actions = [col for col in valid_actions if not unsafe & bitboard.COLUMN_MASKS[col]]
         
         candidates = safe_actions if safe_actions else valid_actions
+        # Position symétrique : un coup et son symétrique se valent, un seul des deux est cherché
+        candidates = pos.distinct_moves(candidates)
+
+        if not kernels_ready(self.stats is not None):
+            move = self._fallback_action(observation, action_mask, start_time)
+            return SearchStats.end_move(self, move, "fallback")
 
         center_col = 3
         candidates.sort(key=lambda x: abs(x - center_col))
         best_move = candidates[0] if candidates else 0
 
-        try:
-            for depth in range(1, 43): 
-                current_duration = time.time() - start_time
-                if current_duration > 0.01:
-                    if current_duration + (current_duration * 6) > self.time_limit:
-                        break 
-
-                best_val = float('-inf')
-                best_move_depth = candidates[0]
-
-                for action in candidates:
-                    if time.time() - start_time > self.time_limit:
-                        raise TimeoutError()
-
-                    new_board = fast_simulate_move(board, action, 0)
-                    val = self._minimax(new_board, depth - 1, float('-inf'), float('inf'), False, start_time)
-                    
-                    if val > best_val:
-                        best_val = val
-                        best_move_depth = action
-                
-                best_move = best_move_depth
-                if best_val > 90000: break
-
-        except TimeoutError:
-            pass
-            
-        return best_move
+        self.search_age = self.search_age % 255 + 1
+        age_move_ordering(self.ordering)
+        root_key = zobrist_key(pos)
+        current, opponent = pos.boards
+        heights = np.array(pos.heights, dtype=np.int8)
+        counts = line_counts(current, opponent)
+        if stats is not None:
+            stats.phase("tactic")
 
-    def _minimax(self, board, depth, alpha, beta, maximizing, start_time):
-        
-        if (time.time() - start_time) > self.time_limit:
-            raise TimeoutError()
+        # Fin de partie : un résultat prouvé (victoire ou nul) est joué sans approfondissement.
+        # Le solveur a la moitié du temps ; s'il n'a pas fini, la recherche habituelle prend le reste
+        used = 0
+        if 42 - pos.moves <= self.solver_empty:
+            if self.node_budget is not None:
+                value, move = solve_root(current, opponent, heights, root_key, np.array(candidates, dtype=np.int64),
+                                         max(1, self.node_budget // 2), self.solver_tt, self.counters)
+            else:
+                stop_timer = arm_stop(start_time + self.time_limit / 2, self.counters)
+                value, move = solve_root(current, opponent, heights, root_key, np.array(candidates, dtype=np.int64),
+                                         NO_NODE_BUDGET, self.solver_tt, self.counters)
+                disarm_stop(stop_timer, self.counters)
+            used = int(self.counters[NODES])
+            if stats is not None:
+                stats.current["solver_nodes"] = int(self.counters[NODES])
+            if not self.counters[ABORTED] and value != SOLVE_LOSS:
+                if stats is not None:
+                    stats.current["score"] = int(value)
+                return SearchStats.end_move(self, int(move), "solver")
+            if stats is not None:
+                stats.phase("solver")
 
-        
-        if fast_check_win(board, 0): return 100000 + depth
-        if fast_check_win(board, 1): return -100000 - depth
+        helpers = []
+        if self._helpers is not None and self.node_budget is None:
+            for k in range(1, self.workers):
+                helper_counters = np.zeros(4, dtype=np.int64)
+                future = self._helpers.submit(self._helper_search, k, pos, root_key, list(candidates),
+                                              helper_counters)
+                helpers.append((future, helper_counters))
 
-       
-        if depth == 0:
-            return fast_evaluate(board, 0)
-            
-  
-        mask = fast_get_valid_moves(board)
-        
-        valid_moves = [i for i, v in enumerate(mask) if v == 1]
-        
-        
-        valid_moves.sort(key=lambda x: abs(x - 3))
+        if stats is not None:
+            self._search_stats[:] = 0
+            stats.current.update(depth=0, nodes=0, score=None)
 
-        if not valid_moves: # Match nul
-            return 0
+        # Une profondeur n'est commencée que si son coût prévu tient dans le temps restant ;
+        # une itération commencée est arrêtée par le minuteur à l'échéance du coup
+        timer = IterationTimer(self.time_limit, start_time)
+        nodes_left = None if self.node_budget is None else self.node_budget - used
+        stop_timer = None
+        if nodes_left is None:
+            stop_timer = arm_stop(timer.deadline, self.counters, *[counters for _, counters in helpers])
+        root = (current, opponent, heights, counts, root_key)
+        guess = None
+        for depth in range(1, 43): 
+            # Toute l'itération tourne dans le noyau compilé, limitée en noeuds ou par le minuteur
+            if nodes_left is not None:
+                if nodes_left <= 0:
+                    break
+                node_budget = nodes_left
+            else:
+                if not timer.next_iteration_fits():
+                    break
+                node_budget = NO_NODE_BUDGET
+            iteration_start = time.monotonic()
+            best_val, best_move_depth, nodes = self._search_iteration(
+                root, depth, np.array(candidates, dtype=np.int64), guess, node_budget)
+            iteration_time = time.monotonic() - iteration_start
+            if stats is not None:
+                stats.current["nodes"] += int(nodes)
+            if nodes_left is not None:
+                nodes_left -= int(nodes)
 
-        if maximizing:
-            max_eval = float('-inf')
-            for col in valid_moves:
-                new_board = fast_simulate_move(board, col, 0)
-                eval_score = self._minimax(new_board, depth - 1, alpha, beta, False, start_time)
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha: break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for col in valid_moves:
-                new_board = fast_simulate_move(board, col, 1)
-                eval_score = self._minimax(new_board, depth - 1, alpha, beta, True, start_time)
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha: break
-            return min_eval
-
-    def _gives_opponent_win(self, board, col, channel):
-        """Vérifie le Zugzwang (Version Numba-Accelerated)"""
-        
-        try:
-            temp_board = fast_simulate_move(board, col, channel)
-        except:
-            return False
-            
-        
-        opponent = 1 - channel
-        try:
-            temp_board_2 = fast_simulate_move(temp_board, col, opponent)
-            if fast_check_win(temp_board_2, opponent):
-                return True
-        except:
-            pass
-            
-        return False
\ No newline at end of file
+            if self.counters[ABORTED]:
+                # Le premier coup cherché est le meilleur de l'itération précédente : un coup
+                # partiel n'est rendu que s'il est terminé ou prouvé meilleur
+                if best_val > -SCORE_INF:
+                    best_move = int(best_move_depth)
+                    if stats is not None:
+                        stats.current["score"] = int(best_val)
+                break
+            timer.record(iteration_time, nodes)
+
+            best_move = int(best_move_depth)
+            guess = int(best_val)
+            if stats is not None:
+                stats.current.update(depth=depth, score=guess)
+            if best_val > 90000: break
+
+            # Le meilleur coup de cette profondeur est cherché en premier à la suivante
+            candidates.remove(best_move)
+            candidates.insert(0, best_move)
+
+        # Arrête le minuteur et les threads auxiliaires avant de rendre la main
+        if stop_timer is not None:
+            disarm_stop(stop_timer, self.counters)
+        for future, helper_counters in helpers:
+            helper_counters[STOP] = 1
+        for future, helper_counters in helpers:
+            future.result()
+
+        if stats is not None:
+            stats.record_counters(self._search_stats, pv=principal_variation(self.tt, pos, root_key, best_move))
+        return SearchStats.end_move(self, best_move, "search")
+
+    def _fallback_action(self, observation, action_mask, start_time):
+        """Coup du minimax Python dans le temps restant, le temps que les noyaux soient compilés."""
+        if self._fallback is None:
+            from minimax_agent import Agent as MinimaxAgent
+            self._fallback = MinimaxAgent(self.env, self.player_name)
+        self._fallback.time_limit = max(0.0, self.time_limit - (time.monotonic() - start_time))
+        return self._fallback.choose_action(observation, action_mask=action_mask)
+
+    def _search_iteration(self, root, depth, candidates, guess, node_budget):
+        """
+        Une itération de l'approfondissement selon self.driver, autour du score guess de la
+        précédente (None à la première). Retourne (score, coup, noeuds) comme search_root ;
+        interrompue (counters[ABORTED]), le score vaut -SCORE_INF si aucun coup n'est sûr.
+        """
+        current, opponent, heights, counts, key = root
+
+        def search(alpha, beta, budget):
+            return search_window(current, opponent, heights, counts, key, depth, alpha, beta, candidates,
+                                 max(1, budget), self.tt, self.search_age, self.ordering, self.counters,
+                                 self._search_stats)
+
+        if self.driver == "full" or guess is None:
+            return search(-SCORE_INF, SCORE_INF, node_budget)
+
+        nodes = 0
+        # Dernier coup prouvé meilleur (échec haut) : gardé si une recherche suivante est interrompue
+        proven_score, proven_move = -SCORE_INF, candidates[0]
+        if self.driver == "mtdf":
+            # Fenêtres nulles successives resserrant [lower, upper] autour de la valeur
+            lower, upper = -SCORE_INF, SCORE_INF
+            score = guess
+            while lower < upper:
+                beta = score + 1 if score == lower else score
+                score, move, searched = search(beta - 1, beta, node_budget - nodes)
+                nodes += searched
+                if self.counters[ABORTED]:
+                    return proven_score, proven_move, nodes
+                if score < beta:
+                    upper = score
+                else:
+                    lower = score
+                    proven_score, proven_move = score, move
+            return score, proven_move, nodes
+
+        # Fenêtre d'aspiration, élargie du côté de l'échec jusqu'à contenir le score
+        delta = ASPIRATION_WINDOW
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            score, move, searched = search(alpha, beta, node_budget - nodes)
+            nodes += searched
+            if self.counters[ABORTED]:
+                if score > alpha:
+                    return score, move, nodes
+                return proven_score, proven_move, nodes
+            delta *= 4
+            if score <= alpha:
+                alpha = max(-SCORE_INF, score - delta)
+            elif score >= beta:
+                proven_score, proven_move = score, move
+                beta = min(SCORE_INF, score + delta)
+            else:
+                return score, move, nodes
+
+    def _helper_search(self, k, pos, root_key, candidates, counters):
+        """
+        Thread auxiliaire du Lazy SMP : approfondissement itératif sur la même table, sans GIL.
+        Les threads impairs ont un coup d'avance en profondeur et chacun commence par un coup
+        différent, pour que leurs recherches ne se recouvrent pas toutes.
+        """
+        current, opponent = pos.boards
+        heights = np.array(pos.heights, dtype=np.int8)
+        counts = line_counts(current, opponent)
+        shift = k % len(candidates)
+        candidates = np.array(candidates[shift:] + candidates[:shift], dtype=np.int64)
+
+        depth = 1 + k % 2
+        # Arrêté par le minuteur du coup (arm_stop) ou par le thread principal
+        while not counters[STOP] and depth <= 42:
+            search_root(current, opponent, heights, counts, root_key, depth, candidates,
+                        NO_NODE_BUDGET, self.tt, self.search_age, self.ordering, counters, self._search_stats)
+            if counters[ABORTED]:
+                break
+            depth += 1
+
+    def close(self):
+        """Arrête les threads auxiliaires."""
+        if self._helpers is not None:
+            self._helpers.shutdown()
+            self._helpers = None
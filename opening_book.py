@@ -0,0 +1,148 @@
+"""
+Bibliothèque d'ouvertures précalculée.
+
+Le constructeur (hors ligne) parcourt toutes les positions jusqu'à N demi-coups,
+les cherche avec le noyau compilé de numba_agent et écrit le meilleur coup de
+chacune dans un fichier binaire trié. Les agents ouvrent ce fichier en mémoire
+partagée (memmap) et le consultent par recherche dichotomique.
+
+Une position et son symétrique (miroir gauche-droite) partagent la même entrée :
+seule la forme canonique (plus petite clé) est stockée, et le coup est
+retourné (6 - col) quand on interroge la forme miroir.
+
+Format du fichier (petit-boutiste) :
+    en-tête   : MAGIC (8 octets) puis nombre d'entrées n (uint64)
+    clés      : n x uint64, triées
+    scores    : n x int16, score de la recherche pour le joueur au trait
+    coups     : n x int8
+
+Construction :
+    python opening_book.py --plies 6 --depth 14 --output opening_book.bin
+"""
+
+import argparse
+import time
+import numpy as np
+from bitboard import Position, H1, CENTER_ORDER, canonical, mirror_move
+
+MAGIC = b"C4BOOK1\0"
+HEADER_SIZE = 16
+
+
+class OpeningBook:
+    """Bibliothèque en lecture seule, projetée en mémoire."""
+
+    @classmethod
+    def load(cls, book):
+        """Accepte un chemin de fichier, une bibliothèque déjà ouverte ou None."""
+        if book is None or isinstance(book, cls):
+            return book
+        return cls(book)
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"{path} n'est pas une bibliothèque d'ouvertures")
+        n = int(np.frombuffer(header, dtype="<u8", count=1, offset=8)[0])
+        self.size = n
+        self.keys = np.memmap(path, dtype="<u8", mode="r", offset=HEADER_SIZE, shape=(n,))
+        self.scores = np.memmap(path, dtype="<i2", mode="r", offset=HEADER_SIZE + 8 * n, shape=(n,))
+        self.moves = np.memmap(path, dtype="i1", mode="r", offset=HEADER_SIZE + 10 * n, shape=(n,))
+
+    def __len__(self):
+        return self.size
+
+    def lookup(self, board0, board1):
+        """(coup, score) de la position où le canal 0 est au trait, ou None si absente."""
+        key, _, _, mirrored = canonical(board0, board1)
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index >= self.size or int(self.keys[index]) != key:
+            return None
+        move = int(self.moves[index])
+        if mirrored:
+            move = mirror_move(move)
+        return move, int(self.scores[index])
+
+    def probe(self, pos):
+        """Coup de la bibliothèque pour pos (canal 0 au trait), ou None."""
+        entry = self.lookup(pos.boards[0], pos.boards[1])
+        if entry is None or not pos.can_play(entry[0]):
+            return None
+        return entry[0]
+
+
+def write_book(path, entries):
+    """Écrit les entrées {clé: (coup, score)} dans le format du fichier, triées par clé."""
+    keys = np.array(sorted(entries), dtype="<u8")
+    scores = np.array([entries[int(key)][1] for key in keys], dtype="<i2")
+    moves = np.array([entries[int(key)][0] for key in keys], dtype="i1")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([len(keys)], dtype="<u8").tobytes())
+        f.write(keys.tobytes())
+        f.write(scores.tobytes())
+        f.write(moves.tobytes())
+
+
+def build_book(plies, depth, node_budget=50_000_000, verbose=False):
+    """
+    Cherche toutes les positions canoniques jusqu'à plies demi-coups (parties
+    non terminées) à la profondeur depth. Retourne {clé: (coup, score)}.
+    """
+    # Numba n'est nécessaire qu'à la construction, pas pour consulter la bibliothèque
+    from numba_agent import (search_root, line_counts, zobrist_key, new_transposition_table, new_move_ordering,
+                             ABORTED)
+
+    table = new_transposition_table()
+    ordering = new_move_ordering()
+    counters = np.zeros(4, dtype=np.int64)
+    entries = {}
+    key, board0, board1, _ = canonical(0, 0)
+    frontier = {key: (board0, board1)}
+
+    for ply in range(plies + 1):
+        start = time.time()
+        children = {}
+        for key, (board0, board1) in frontier.items():
+            pos = Position.from_boards(board0, board1)
+            # Position symétrique : un coup sur deux symétriques suffit
+            candidates = np.array(pos.distinct_moves([col for col in CENTER_ORDER if pos.can_play(col)]),
+                                  dtype=np.int64)
+            score, move, _ = search_root(board0, board1, np.array(pos.heights, dtype=np.int8),
+                                         line_counts(board0, board1), zobrist_key(pos), min(depth, 42 - ply),
+                                         candidates, node_budget, table, 1, ordering, counters)
+            if not counters[ABORTED]:
+                # Le score est borné pour tenir sur 16 bits (victoire = ±32767)
+                entries[key] = (int(move), int(max(-32767, min(32767, score))))
+
+            if ply == plies:
+                continue
+            for col in pos.valid_moves():
+                if pos.is_winning_move(col, 0):
+                    continue
+                # Après le coup, l'adversaire devient le canal 0
+                bit = 1 << (col * H1 + pos.heights[col])
+                child_key, child0, child1, _ = canonical(board1, board0 | bit)
+                children[child_key] = (child0, child1)
+
+        if verbose:
+            print(f"Demi-coup {ply} : {len(frontier)} positions en {time.time() - start:.1f} s")
+        frontier = children
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit la bibliothèque d'ouvertures")
+    parser.add_argument("--plies", type=int, default=6, help="profondeur de la bibliothèque en demi-coups")
+    parser.add_argument("--depth", type=int, default=14, help="profondeur de recherche de chaque position")
+    parser.add_argument("--output", default="opening_book.bin")
+    args = parser.parse_args()
+
+    entries = build_book(args.plies, args.depth, verbose=True)
+    write_book(args.output, entries)
+    print(f"{len(entries)} positions écrites dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 class RandomAgent:
 
     def __init__(self, env, player_name=None):
@@ -14,6 +15,12 @@ class RandomAgent:
             action=self.env.action_space(self.player_name).sample(action_mask)    
         return action 
 
+    def choose_actions(self, observations, action_masks):
+        """Version par lots (batch_env) : une colonne au hasard parmi les coups permis de chaque partie"""
+        masks = np.asarray(action_masks) == 1
+        noise = np.where(masks, np.random.random(masks.shape), -1.0)
+        return noise.argmax(axis=1)
+
     def choose_action_manual(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
         """Méthode manuelle avec random"""
         valid_actions = []  
@@ -42,4 +49,11 @@ class WeightedRandomAgent(RandomAgent):
             return None
         action=random.choices(colonnes,new_weights,k=1)[0]
         return action
+
+    def choose_actions(self, observations, action_masks):
+        """Version par lots (batch_env) : tirage pondéré parmi les coups permis de chaque partie"""
+        weights = np.array([0.10, 0.10, 0.15, 0.30, 0.15, 0.10, 0.10]) * (np.asarray(action_masks) == 1)
+        cumulative = weights.cumsum(axis=1)
+        draws = np.random.random(len(weights)) * cumulative[:, -1]
+        return (cumulative > draws[:, None]).argmax(axis=1)
         
\ No newline at end of file
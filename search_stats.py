@@ -0,0 +1,87 @@
+"""
+Statistiques de recherche, coup par coup.
+
+Un agent construit avec stats=True (ou stats_path=...) remplit à chaque coup un
+relevé, disponible ensuite dans agent.stats.last :
+    engine, move, time       : moteur, coup joué, durée totale du coup (secondes)
+    source                   : étape qui a décidé du coup (book, tactic, solver, search)
+    phases                   : durée de chaque étape traversée, {étape: secondes}
+    depth, nodes, score, pv  : profondeur terminée, noeuds, score et variante principale
+    cutoffs, tt_hits, evals  : coupures, positions trouvées dans la table, feuilles évaluées
+    solver_nodes             : noeuds du solveur exact de fin de partie
+    simulations, tree_size   : parties simulées et noeuds de l'arbre (MCTS)
+Seuls les champs que le moteur mesure sont présents. Avec stats_path, chaque
+relevé est aussi ajouté au fichier en une ligne JSON.
+
+Sans statistiques, agent.stats vaut None : la recherche ne compte rien de plus.
+Les agents passent tous par SearchStats.attach (construction), start / phase
+(pendant le coup), record_counters et end_move (fin du coup) : leurs relevés
+ont le même format.
+"""
+
+import json
+import time
+
+# Compteurs de la recherche, dans le tableau (ou la liste) que le moteur remplit pendant la
+# recherche : coupures bêta, positions trouvées dans la table, feuilles évaluées
+STAT_CUTOFFS, STAT_TT_HITS, STAT_EVALS = 0, 1, 2
+
+
+class SearchStats:
+    """Relevé du coup en cours et du dernier coup joué."""
+
+    def __init__(self, engine, path=None):
+        self.engine = engine
+        self.path = path
+        self.last = None
+        self.current = None
+        self._start = self._mark = 0.0
+
+    @classmethod
+    def create(cls, engine, stats=False, path=None):
+        """Relevé de l'agent, ou None si les statistiques sont désactivées."""
+        return cls(engine, path) if stats or path else None
+
+    @classmethod
+    def attach(cls, agent, engine, stats=False, path=None):
+        """Donne à agent son relevé par coup, agent.stats (None = désactivé), et le rend."""
+        agent.stats = cls.create(engine, stats, path)
+        return agent.stats
+
+    @staticmethod
+    def end_move(agent, move, source):
+        """Termine le relevé du coup de agent, s'il en tient un : l'étape source a décidé du coup. Rend move."""
+        if agent.stats is not None:
+            agent.stats.finish(move, source)
+        return move
+
+    def record_counters(self, counters, **fields):
+        """Ajoute au relevé les compteurs de la recherche (indices STAT_*) et les champs donnés (pv, ...)."""
+        self.current.update(cutoffs=int(counters[STAT_CUTOFFS]), tt_hits=int(counters[STAT_TT_HITS]),
+                            evals=int(counters[STAT_EVALS]), **fields)
+
+    def start(self):
+        """Commence le relevé d'un nouveau coup."""
+        self.current = {"engine": self.engine, "phases": {}}
+        self._start = self._mark = time.perf_counter()
+
+    def phase(self, name):
+        """Attribue à l'étape name le temps écoulé depuis la fin de l'étape précédente."""
+        now = time.perf_counter()
+        phases = self.current["phases"]
+        phases[name] = phases.get(name, 0.0) + now - self._mark
+        self._mark = now
+
+    def finish(self, move, source):
+        """Termine le relevé : l'étape source a décidé du coup move."""
+        self.phase(source)
+        record = self.current
+        record["move"] = int(move)
+        record["source"] = source
+        record["time"] = time.perf_counter() - self._start
+        self.last = record
+        self.current = None
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
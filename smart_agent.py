@@ -1,73 +1,87 @@
 import random
-from loguru import logger
+import numpy as np
+from bitboard import Position, ROWS, COLS, COLUMN_MASKS, CENTER_ORDER, CELL_BITS, possible_moves, winning_cells
+
+# CELL_BITS à plat : l'observation devient deux bitboards d'un seul produit
+FLAT_CELL_BITS = CELL_BITS.reshape(ROWS * COLS)
+# En mode rapide, une décision sur FAST_LOG_EVERY seulement est journalisée
+FAST_LOG_EVERY = 100
+
 
 class SmartAgent:
 
-    def __init__(self, env, player_name=None):
-        """Initialise un agent intelligent"""
+    def __init__(self, env, player_name=None, fast=False):
+        """
+        Initialise un agent intelligent. En mode rapide (fast), les décisions ne sont
+        journalisées que par échantillon (voir FAST_LOG_EVERY) ; elles restent les mêmes.
+        """
         self.env = env
         self.action_space = env.action_space(env.agents[0])
         self.player_name = player_name or "SmartAgent"
+        self.log_every = FAST_LOG_EVERY if fast else 1
+        self._decisions = 0
 
     def choose_action(self, observation, reward=0.0, terminated=False, truncated=False, info=None, action_mask=None):
-        """Joue le meilleur coup pour l'agent"""
+        """
+        Joue le meilleur coup pour l'agent : victoire, parade, double menace, puis le centre.
+        Toutes les colonnes sont examinées d'un coup sur les cartes des menaces (voir
+        bitboard.py), sans plateau d'essai.
+        """
         valid_actions = self._get_valid_actions(action_mask)
+        self._decisions += 1
 
-        if isinstance(observation, dict):
-            board = observation['observation']
-        else:
-            board = observation
-
-        winning_move = self._find_winning_move(board, valid_actions, channel=0)
+        current, opponent = self._to_bitboards(observation)
+        mask = current | opponent
+        possible = possible_moves(mask)
 
+        winning_move = self._first_column(winning_cells(current, mask) & possible, valid_actions)
         if winning_move is not None:
-            logger.success(f"{self.player_name}: WINNING MOVE -> column {winning_move}")
+            self._log("SUCCESS", "WINNING MOVE", winning_move)
             return winning_move
 
-        blocking_move = self._find_winning_move(board, valid_actions, channel=1)
+        blocking_move = self._first_column(winning_cells(opponent, mask) & possible, valid_actions)
         if blocking_move is not None:
-            logger.warning(f"{self.player_name}: BLOCKING -> column {blocking_move}")
+            self._log("WARNING", "BLOCKING", blocking_move)
             return blocking_move
 
         for col in valid_actions:
-            if self._creates_double_threat(board,col,channel=0):
-                logger.info(f"{self.player_name}:  DOUBLE THREAT TRAP  -> column {col}")
-                return col 
-    
-        center_preference = [3, 2, 4, 1, 5, 0, 6]
-        for col in center_preference:
+            # Après le coup en col : au moins deux cases jouables gagnantes
+            bit = possible & COLUMN_MASKS[col]
+            wins = winning_cells(current | bit, mask | bit) & possible_moves(mask | bit)
+            if wins & (wins - 1):
+                self._log("INFO", " DOUBLE THREAT TRAP ", col)
+                return col
+
+        for col in CENTER_ORDER:
             if col in valid_actions:
                 return col
 
         action = random.choice(valid_actions)
-        logger.debug(f"{self.player_name}: RANDOM -> column {action}")
+        self._log("DEBUG", "RANDOM", action)
         return action
-        
-    def _creates_double_threat(self, board, col, channel):
-        """
-        Vérifie si jouer dans 'col' crée deux opportunités de victoire au tour suivant.
-        """
-
-        temp_board = board.copy()
-        row = self._get_next_row(temp_board, col)
-        if row is None: return False
-        temp_board[row, col, channel] = 1 
 
-        winning_opportunities = 0
-        
-      
-        for next_col in range(7):
-  
-            next_row = self._get_next_row(temp_board, next_col)
-            if next_row is not None:
-                
-                if self._check_win_from_position(temp_board, next_row, next_col, channel):
-                    winning_opportunities += 1
-        
-        
-        return winning_opportunities >= 2
+    def _to_bitboards(self, observation):
+        """Bitboards (canal 0, canal 1) de l'observation PettingZoo (dict ou tenseur (6, 7, 2))."""
+        if isinstance(observation, dict):
+            observation = observation["observation"]
+        occupied = np.asarray(observation).reshape(ROWS * COLS, 2) != 0
+        current, opponent = (FLAT_CELL_BITS @ occupied).tolist()
+        return current, opponent
+
+    def _first_column(self, cells, valid_actions):
+        """Première colonne de valid_actions qui contient une case de cells (None sinon)."""
+        if cells:
+            for col in valid_actions:
+                if cells & COLUMN_MASKS[col]:
+                    return col
+        return None
 
-        
+    def _log(self, level, label, col):
+        """Journalise la décision (une sur log_every) ; loguru n'est importé qu'au premier message."""
+        if self._decisions % self.log_every:
+            return
+        from loguru import logger
+        logger.log(level, f"{self.player_name}: {label} -> column {col}")
 
     def _get_valid_actions(self, action_mask):
         """Retourne la liste d'indices des colonnes valides"""
@@ -79,16 +93,14 @@ class SmartAgent:
 
     def _find_winning_move(self, observation, valid_actions, channel):
         """Cherche s'il y a une possibilité de victoire immédiate"""
-        if isinstance(observation, dict):
-
-            board = observation['observation']
+        if isinstance(observation, Position):
+            pos = observation
         else:
-   
-            board = observation
-        for column in valid_actions:
-            row=self._get_next_row(board,column)
-            if row is not None :
-                if self._check_win_from_position(board,row,column,channel):
+            pos = Position.from_observation(observation)
+        wins = pos.winning_moves(channel)
+        if wins:
+            for column in valid_actions:
+                if wins & COLUMN_MASKS[column]:
                     return column
         return None
         
@@ -0,0 +1,65 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch_env import BatchConnectFour, play_games, ONGOING, DRAW
+from random_agent import RandomAgent, WeightedRandomAgent
+from smart_agent import SmartAgent
+from bitboard import Position
+
+
+class MockEnv:
+    def __init__(self):
+        self.agents = ["player_0", "player_1"]
+    def action_space(self, agent):
+        return None
+
+
+def test_lockstep_matches_position():
+    """Teste gravité, victoires, nuls et masques contre une Position jouée coup par coup"""
+    rng = np.random.default_rng(0)
+    env = BatchConnectFour(300)
+    positions = [Position() for _ in range(300)]
+    results = [ONGOING] * 300
+    while env.active.any():
+        masks = env.action_masks()
+        observations = env.observations()
+        actions = np.zeros(300, dtype=np.int64)
+        for g, pos in enumerate(positions):
+            if results[g] != ONGOING:
+                assert masks[g].sum() == 0
+                continue
+            assert masks[g].tolist() == [int(pos.can_play(col)) for col in range(7)]
+            # Observation du point de vue du joueur au trait
+            assert Position.from_observation(observations[g]).boards == [pos.boards[pos.turn], pos.boards[1 - pos.turn]]
+            actions[g] = rng.choice(pos.valid_moves())
+            player = pos.turn
+            pos.play(actions[g])
+            if pos.has_won(player):
+                results[g] = player
+            elif pos.is_full():
+                results[g] = DRAW
+        env.step(actions)
+        assert env.result.tolist() == results
+    assert DRAW in results or len(set(results)) == 2
+
+
+def test_illegal_move():
+    """Teste qu'un coup dans une colonne pleine est refusé"""
+    env = BatchConnectFour(1)
+    for _ in range(6):
+        env.step([0])
+    try:
+        env.step([0])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_play_games():
+    """Teste un tournoi par lots : toutes les parties sont comptées et l'agent intelligent domine"""
+    results = play_games(RandomAgent(None, "Random"), WeightedRandomAgent(None, "Weighted"), 1000)
+    assert sum(results.values()) == 1000
+    results = play_games(SmartAgent(MockEnv(), "Smart"), RandomAgent(None, "Random"), 20)
+    assert sum(results.values()) == 20
+    assert results["Smart"] > results["Random"]
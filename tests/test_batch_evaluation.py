@@ -0,0 +1,54 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batch_evaluation import (evaluate_batch, evaluate_batch_parallel, to_bitboards,
+                              fast_evaluate_tables, minimax_tables)
+from numba_agent import fast_evaluate
+from minimax_agent import Agent
+from bitboard import Position
+
+
+def random_boards(n, seed=0):
+    """n plateaux obtenus par des coups aléatoires (les alignements de 4 sont permis)"""
+    rng = np.random.default_rng(seed)
+    boards = np.zeros((n, 6, 7, 2), dtype=np.int8)
+    for i in range(n):
+        pos = Position()
+        for _ in range(rng.integers(0, 40)):
+            pos.play(rng.choice(pos.valid_moves()))
+        for row in range(6):
+            for col in range(7):
+                bit = 1 << (col * 7 + 5 - row)
+                boards[i, row, col, 0] = pos.boards[0] & bit != 0
+                boards[i, row, col, 1] = pos.boards[1] & bit != 0
+    return boards
+
+
+def test_to_bitboards():
+    """Teste la conversion vectorisée des tenseurs en bitboards"""
+    boards = random_boards(20)
+    bitboards = to_bitboards(boards)
+    for board, (board0, board1) in zip(boards, bitboards):
+        assert Position.from_observation(board).boards == [board0, board1]
+
+
+def test_batch_matches_fast_evaluate():
+    """Teste que les deux versions par lot donnent les scores de fast_evaluate, pour chaque joueur"""
+    boards = random_boards(200)
+    tables = fast_evaluate_tables()
+    for player in range(2):
+        expected = [fast_evaluate(board, player) for board in boards]
+        assert evaluate_batch(boards, *tables, player=player).tolist() == expected
+        assert evaluate_batch_parallel(boards, *tables, player=player).tolist() == expected
+        assert evaluate_batch_parallel(to_bitboards(boards), *tables, player=player).tolist() == expected
+
+
+def test_batch_matches_minimax_evaluate():
+    """Teste que les deux versions par lot donnent les scores de Agent._evaluate"""
+    boards = random_boards(200, seed=1)
+    agent = Agent(env=None)
+    tables = minimax_tables(agent)
+    expected = [agent._evaluate(Position.from_observation(board)) for board in boards]
+    assert evaluate_batch(boards, *tables).tolist() == expected
+    assert evaluate_batch_parallel(to_bitboards(boards), *tables).tolist() == expected
@@ -0,0 +1,31 @@
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmark import solved_since, run_benchmark, compare, POSITION_SETS
+from numba_agent import SOLVE_WIN, SOLVE_DRAW
+
+
+def test_solved_since():
+    """Teste l'indice à partir duquel le coup reste dans la solution"""
+    assert solved_since([3, 2, 2, 4, 2], [2]) == 4
+    assert solved_since([2, 2], [2]) == 0
+    assert solved_since([2, 3], [2]) is None
+
+
+def test_run_benchmark_and_compare():
+    """Teste un passage du moteur compilé : solutions des fins de partie retrouvées et rapport JSON comparable"""
+    report = run_benchmark(engines=["numba"], sets=["endgames"], max_depth=4, time_limit=1.0)
+    results = report["results"]["numba"]
+    assert sorted(results) == sorted(f"endgames/{spec['name']}" for spec in POSITION_SETS["endgames"])
+    for spec in POSITION_SETS["endgames"]:
+        record = results[f"endgames/{spec['name']}"]
+        assert record["depth"] >= 1 and record["nodes"] > 0
+        solve = record["solve"]
+        assert solve["correct"]
+        assert solve["value"] == (SOLVE_WIN if spec["value"] == "win" else SOLVE_DRAW)
+
+    report = json.loads(json.dumps(report))
+    lines = compare(report, report)
+    assert len(lines) == len(POSITION_SETS["endgames"])
+    assert all("nps x1.00" in line for line in lines)
@@ -0,0 +1,201 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitboard import (Position, IncrementalEvaluator, has_four, cell_bit, mirror, mirror_move, winning_cells, canonical,
+                      canonical_key, position_key, WINDOWS, BOARD_MASK, COLUMN_MASKS, H1)
+
+
+def test_from_observation():
+    """Teste la conversion du tenseur (6, 7, 2) en bitboards et hauteurs"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 3, 0] = 1
+    board[4, 3, 1] = 1
+    board[5, 0, 1] = 1
+    pos = Position.from_observation({"observation": board, "action_mask": np.ones(7)})
+    assert pos.boards[0] == cell_bit(5, 3)
+    assert pos.boards[1] == cell_bit(4, 3) | cell_bit(5, 0)
+    assert pos.heights == [1, 0, 0, 2, 0, 0, 0]
+    assert pos.moves == 3
+    assert pos.next_row(3) == 3
+
+
+def test_play_undo():
+    """Teste que jouer puis annuler un coup restaure la position"""
+    pos = Position()
+    pos.play(3)
+    pos.play(3)
+    assert pos.boards == [cell_bit(5, 3), cell_bit(4, 3)]
+    assert pos.turn == 0
+    pos.undo(3)
+    assert pos.boards == [cell_bit(5, 3), 0]
+    assert pos.heights[3] == 1
+    assert pos.turn == 1
+
+
+def test_full_column():
+    """Teste qu'une colonne pleine n'est plus jouable"""
+    pos = Position()
+    for _ in range(6):
+        pos.play(0)
+    assert not pos.can_play(0)
+    assert pos.valid_moves() == [1, 2, 3, 4, 5, 6]
+    assert pos.next_row(0) is None
+    assert not pos.is_winning_move(0)
+
+
+def test_has_four_all_directions():
+    """Teste la détection des 4 alignements possibles"""
+    lines = [
+        [(5, 0), (5, 1), (5, 2), (5, 3)],
+        [(5, 6), (4, 6), (3, 6), (2, 6)],
+        [(5, 0), (4, 1), (3, 2), (2, 3)],
+        [(2, 3), (3, 4), (4, 5), (5, 6)],
+    ]
+    for line in lines:
+        bb = 0
+        for row, col in line[:3]:
+            bb |= cell_bit(row, col)
+        assert not has_four(bb)
+        assert has_four(bb | cell_bit(*line[3]))
+
+
+def test_no_wrap_around():
+    """Teste qu'un alignement ne passe pas d'une colonne à l'autre"""
+    bb = cell_bit(0, 0) | cell_bit(5, 1) | cell_bit(4, 1) | cell_bit(3, 1)
+    assert not has_four(bb)
+
+
+def test_is_winning_move():
+    """Teste la détection d'un coup gagnant pour chaque canal"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 0, 1] = 1
+    board[5, 1, 1] = 1
+    board[5, 3, 1] = 1
+    pos = Position.from_observation(board)
+    assert pos.is_winning_move(2, 1)
+    assert not pos.is_winning_move(2, 0)
+
+
+def test_mirror():
+    """Teste le symétrique gauche-droite d'un bitboard"""
+    bb = cell_bit(5, 0) | cell_bit(4, 2) | cell_bit(0, 3)
+    assert mirror(bb) == cell_bit(5, 6) | cell_bit(4, 4) | cell_bit(0, 3)
+    assert mirror(mirror(bb)) == bb
+    assert mirror(BOARD_MASK) == BOARD_MASK
+
+
+def test_windows():
+    """Teste le nombre de fenêtres de 4 cases et qu'elles restent sur le plateau"""
+    assert len(WINDOWS) == 69
+    assert all(window & ~BOARD_MASK == 0 for window in WINDOWS)
+
+
+def full_score(window_scores, cell_scores, boards):
+    """Score recalculé entièrement, pour comparer à l'évaluation incrémentale"""
+    score = 0
+    for window in WINDOWS:
+        score += window_scores[bin(boards[0] & window).count("1")][bin(boards[1] & window).count("1")]
+    for channel in range(2):
+        for index in range(7 * H1):
+            if boards[channel] >> index & 1:
+                score += cell_scores[channel][index]
+    return score
+
+
+def test_incremental_evaluator():
+    """Teste que l'évaluation incrémentale reste égale au calcul complet, y compris après annulation"""
+    window_scores = [[(n0 - n1) * (n0 + n1 + 1) for n1 in range(5)] for n0 in range(5)]
+    cell_scores = ([index % 5 for index in range(7 * H1)], [-(index % 3) for index in range(7 * H1)])
+    pos = Position()
+    evaluator = IncrementalEvaluator(window_scores, cell_scores)
+    for col in [3, 3, 2, 4, 4, 1, 5, 0, 2, 6]:
+        evaluator.add(col * H1 + pos.heights[col], pos.turn)
+        pos.play(col)
+        assert evaluator.score == full_score(window_scores, cell_scores, pos.boards)
+    assert IncrementalEvaluator(window_scores, cell_scores, pos.boards).score == evaluator.score
+    for col in [2, 6, 0]:
+        pos.undo(col)
+        evaluator.remove(col * H1 + pos.heights[col], pos.turn)
+        assert evaluator.score == full_score(window_scores, cell_scores, pos.boards)
+
+
+def random_position(rng, moves):
+    """Position après des coups aléatoires qui ne gagnent pas"""
+    pos = Position()
+    for _ in range(moves):
+        cols = [col for col in range(7) if pos.can_play(col) and not pos.is_winning_move(col)]
+        if not cols:
+            break
+        pos.play(cols[rng.integers(len(cols))])
+    return pos
+
+
+def test_threat_maps():
+    """Teste les cartes des menaces contre un essai case par case, et les détections qui en découlent"""
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        pos = random_position(rng, int(rng.integers(0, 40)))
+        for channel in range(2):
+            cells = [1 << index for index in range(7 * H1) if (BOARD_MASK & ~pos.mask) >> index & 1]
+            assert pos.threats(channel) == sum(bit for bit in cells if has_four(pos.boards[channel] | bit))
+            assert winning_cells(pos.boards[channel], pos.mask) == pos.threats(channel)
+            for col in range(7):
+                assert bool(pos.winning_moves(channel) & COLUMN_MASKS[col]) == pos.is_winning_move(col, channel)
+                if not pos.can_play(col):
+                    assert not pos.unsafe_moves(channel) & COLUMN_MASKS[col]
+                    assert not pos.creates_double_threat(col, channel)
+                    continue
+                pos.play(col, channel)
+                gives_win = pos.is_winning_move(col, 1 - channel)
+                double = sum(pos.is_winning_move(c, channel) for c in range(7)) >= 2
+                pos.undo(col)
+                assert bool(pos.unsafe_moves(channel) & COLUMN_MASKS[col]) == gives_win
+                # Un coup déjà gagnant est joué avant de chercher une double menace
+                if not pos.is_winning_move(col, channel):
+                    assert pos.creates_double_threat(col, channel) == double
+
+
+def test_from_moves_and_observation():
+    """Teste que le joueur au trait après la suite de coups est sur le canal 0, et l'aller-retour par l'observation"""
+    pos = Position.from_moves("334")
+    assert pos.turn == 0 and pos.moves == 3
+    # Le joueur au trait (le second) a un seul pion, en 3 au-dessus du premier
+    assert bin(pos.boards[0]).count("1") == 1 and bin(pos.boards[1]).count("1") == 2
+    assert pos.heights[3] == 2 and pos.heights[4] == 1
+
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        pos = random_position(rng, int(rng.integers(0, 30)))
+        observation = pos.to_observation()
+        back = Position.from_observation(observation)
+        assert back.boards == [pos.boards[pos.turn], pos.boards[1 - pos.turn]] and back.heights == pos.heights
+        assert observation.sum() == pos.moves
+
+
+def test_mirror_canonical():
+    """Teste la forme canonique : même clé pour une position et son symétrique, coups retournés"""
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        pos = random_position(rng, int(rng.integers(0, 30)))
+        flipped = Position()
+        flipped.boards = [mirror(pos.boards[0]), mirror(pos.boards[1])]
+        key, board0, board1, mirrored = canonical(*pos.boards)
+        assert key == canonical_key(*pos.boards) == canonical_key(*flipped.boards) == position_key(board0, board1)
+        assert (board0, board1) == (tuple(flipped.boards) if mirrored else tuple(pos.boards))
+        assert mirror(mirror(pos.boards[0])) == pos.boards[0]
+        for col in range(7):
+            assert bool(flipped.boards[0] & COLUMN_MASKS[mirror_move(col)]) == bool(pos.boards[0] & COLUMN_MASKS[col])
+
+
+def test_distinct_moves():
+    """Teste qu'une position symétrique ne garde qu'un coup de chaque paire symétrique"""
+    pos = Position()
+    assert pos.is_symmetric()
+    assert pos.distinct_moves([3, 2, 4, 1, 5, 0, 6]) == [3, 2, 1, 0]
+    assert pos.distinct_moves([3, 4, 6]) == [3, 4, 6]
+    for col in (2, 3, 4, 3):
+        pos.play(col)
+    assert pos.is_symmetric() and pos.distinct_moves([2, 4, 5]) == [2, 5]
+    pos.play(1)
+    assert not pos.is_symmetric() and pos.distinct_moves([2, 4, 5]) == [2, 4, 5]
@@ -0,0 +1,89 @@
+import numpy as np
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minimax_agent import Agent
+from numba_agent import solve_root, new_transposition_table, zobrist_key, MOVE_ORDER, SOLVE_WIN, SOLVE_LOSS
+from bitboard import Position
+
+
+def exhaustive_value(pos):
+    """Valeur exacte (1, 0, -1) pour le joueur au trait, par recherche complète sans élagage"""
+    moves = pos.valid_moves()
+    if not moves:
+        return 0
+    if any(pos.is_winning_move(col) for col in moves):
+        return 1
+    best = -1
+    for col in moves:
+        pos.play(col)
+        best = max(best, -exhaustive_value(pos))
+        pos.undo(col)
+    return best
+
+
+def endgame_positions(count, seed=0):
+    """Positions de fin de partie aléatoires (8 à 12 cases vides, canal 0 au trait, pas de gain immédiat)"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        pos = Position()
+        for _ in range(rng.randint(30, 34)):
+            moves = [col for col in pos.valid_moves() if not pos.is_winning_move(col)]
+            if not moves:
+                break
+            pos.play(rng.choice(moves))
+        else:
+            boards = pos.boards if pos.turn == 0 else pos.boards[::-1]
+            pos = Position.from_boards(*boards)
+            if pos.valid_moves() and not any(pos.is_winning_move(col) for col in pos.valid_moves()):
+                positions.append(pos)
+    return positions
+
+
+def check_solution(pos, value, move):
+    """Vérifie la valeur prouvée et, si elle n'est pas perdante, que le coup la tient"""
+    assert value == exhaustive_value(pos)
+    if value != SOLVE_LOSS:
+        pos.play(move)
+        assert -exhaustive_value(pos) == value
+        pos.undo(move)
+
+
+def test_numba_solver():
+    """Teste que le solveur compilé prouve la même valeur que la recherche complète"""
+    table = new_transposition_table(16)
+    counters = np.zeros(4, dtype=np.int64)
+    for pos in endgame_positions(15):
+        candidates = np.array([col for col in MOVE_ORDER if pos.can_play(col)], dtype=np.int64)
+        value, move = solve_root(pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8),
+                                 zobrist_key(pos), candidates, 10**9, table, counters)
+        check_solution(pos, value, int(move))
+
+
+def test_python_solver():
+    """Teste que le solveur de l'agent Python prouve la même valeur que la recherche complète"""
+    agent = Agent(env=None)
+    for pos in endgame_positions(15, seed=1):
+        value, move = agent._solve_root(pos, pos.valid_moves(), time.monotonic() + 60)
+        check_solution(pos, value, move)
+
+
+def test_solver_stops_search():
+    """Teste qu'une victoire prouvée est jouée tout de suite, sans approfondissement"""
+    pos = next(p for p in endgame_positions(50, seed=2)
+               if Agent(env=None)._solve_root(p.copy(), p.valid_moves(), time.monotonic() + 60)[0] == SOLVE_WIN)
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    for row in range(6):
+        for col in range(7):
+            bit = 1 << (col * 7 + 5 - row)
+            board[row, col, 0] = pos.boards[0] & bit != 0
+            board[row, col, 1] = pos.boards[1] & bit != 0
+    agent = Agent(env=None)
+    start_time = time.time()
+    move = agent.choose_action(board)
+    assert time.time() - start_time < 0.5
+    pos.play(move, 0)
+    assert pos.has_won(0) or -exhaustive_value(pos) == SOLVE_WIN
@@ -0,0 +1,188 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcts_agent import (MCTSAgent, MCTSTree, tree_expand, tree_backpropagate, random_playouts, compact_subtree,
+                        best_root_move, ROOT, NOT_TERMINAL, TERMINAL_WIN, WINS_0, WINS_1, DRAWS)
+from bitboard import Position, cell_bit
+
+
+def test_expand_and_backpropagate():
+    """Teste le développement d'un enfant et la remontée des statistiques dans l'arbre en tableaux"""
+    tree = MCTSTree(16)
+    tree.reset(Position())
+    child = tree_expand(tree.nodes, tree.children, tree.size, ROOT)
+    assert child == 1 and tree.size[0] == 2
+    move = int(tree.nodes[child]["move"])
+    assert tree.children[ROOT, move] == child
+    assert tree.nodes[child]["board0"] == cell_bit(5, move)
+    assert tree.nodes[child]["player"] == 1
+    # Plateau vide symétrique : seules les colonnes 0 à 3 sont développées
+    assert tree.nodes[ROOT]["untried"] == 0x0F & ~(1 << move)
+
+    tree_backpropagate(tree.nodes, child, np.array([1, 0, 0]))
+    tree_backpropagate(tree.nodes, child, np.array([2, 3, 1]))
+    assert tree.nodes[child]["visits"] == 7
+    # Le canal 0 a joué move : ses victoires et la moitié des nuls comptent
+    assert tree.nodes[child]["wins"] == 3.5
+    assert tree.nodes[ROOT]["visits"] == 7
+
+
+def test_symmetric_expansion():
+    """Teste qu'une position symétrique ne développe qu'un coup par paire symétrique"""
+    pos = Position()
+    for col in [2, 3, 4, 3]:
+        pos.play(col)
+    tree = MCTSTree(64)
+    tree.reset(pos)
+    while tree_expand(tree.nodes, tree.children, tree.size, ROOT) != ROOT:
+        pass
+    assert [col for col in range(7) if tree.children[ROOT, col] >= 0] == [0, 1, 2, 3]
+    # Après 2 (position non symétrique), les sept colonnes restent à développer
+    child = tree.children[ROOT, 2]
+    assert tree.nodes[child]["untried"] == 0x7F
+
+
+def test_best_root_move_most_visited():
+    """Teste que le coup joué est le plus visité (les victoires départagent), pas le meilleur taux"""
+    tree = MCTSTree(16)
+    tree.reset(Position())
+    while tree_expand(tree.nodes, tree.children, tree.size, ROOT) != ROOT:
+        pass
+    for move, (visits, wins) in enumerate([(10, 9.0), (40, 20.0), (40, 22.0), (30, 25.0)]):
+        child = tree.children[ROOT, move]
+        tree.nodes[child]["visits"] = visits
+        tree.nodes[child]["wins"] = wins
+    assert best_root_move(tree.nodes, tree.children, ROOT) == 2
+
+
+def test_terminal_node():
+    """Teste qu'un coup gagnant crée un noeud terminal sans coup à développer"""
+    pos = Position()
+    for col in [0, 1, 0, 1, 0, 1]:
+        pos.play(col)
+    tree = MCTSTree(64)
+    tree.reset(pos)
+    assert tree.nodes[ROOT]["terminal"] == NOT_TERMINAL
+    while tree.children[ROOT, 0] < 0:
+        tree_expand(tree.nodes, tree.children, tree.size, ROOT)
+    child = tree.children[ROOT, 0]
+    assert tree.nodes[child]["terminal"] == TERMINAL_WIN
+    assert tree.nodes[child]["untried"] == 0
+
+
+def test_random_playouts():
+    """Teste que les parties aléatoires compilées se terminent toutes et sont comptées"""
+    results = np.zeros(3, dtype=np.int64)
+    random_playouts(0, 0, 0, 200, results)
+    assert results.sum() == 200
+    assert results[WINS_0] > 0 and results[WINS_1] > 0
+
+    # Il ne reste qu'une case : la partie est nulle
+    pos = Position()
+    for col in [0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 2, 3, 2, 3, 2, 3, 3, 2, 3, 2, 3, 2,
+                4, 5, 4, 5, 4, 5, 5, 4, 5, 4, 5, 4, 6, 6, 6, 6, 6]:
+        pos.play(col)
+    assert not pos.has_won(0) and not pos.has_won(1)
+    results[:] = 0
+    random_playouts(pos.boards[0], pos.boards[1], pos.turn, 10, results)
+    assert results[DRAWS] == 10
+
+
+def test_full_tree():
+    """Teste qu'un arbre plein n'ajoute plus de noeud"""
+    tree = MCTSTree(2)
+    tree.reset(Position())
+    assert tree_expand(tree.nodes, tree.children, tree.size, ROOT) == 1
+    assert tree_expand(tree.nodes, tree.children, tree.size, ROOT) == ROOT
+
+
+def test_reuse_subtree():
+    """Teste que la position après notre coup et la réponse adverse devient la racine avec ses statistiques"""
+    tree = MCTSTree(64)
+    tree.reset(Position())
+    nodes, children, size = tree.nodes, tree.children, tree.size
+    for _ in range(7):
+        tree_expand(nodes, children, size, ROOT)
+    for _ in range(7):
+        tree_expand(nodes, children, size, children[ROOT, 3])
+    grandchild = children[children[ROOT, 3], 2]
+    for _ in range(3):
+        tree_expand(nodes, children, size, grandchild)
+    tree_backpropagate(nodes, grandchild, np.array([2, 1, 1]))
+
+    pos = Position()
+    pos.play(3)
+    pos.play(2)
+    assert tree.reuse(pos, 64)
+    assert size[0] == 4
+    assert nodes[ROOT]["board0"] == pos.boards[0] and nodes[ROOT]["board1"] == pos.boards[1]
+    assert nodes[ROOT]["parent"] == -1 and nodes[ROOT]["visits"] == 4
+    kept = [child for child in children[ROOT] if child >= 0]
+    assert sorted(kept) == [1, 2, 3]
+    assert all(nodes[child]["parent"] == ROOT for child in kept)
+
+    # Position absente de l'arbre : pas de réutilisation
+    pos.play(0)
+    assert not tree.reuse(pos, 64)
+
+
+def test_reuse_limit():
+    """Teste qu'un sous-arbre trop grand est tronqué et que les enfants abandonnés redeviennent à essayer"""
+    tree = MCTSTree(16)
+    tree.reset(Position())
+    for _ in range(7):
+        tree_expand(tree.nodes, tree.children, tree.size, ROOT)
+    compact_subtree(tree.nodes, tree.children, tree.size, ROOT, 3, tree.new_index, tree.order)
+    assert tree.size[0] == 3
+    kept = [move for move in range(7) if tree.children[ROOT, move] >= 0]
+    assert len(kept) == 2
+    # Plateau vide symétrique : les colonnes à essayer sont prises parmi 0 à 3
+    assert tree.nodes[ROOT]["untried"] == 0x0F & ~sum(1 << move for move in kept)
+
+
+def test_block_threat():
+    """Teste que l'agent bloque une menace verticale"""
+    agent = MCTSAgent(env=None, time_limit=0.3)
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 0, 1] = board[4, 0, 1] = board[3, 0, 1] = 1
+    board[5, 3, 0] = board[5, 4, 0] = 1
+    assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) == 0
+
+
+def test_parallel_modes():
+    """Teste que les deux modes parallèles bloquent la menace et que l'arbre partagé reste cohérent"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 0, 1] = board[4, 0, 1] = board[3, 0, 1] = 1
+    board[5, 3, 0] = board[5, 4, 0] = 1
+    for parallel in ["root", "tree"]:
+        agent = MCTSAgent(env=None, time_limit=0.3, workers=2, parallel=parallel)
+        try:
+            assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) == 0
+        finally:
+            agent.close()
+    # Les pertes virtuelles ont été retirées : la racine compte les visites de ses enfants
+    # (à quelques mises à jour concurrentes perdues près)
+    nodes, children = agent.tree.nodes, agent.tree.children
+    total = sum(int(nodes[child]["visits"]) for child in children[ROOT] if child >= 0)
+    assert abs(int(nodes[ROOT]["visits"]) - total) <= total // 100
+
+
+def test_seed_per_search():
+    """Teste qu'un agent à graine rejoue les mêmes recherches même si un autre agent cherche entre deux coups"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    mask = np.ones(7, dtype=np.int8)
+
+    def scores(agent, other=None):
+        results = []
+        for _ in range(2):
+            agent.choose_action(board, action_mask=mask)
+            results.append((agent.stats.last["move"], agent.stats.last["score"]))
+            if other is not None:
+                other.choose_action(board, action_mask=mask)
+        return results
+
+    expected = scores(MCTSAgent(env=None, time_limit=100, simulation_budget=500, seed=3, stats=True))
+    agent = MCTSAgent(env=None, time_limit=100, simulation_budget=500, seed=3, stats=True)
+    other = MCTSAgent(env=None, time_limit=100, simulation_budget=500, seed=9)
+    assert scores(agent, other) == expected
@@ -0,0 +1,42 @@
+import numpy as np
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minimax_agent import Agent
+from bitboard import Position, IncrementalEvaluator
+
+
+def test_parallel_root_matches_sequential():
+    """Teste que la racine partagée entre processus donne le même coup et la même valeur que la boucle séquentielle"""
+    agent = Agent(env=None, workers=2)
+    try:
+        pos = Position()
+        for col in [3, 2, 3, 4, 1, 5]:
+            pos.play(col)
+        candidates = pos.valid_moves()
+        agent._evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+        best_val, best_move = float('-inf'), None
+        for action in candidates:
+            val = agent._search_move(pos, action, 5, float('-inf'))
+            if val > best_val:
+                best_val, best_move = val, action
+        assert agent._search_depth_parallel(pos, candidates, 5) == (best_val, best_move)
+    finally:
+        agent.close()
+
+
+def test_parallel_choose_action():
+    """Teste que l'agent parallèle respecte le temps imparti et bloque une menace"""
+    agent = Agent(env=None, workers=2)
+    agent.time_limit = 0.5
+    try:
+        board = np.zeros((6, 7, 2), dtype=np.int8)
+        board[5, 3, 0] = board[5, 2, 1] = 1
+        start_time = time.time()
+        assert agent.choose_action(board) in range(7)
+        assert time.time() - start_time < agent.time_limit + 0.2
+        board[5, 0, 1] = board[4, 0, 1] = board[3, 0, 1] = 1
+        assert agent.choose_action(board) == 0
+    finally:
+        agent.close()
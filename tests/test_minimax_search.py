@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitboard import Position, IncrementalEvaluator
+from minimax_agent import Agent, PLAYABLE, TOP_MASK
+
+POSITIONS = ["", "33", "2421340362", "0333025233", "322333232432"]
+
+
+def reference_minimax(agent, pos, depth, maximizing):
+    """Minimax sans élagage sur des copies de la position, évaluée en entier à chaque feuille"""
+    if not maximizing and pos.has_won(0): return 1000000 + depth
+    if maximizing and pos.has_won(1): return -1000000 - depth
+    moves = pos.valid_moves()
+    if depth == 0 or not moves:
+        return agent._evaluate(pos)
+    values = []
+    for col in moves:
+        child = pos.copy()
+        child.play(col, 0 if maximizing else 1)
+        values.append(reference_minimax(agent, child, depth - 1, not maximizing))
+    return max(values) if maximizing else min(values)
+
+
+def test_minimax_in_place_matches_copies():
+    """Teste que la recherche jouée sur place donne les valeurs d'un minimax sur copies et restaure la position"""
+    agent = Agent(env=None)
+    for moves in POSITIONS:
+        pos = Position.from_moves(moves)
+        agent._evaluator = evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+        agent._poller.start()
+        state = (list(pos.boards), list(pos.heights), pos.turn, pos.moves, evaluator.score,
+                 [list(counts) for counts in evaluator.counts])
+        for maximizing in (True, False):
+            assert agent._minimax(pos, 4, float('-inf'), float('inf'), maximizing) == \
+                reference_minimax(agent, pos, 4, maximizing)
+        assert state == (pos.boards, pos.heights, pos.turn, pos.moves, evaluator.score,
+                         [list(counts) for counts in evaluator.counts])
+
+
+def test_playable_moves():
+    """Teste la table des coups jouables selon les colonnes pleines"""
+    pos = Position.from_moves("3333332222220")
+    assert PLAYABLE[pos.mask & TOP_MASK] == (4, 1, 5, 0, 6)
+    assert PLAYABLE[0] == (3, 2, 4, 1, 5, 0, 6) and PLAYABLE[TOP_MASK] == ()
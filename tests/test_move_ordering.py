@@ -0,0 +1,62 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitboard import Position, IncrementalEvaluator
+from minimax_agent import Agent
+from numba_agent import (search_root, line_counts, zobrist_key, new_transposition_table, new_move_ordering,
+                         age_move_ordering, HISTORY)
+
+MIDGAME = "2421340362"
+
+
+def test_minimax_ordering_keeps_values():
+    """Teste que killers et historique changent l'ordre des coups mais pas les valeurs du minimax"""
+    agent = Agent(env=None)
+    pos = Position.from_moves(MIDGAME)
+    candidates = pos.valid_moves()
+    agent._evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+    agent._poller.start()
+
+    values = [agent._search_move(pos, col, 5, float('-inf')) for col in candidates]
+    assert any(killer >= 0 for killers in agent._killers for killer in killers)
+    assert any(agent._history[0]) and any(agent._history[1])
+
+    # Tables remplies par la première recherche : mêmes valeurs
+    assert [agent._search_move(pos, col, 5, float('-inf')) for col in candidates] == values
+
+    history = [list(h) for h in agent._history]
+    agent._age_move_ordering()
+    assert agent._history == [[value >> 2 for value in h] for h in history]
+
+
+def test_minimax_order_moves():
+    """Teste l'ordre : killers d'abord, puis le centre, l'historique départageant deux colonnes symétriques"""
+    agent = Agent(env=None)
+    pos = Position()
+    assert agent._order_moves(pos, [3, 2, 4, 1, 5, 0, 6], 0) == [3, 2, 4, 1, 5, 0, 6]
+
+    agent._history[0][4 * 7] = 10
+    agent._killers[0] = [0, 5]
+    assert agent._order_moves(pos, [3, 2, 4, 1, 5, 0, 6], 0) == [0, 5, 3, 4, 2, 1, 6]
+    # Les tables d'un canal ne servent pas à l'autre
+    assert agent._order_moves(pos, [3, 2, 4, 1, 5, 0, 6], 1)[2:] == [3, 2, 4, 1, 6]
+
+
+def test_numba_ordering_tables():
+    """Teste que le noyau remplit killers et historique, gardés d'une itération à l'autre puis vieillis"""
+    pos = Position.from_moves(MIDGAME)
+    ordering = new_move_ordering()
+    table = new_transposition_table(16)
+    counters = np.zeros(4, dtype=np.int64)
+    candidates = np.array(pos.valid_moves(), dtype=np.int64)
+    for depth in range(1, 9):
+        score, move, nodes = search_root(pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8),
+                                         line_counts(pos.boards[0], pos.boards[1]), zobrist_key(pos), depth,
+                                         candidates, 10**9, table, 1, ordering, counters, None)
+    assert (ordering[:HISTORY] >= 0).any() and ordering[HISTORY:].sum() > 0
+
+    history = ordering[HISTORY:].copy()
+    age_move_ordering(ordering)
+    assert (ordering[:HISTORY] == -1).all()
+    assert (ordering[HISTORY:] == history >> 2).all()
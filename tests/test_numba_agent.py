@@ -0,0 +1,198 @@
+import numpy as np
+import subprocess
+import sys
+import os
+import textwrap
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from numba_agent import (Agent, new_transposition_table, new_move_ordering, tt_probe, tt_store, zobrist_key,
+                         search_root, line_counts, add_piece, remove_piece, bb_evaluate, mirror_zobrist_key, arm_stop,
+                         TT_EXACT, TT_LOWER, TT_UPPER, ZOBRIST, WIN_SCORE, ABORTED, STOP, NO_NODE_BUDGET)
+from bitboard import Position, H1
+
+
+class MockEnv:
+    def __init__(self):
+        self.agents = ["player_0", "player_1"]
+    def action_space(self, agent):
+        return None
+
+
+def test_zobrist_incremental():
+    """Teste que la mise à jour incrémentale du hachage correspond au calcul complet"""
+    pos = Position()
+    key = zobrist_key(pos)
+    for col in [3, 3, 2, 4, 0]:
+        key ^= int(ZOBRIST[pos.turn, col * H1 + pos.heights[col]])
+        pos.play(col)
+    assert key == zobrist_key(pos)
+
+
+def test_tt_bounds():
+    """Teste qu'une borne n'est utilisée que si elle coupe la fenêtre demandée"""
+    table = new_transposition_table(4)
+    tt_store(table, 42, 5, TT_LOWER, 100, 3, 1)
+    assert tt_probe(table, 42, 5, 0, 50) == (True, 100, 3)
+    assert tt_probe(table, 42, 5, 0, 200) == (False, 0, 3)
+    # Entrée trop peu profonde : seul le coup est utilisable
+    assert tt_probe(table, 42, 6, 0, 50) == (False, 0, 3)
+    tt_store(table, 7, 5, TT_UPPER, -10, 1, 1)
+    assert tt_probe(table, 7, 2, 0, 50) == (True, -10, 1)
+    assert tt_probe(table, 99, 1, 0, 50) == (False, 0, -1)
+
+
+def test_tt_replacement():
+    """Teste la politique de remplacement (profondeur d'abord, âge)"""
+    table = new_transposition_table(4)
+    tt_store(table, 1, 8, TT_EXACT, 5, 3, 1)
+    # Même case, moins profond, même recherche : on garde l'ancienne entrée
+    tt_store(table, 17, 2, TT_EXACT, 9, 4, 1)
+    assert tt_probe(table, 1, 8, 0, 0) == (True, 5, 3)
+    # Recherche suivante : l'entrée périmée est remplacée
+    tt_store(table, 17, 2, TT_EXACT, 9, 4, 2)
+    assert tt_probe(table, 17, 2, 0, 0) == (True, 9, 4)
+    assert tt_probe(table, 1, 8, 0, 0)[2] == -1
+
+
+def test_incremental_evaluation():
+    """Teste que l'évaluation incrémentale suit bb_evaluate coup par coup, et que l'annulation la restaure"""
+    pos = Position()
+    counts = line_counts(0, 0)
+    score = bb_evaluate(0, 0)
+    played = []
+    for col in [3, 3, 2, 4, 4, 1, 5, 0, 2]:
+        index = col * H1 + pos.heights[col]
+        score += add_piece(counts, index, pos.turn)
+        played.append((index, pos.turn))
+        pos.play(col)
+        assert score == bb_evaluate(pos.boards[0], pos.boards[1])
+        assert (counts == line_counts(pos.boards[0], pos.boards[1])).all()
+    for index, channel in reversed(played):
+        remove_piece(counts, index, channel)
+    assert (counts == line_counts(0, 0)).all()
+
+
+def search(pos, depth, node_budget=10**9):
+    """Lance une itération du noyau compilé sur pos"""
+    counters = np.zeros(4, dtype=np.int64)
+    candidates = np.array(pos.valid_moves(), dtype=np.int64)
+    result = search_root(pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8),
+                         line_counts(pos.boards[0], pos.boards[1]), zobrist_key(pos),
+                         depth, candidates, node_budget, new_transposition_table(12), 1, new_move_ordering(),
+                         counters)
+    return result, counters
+
+
+def test_search_root_finds_forced_win():
+    """Teste que la recherche compilée voit une victoire en 2 coups (double menace)"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 2, 0] = board[5, 3, 0] = 1
+    board[4, 2, 1] = board[4, 3, 1] = 1
+    pos = Position.from_observation(board)
+    (score, move, nodes), counters = search(pos, 3)
+    assert move in (1, 4)
+    assert score >= WIN_SCORE
+    assert nodes > 0 and counters[ABORTED] == 0
+
+
+def test_search_root_node_budget():
+    """Teste que la recherche s'interrompt quand le budget de noeuds est épuisé"""
+    (score, move, nodes), counters = search(Position(), 8, node_budget=500)
+    assert counters[ABORTED] == 1
+    assert nodes == 500
+
+
+def test_mirrored_transpositions():
+    """Teste qu'une position et son symétrique partagent les entrées de la table de transposition"""
+    pos, flipped = Position(), Position()
+    for col in [2, 4, 2, 1, 3, 4, 0, 3, 6, 2]:
+        pos.play(col)
+        flipped.play(6 - col)
+    assert mirror_zobrist_key(*pos.boards) == zobrist_key(flipped)
+    table = new_transposition_table(16)
+
+    def run(position):
+        counters = np.zeros(4, dtype=np.int64)
+        return search_root(position.boards[0], position.boards[1], np.array(position.heights, dtype=np.int8),
+                           line_counts(*position.boards), zobrist_key(position), 8,
+                           np.array(position.valid_moves(), dtype=np.int64), 10**9, table, 1, new_move_ordering(),
+                           counters)
+
+    score, _, nodes = run(pos)
+    mirror_score, _, mirror_nodes = run(flipped)
+    assert mirror_score == score
+    assert mirror_nodes * 3 < nodes
+
+
+def test_block_and_win():
+    """Teste que l'agent gagne puis bloque en priorité"""
+    agent = Agent(env=MockEnv())
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 0, 1] = board[4, 0, 1] = board[3, 0, 1] = 1
+    assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) == 0
+    board[5, 6, 0] = board[4, 6, 0] = board[3, 6, 0] = 1
+    assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) == 6
+
+
+def test_lazy_smp():
+    """Teste que la recherche avec threads auxiliaires joue un coup légal et trouve la victoire"""
+    agent = Agent(env=MockEnv(), workers=3, warm_up="blocking")
+    agent.time_limit = 0.5
+    try:
+        board = np.zeros((6, 7, 2), dtype=np.int8)
+        board[5, 2, 0] = board[5, 3, 0] = 1
+        board[4, 2, 1] = board[4, 3, 1] = 1
+        assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) in (1, 4)
+    finally:
+        agent.close()
+
+
+def test_clock_stop():
+    """Teste que le minuteur arrête une recherche sans budget de noeuds, et que l'agent tient son temps"""
+    pos = Position()
+    counters = np.zeros(4, dtype=np.int64)
+    start = time.monotonic()
+    arm_stop(start + 0.2, counters)
+    search_root(pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8), line_counts(0, 0),
+                zobrist_key(pos), 42, np.array(pos.valid_moves(), dtype=np.int64), NO_NODE_BUDGET,
+                new_transposition_table(16), 1, new_move_ordering(), counters)
+    assert counters[ABORTED] == 1 and time.monotonic() - start < 0.25
+
+    agent = Agent(env=None, warm_up="blocking", workers=2)
+    agent.time_limit = 0.3
+    try:
+        for _ in range(2):
+            start = time.monotonic()
+            agent.choose_action(np.zeros((6, 7, 2), dtype=np.int8), action_mask=np.ones(7, dtype=np.int8))
+            assert time.monotonic() - start < 0.35
+            assert agent.counters[STOP] == 0
+    finally:
+        agent.close()
+
+
+def test_background_warm_up():
+    """Teste que l'agent se construit sans attendre la compilation et joue le minimax Python en attendant"""
+    # Processus neuf : dans celui des tests, les noyaux sont déjà compilés
+    script = textwrap.dedent("""
+        import time
+        import numpy as np
+        import numba_agent
+        start = time.monotonic()
+        agent = numba_agent.Agent(env=None)
+        built = time.monotonic() - start
+        agent.time_limit = 0.3
+        board = np.zeros((6, 7, 2), dtype=np.int8)
+        board[5, 3, 0] = board[5, 2, 1] = 1
+        move = agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8))
+        fallback = agent._fallback is not None
+        numba_agent.start_warm_up(background=False)
+        agent._fallback = None
+        agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8))
+        print(built, move, fallback, agent._fallback is None)
+    """)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, timeout=600)
+    assert result.returncode == 0, result.stderr
+    built, move, fallback, compiled = result.stdout.split()
+    assert float(built) < 1.0 and int(move) in range(7)
+    assert fallback == compiled == "True"
@@ -0,0 +1,48 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opening_book import OpeningBook, build_book, write_book
+from minimax_agent import Agent
+from bitboard import Position, mirror, canonical, position_key
+
+
+def test_canonical_folds_mirror():
+    """Teste qu'une position et son symétrique ont la même forme canonique"""
+    pos = Position()
+    for col in [0, 3, 1]:
+        pos.play(col)
+    key, _, _, _ = canonical(pos.boards[0], pos.boards[1])
+    mirror_key, _, _, _ = canonical(mirror(pos.boards[0]), mirror(pos.boards[1]))
+    assert key == mirror_key
+    assert key == min(position_key(pos.boards[0], pos.boards[1]),
+                      position_key(mirror(pos.boards[0]), mirror(pos.boards[1])))
+
+
+def test_book_roundtrip(tmp_path):
+    """Teste l'écriture, la projection en mémoire et la recherche dichotomique, coup miroir compris"""
+    path = str(tmp_path / "book.bin")
+    entries = build_book(2, 4)
+    write_book(path, entries)
+    book = OpeningBook(path)
+    # 1 position vide, 4 après un coup, 25 après deux (symétriques regroupées)
+    assert len(book) == 30
+
+    left, right = Position(), Position()
+    left.play(0, 1)
+    right.play(6, 1)
+    move, score = book.lookup(left.boards[0], left.boards[1])
+    assert book.lookup(right.boards[0], right.boards[1]) == (6 - move, score)
+
+    # Hors bibliothèque
+    for col in [3, 3, 3]:
+        left.play(col)
+    assert book.probe(left) is None
+
+
+def test_agent_uses_book(tmp_path):
+    """Teste qu'un coup de la bibliothèque est joué sans recherche"""
+    path = str(tmp_path / "book.bin")
+    write_book(path, {position_key(0, 0): (5, 0)})
+    agent = Agent(env=None, book=path)
+    assert agent.choose_action(np.zeros((6, 7, 2), dtype=np.int8)) == 5
@@ -0,0 +1,83 @@
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitboard import Position, IncrementalEvaluator, CENTER_ORDER
+from minimax_agent import Agent
+import numba_agent
+from numba_agent import search_root, search_window, line_counts, zobrist_key, new_transposition_table, new_move_ordering
+
+POSITIONS = ["", "33", "2421340362", "0333025233", "563165653642126331"]
+
+
+def root_of(pos):
+    """Arguments de la racine des noyaux : bitboards, hauteurs, compteurs de fenêtres, clé"""
+    return (pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8),
+            line_counts(pos.boards[0], pos.boards[1]), zobrist_key(pos))
+
+
+def test_minimax_pvs_root_matches_full_windows():
+    """Teste que la racine en PVS rend la valeur du meilleur coup cherché en fenêtre pleine"""
+    agent = Agent(env=None)
+    for moves in POSITIONS[1:4]:
+        pos = Position.from_moves(moves)
+        candidates = [col for col in CENTER_ORDER if pos.can_play(col)]
+        agent._evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+        agent._poller.start()
+        values = {}
+        for col in candidates:
+            agent._play(pos, col, 0)
+            values[col] = agent._minimax(pos, 4, float('-inf'), float('inf'), False)
+            agent._undo(pos, col)
+        best_val, best_move = agent._search_depth(pos, candidates, 5)
+        assert best_val == max(values.values()) == values[best_move]
+
+
+def test_search_window_bounds():
+    """Teste les bornes rendues par une fenêtre qui ne contient pas le score (échec bas, échec haut)"""
+    pos = Position.from_moves("2421340362")
+    candidates = np.array([col for col in CENTER_ORDER if pos.can_play(col)], dtype=np.int64)
+    counters = np.zeros(4, dtype=np.int64)
+
+    def search(alpha, beta):
+        return search_window(*root_of(pos), 7, alpha, beta, candidates, 10**9, new_transposition_table(16), 1,
+                             new_move_ordering(), counters, None)
+
+    score, move, _ = search(-numba_agent.SCORE_INF, numba_agent.SCORE_INF)
+    assert (score, move) == search_root(*root_of(pos), 7, candidates, 10**9, new_transposition_table(16), 1,
+                                        new_move_ordering(), counters)[:2]
+    assert search(score + 1, score + 100)[0] <= score + 1
+    high, high_move, _ = search(score - 100, score - 1)
+    assert high >= score - 1 and high_move == move
+    assert search(score - 1, score + 1)[:2] == (score, move)
+
+
+def test_drivers_agree():
+    """Teste que fenêtre pleine, aspiration et MTD(f) trouvent le même coup et le même score"""
+    agents = {driver: numba_agent.Agent(env=None, driver=driver) for driver in numba_agent.SEARCH_DRIVERS}
+    for moves in POSITIONS:
+        pos = Position.from_moves(moves)
+        results = set()
+        for agent in agents.values():
+            agent.tt = new_transposition_table(16)
+            agent.ordering = new_move_ordering()
+            candidates = [col for col in CENTER_ORDER if pos.can_play(col)]
+            guess = None
+            for depth in range(1, 9):
+                score, move, nodes = agent._search_iteration(root_of(pos), depth,
+                                                             np.array(candidates, dtype=np.int64), guess, 10**9)
+                assert not agent.counters[numba_agent.ABORTED]
+                guess = int(score)
+                candidates.remove(move)
+                candidates.insert(0, int(move))
+            results.add((guess, int(move)))
+        assert len(results) == 1
+
+
+def test_unknown_driver():
+    """Teste le refus d'un pilote inconnu"""
+    try:
+        numba_agent.Agent(env=None, driver="negascout")
+        assert False, "ValueError attendue"
+    except ValueError:
+        pass
@@ -0,0 +1,99 @@
+import json
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitboard import Position
+from numba_agent import (Agent as NumbaAgent, search_root, line_counts, zobrist_key, new_transposition_table,
+                         new_move_ordering, STAT_CUTOFFS, STAT_TT_HITS, STAT_EVALS)
+from minimax_agent import Agent as MinimaxAgent
+from search_stats import SearchStats
+from mcts_agent import MCTSAgent
+
+MIDGAME = "2421340362"
+MIDGAME_OBSERVATION = Position.from_moves(MIDGAME).to_observation()
+
+
+def test_kernel_stats_do_not_change_search():
+    """Teste que les compteurs du noyau ne changent ni le résultat ni le nombre de noeuds"""
+    pos = Position.from_moves(MIDGAME)
+    results = []
+    for stats in (None, np.zeros(3, dtype=np.int64)):
+        counters = np.zeros(4, dtype=np.int64)
+        results.append(search_root(pos.boards[0], pos.boards[1], np.array(pos.heights, dtype=np.int8),
+                                   line_counts(pos.boards[0], pos.boards[1]), zobrist_key(pos), 6,
+                                   np.array(pos.valid_moves(), dtype=np.int64), 10**9, new_transposition_table(16),
+                                   1, new_move_ordering(), counters, stats))
+    assert results[0] == results[1]
+    assert stats[STAT_CUTOFFS] > 0 and stats[STAT_TT_HITS] > 0 and stats[STAT_EVALS] > 0
+
+
+def test_numba_stats_record_and_sink(tmp_path):
+    """Teste le relevé d'un coup cherché par le moteur compilé et son écriture en JSONL"""
+    path = tmp_path / "stats.jsonl"
+    agent = NumbaAgent(env=None, stats_path=str(path), warm_up="blocking")
+    agent.time_limit = 0.3
+    move = agent.choose_action(MIDGAME_OBSERVATION, action_mask=np.ones(7, dtype=np.int8))
+
+    record = agent.stats.last
+    assert record["move"] == move and record["source"] == "search"
+    assert record["depth"] >= 1 and record["nodes"] > 0 and record["evals"] > 0
+    assert record["pv"][0] == move
+    assert set(record["phases"]) == {"tactic", "search"}
+    assert abs(sum(record["phases"].values()) - record["time"]) < 1e-3
+    assert json.loads(path.read_text().splitlines()[-1]) == record
+
+
+def test_shared_record_format():
+    """Teste le relevé commun aux moteurs : attach, compteurs de recherche et fin de coup"""
+    class Engine:
+        pass
+
+    engine = Engine()
+    assert SearchStats.attach(engine, "test") is None and engine.stats is None
+    assert SearchStats.end_move(engine, 3, "search") == 3
+
+    stats = SearchStats.attach(engine, "test", stats=True)
+    stats.start()
+    stats.record_counters([5, 0, 7], pv=[3])
+    assert SearchStats.end_move(engine, 3, "search") == 3
+    record = engine.stats.last
+    assert (record["engine"], record["move"], record["source"]) == ("test", 3, "search")
+    assert (record["cutoffs"], record["tt_hits"], record["evals"], record["pv"]) == (5, 0, 7, [3])
+
+
+def test_stats_disabled_by_default():
+    """Teste que sans statistiques l'agent ne garde aucun relevé"""
+    agent = MinimaxAgent(env=None)
+    assert agent.stats is None
+    assert agent._search_stats is None
+    assert "_solve" not in vars(agent) and "_record_cutoff" not in vars(agent)
+
+
+def test_minimax_and_mcts_stats():
+    """Teste les relevés du minimax Python (coup tactique puis recherche) et du MCTS"""
+    agent = MinimaxAgent(env=None, stats=True)
+    agent.time_limit = 0.3
+    # Victoire immédiate en colonne 0
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 0, 0] = board[4, 0, 0] = board[3, 0, 0] = 1
+    board[5, 3, 1] = board[5, 4, 1] = 1
+    assert agent.choose_action(board, action_mask=np.ones(7, dtype=np.int8)) == 0
+    assert agent.stats.last["source"] == "tactic"
+
+    agent.choose_action(MIDGAME_OBSERVATION, action_mask=np.ones(7, dtype=np.int8))
+    record = agent.stats.last
+    assert record["source"] == "search" and record["depth"] >= 1 and record["nodes"] > 0
+    assert record["cutoffs"] > 0 and record["evals"] > 0 and record["tt_hits"] == 0
+    assert record["pv"] == [record["move"]]
+
+    agent = MinimaxAgent(env=None, stats=True, node_budget=20000)
+    agent.choose_action(MIDGAME_OBSERVATION, action_mask=np.ones(7, dtype=np.int8))
+    assert agent.stats.last["nodes"] == agent._poller.counted() > 1000
+
+    agent = MCTSAgent(env=None, time_limit=0.2, stats=True)
+    move = agent.choose_action(MIDGAME_OBSERVATION, action_mask=np.ones(7, dtype=np.int8))
+    record = agent.stats.last
+    assert record["simulations"] > 0 and record["tree_size"] > 1
+    assert record["move"] == move and 0 <= record["score"] <= 1
+    assert len(record["pv"]) >= 1
@@ -5,6 +5,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from smart_agent import SmartAgent
 from random_agent import RandomAgent
+from bitboard import Position
 from loguru import logger
 
 class TestEnv:
@@ -81,6 +82,46 @@ def test_smart_beats_random():
     assert wins >= 40
 
 
+def reference_action(pos, valid_actions):
+    """Priorités de l'agent par coups d'essai : victoire, parade, double menace, centre"""
+    for channel in (0, 1):
+        for col in valid_actions:
+            if pos.is_winning_move(col, channel):
+                return col
+    for col in valid_actions:
+        pos.play(col, 0)
+        threats = sum(pos.is_winning_move(c, 0) for c in range(7))
+        pos.undo(col)
+        if threats >= 2:
+            return col
+    return next(col for col in [3, 2, 4, 1, 5, 0, 6] if col in valid_actions)
+
+
+def test_fast_mode_decisions_and_sampled_logs():
+    """Teste que le mode rapide garde les priorités et ne journalise qu'une décision sur FAST_LOG_EVERY"""
+    messages = []
+    sink = logger.add(messages.append, level="DEBUG")
+    try:
+        agents = [SmartAgent(TestEnv(), "Normal"), SmartAgent(TestEnv(), "Fast", fast=True)]
+        rng = np.random.default_rng(0)
+        for _ in range(300):
+            pos = Position()
+            for _ in range(rng.integers(0, 30)):
+                cols = [col for col in range(7) if pos.can_play(col) and not pos.is_winning_move(col)]
+                if not cols:
+                    break
+                pos.play(cols[rng.integers(len(cols))])
+            board = pos.to_observation()
+            pos = Position.from_observation(board)
+            mask = np.array([int(pos.can_play(col)) for col in range(7)], dtype=np.int8)
+            expected = reference_action(pos, [col for col in range(7) if mask[col]])
+            assert [agent.choose_action(board, action_mask=mask) for agent in agents] == [expected] * 2
+    finally:
+        logger.remove(sink)
+    fast = sum("Fast:" in message for message in messages)
+    assert sum("Normal:" in message for message in messages) > 3 * fast and fast <= 3
+
+
 def stat_games(num_games=100):
     """Statistiques avec maintenant l'agent
     intelligent pour num_games parties"""
@@ -0,0 +1,133 @@
+import numpy as np
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from time_manager import IterationTimer, SearchPoller, DEFAULT_BRANCHING, MAX_BRANCHING
+from minimax_agent import Agent
+from numba_agent import Agent as NumbaAgent
+from mcts_agent import MCTSAgent
+from bitboard import Position, IncrementalEvaluator
+
+
+def test_branching_factor_prediction():
+    """Teste la prévision du coût de l'itération suivante à partir du facteur de branchement effectif"""
+    timer = IterationTimer(1.0)
+    assert timer.predicted_next() == 0.0 and timer.next_iteration_fits()
+
+    timer.record(0.01)
+    assert timer.branching_factor() == DEFAULT_BRANCHING
+    timer.record(0.03)
+    assert abs(timer.branching_factor() - 3) < 1e-9
+    # Sur deux itérations : lisse l'alternance pair / impair
+    timer.record(0.04)
+    assert abs(timer.branching_factor() - 2) < 1e-9
+    assert abs(timer.predicted_next() - 0.08) < 1e-9
+
+    # En noeuds quand le moteur les compte ; le facteur est borné
+    timer = IterationTimer(1.0)
+    timer.record(0.1, nodes=10)
+    timer.record(0.5, nodes=1000)
+    assert timer.branching_factor() == MAX_BRANCHING
+    assert not timer.next_iteration_fits()
+
+
+def test_partial_iteration_is_kept():
+    """Teste qu'une itération interrompue après son premier coup rend le meilleur des coups déjà cherchés"""
+    agent = Agent(env=None)
+    pos = Position()
+    for col in [3, 2, 3, 4, 1, 5]:
+        pos.play(col)
+    candidates = [3, 2, 4]
+    agent._evaluator = IncrementalEvaluator(agent._window_scores, agent._cell_scores, pos.boards)
+    values = {3: 10, 2: 50}
+    calls = []
+
+    def fake_minimax(pos, depth, alpha, beta, maximizing):
+        # Le temps s'écoule pendant le troisième coup de la racine
+        calls.append(1)
+        if len(calls) == 3:
+            raise TimeoutError()
+        return values[candidates[len(calls) - 1]]
+
+    agent._minimax = fake_minimax
+    try:
+        agent._search_depth(pos.copy(), candidates, 4)
+        assert False, "TimeoutError attendue"
+    except TimeoutError as timeout:
+        assert timeout.args == (50, 2)
+
+    # Interrompue pendant le premier coup : rien n'est gardé
+    calls.clear()
+    calls.extend([1, 1])
+    try:
+        agent._search_depth(pos.copy(), candidates, 4)
+        assert False, "TimeoutError attendue"
+    except TimeoutError as timeout:
+        assert timeout.args == ()
+
+
+def test_choose_action_respects_time():
+    """Teste que la gestion du temps arrête l'approfondissement avant la limite"""
+    agent = Agent(env=None)
+    agent.time_limit = 0.3
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 3, 0] = board[5, 2, 1] = 1
+    start_time = time.monotonic()
+    assert agent.choose_action(board) in range(7)
+    assert time.monotonic() - start_time < agent.time_limit + 0.05
+
+
+def test_poller_stops_exactly_on_node_limit():
+    """Teste que le décompte par lots s'arrête exactement au budget de noeuds, sans lire l'horloge"""
+    poller = SearchPoller()
+    for limit in (0, 1, 100, 70000):
+        poller.start(node_limit=limit)
+        done = 0
+        while True:
+            poller.countdown -= 1
+            if poller.countdown <= 0 and poller.poll():
+                break
+            done += 1
+        assert done == limit == poller.counted()
+        assert poller.exhausted() and poller.poll()
+
+    # Chronométré : le lot s'adapte à la vitesse et l'arrêt suit l'échéance
+    poller.start(time.monotonic() + 0.05)
+    while True:
+        poller.countdown -= 1
+        if poller.countdown <= 0 and poller.poll():
+            break
+    assert poller.exhausted() and poller.batch > 16
+
+
+def test_node_budget_is_deterministic():
+    """Teste qu'à budget de noeuds ou de parties fixé, deux agents identiques jouent les mêmes coups"""
+    board = np.zeros((6, 7, 2), dtype=np.int8)
+    board[5, 3, 0] = board[5, 2, 1] = board[4, 3, 1] = board[5, 4, 0] = 1
+    mask = np.ones(7, dtype=np.int8)
+
+    records = []
+    for _ in range(2):
+        agent = Agent(env=None, stats=True, node_budget=3000)
+        # Un budget de noeuds ne dépend pas du temps accordé
+        agent.time_limit = 100
+        agent.choose_action(board, action_mask=mask)
+        records.append(agent.stats.last)
+    assert records[0]["move"] == records[1]["move"] and records[0]["nodes"] == records[1]["nodes"]
+    assert records[0]["depth"] == records[1]["depth"] >= 2
+
+    records = []
+    for _ in range(2):
+        agent = NumbaAgent(env=None, stats=True, node_budget=20000)
+        agent.choose_action(board, action_mask=mask)
+        records.append(agent.stats.last)
+    assert records[0]["move"] == records[1]["move"] and records[0]["nodes"] == records[1]["nodes"] <= 20000
+
+    records = []
+    for _ in range(2):
+        agent = MCTSAgent(env=None, time_limit=100, simulation_budget=2000, seed=7, stats=True)
+        agent.choose_action(board, action_mask=mask)
+        records.append(agent.stats.last)
+    assert records[0]["simulations"] == records[1]["simulations"] == 2000
+    assert records[0]["move"] == records[1]["move"] and records[0]["score"] == records[1]["score"]
@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tournament_engine import run_match, build_agents
+from smart_agent import SmartAgent
+from random_agent import RandomAgent
+
+
+def test_run_match_in_process_and_pool():
+    """Teste qu'un match réparti entre processus compte toutes les parties, comme en série"""
+    specs = [(SmartAgent, {"player_name": "player_0"}), (RandomAgent, {"player_name": "player_1"})]
+    for workers in (1, 2):
+        updates = []
+        stats = run_match(specs, 6, workers=workers, on_result=lambda s: updates.append(1))
+        assert len(updates) == 6
+        assert stats["player_0"]["wins"] + stats["player_1"]["wins"] + stats["Draw"] == 6
+        assert stats["player_0"]["wins"] >= 3
+        # Au moins 3 coups par partie pour chaque agent, avec leur temps mesuré
+        assert stats["player_0"]["moves"] >= 18
+        assert stats["player_0"]["total_time"] > 0
+
+
+class WarmUpAgent:
+    def __init__(self, env, player_name=None, warm_up="background"):
+        self.player_name = player_name
+        self.warm_up = warm_up
+
+
+def test_build_agents_waits_for_warm_up():
+    """Teste que les agents à compilation en arrière-plan sont construits en mode bloquant"""
+    agents = build_agents([(WarmUpAgent, {"player_name": "a"}), (RandomAgent, {"player_name": "b"}),
+                           (WarmUpAgent, {"player_name": "c", "warm_up": "background"})], None)
+    assert agents[0].warm_up == "blocking" and agents[2].warm_up == "background"
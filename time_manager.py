@@ -0,0 +1,149 @@
+"""
+Gestion du temps de l'approfondissement itératif.
+
+Le coût d'une itération est prévu à partir des précédentes : le facteur de
+branchement effectif (rapport du travail de deux itérations successives) est
+mesuré sur les dernières itérations, en noeuds si le moteur les compte, sinon
+en durées. Le rapport est pris sur deux itérations (racine carrée de
+travail[d] / travail[d - 2]) pour lisser l'alternance pair / impair de
+l'alpha-bêta. Une nouvelle profondeur n'est commencée que si son coût prévu
+tient dans le temps restant.
+
+SearchPoller arrête une recherche sans lire l'horloge à chaque noeud, ou
+exactement après un budget de noeuds pour une recherche reproductible.
+
+Toutes les mesures utilisent l'horloge monotone time.monotonic.
+"""
+
+import time
+
+# Facteur de branchement supposé tant qu'une seule itération est terminée
+DEFAULT_BRANCHING = 4.0
+# Bornes du facteur mesuré (7 coups au plus par position)
+MIN_BRANCHING, MAX_BRANCHING = 1.0, 7.0
+
+
+class IterationTimer:
+    """Budget de temps d'un coup et historique des itérations terminées."""
+
+    def __init__(self, time_limit, start=None):
+        self.start = time.monotonic() if start is None else start
+        self.deadline = self.start + time_limit
+        self.durations = []
+        self.work = []
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def record(self, duration, nodes=None):
+        """Enregistre une itération terminée (nodes : noeuds visités, si le moteur les compte)."""
+        self.durations.append(duration)
+        self.work.append(nodes if nodes is not None else duration)
+
+    def branching_factor(self):
+        """Facteur de branchement effectif mesuré sur les dernières itérations."""
+        work = self.work
+        if len(work) >= 3 and work[-3] > 0:
+            factor = (work[-1] / work[-3]) ** 0.5
+        elif len(work) >= 2 and work[-2] > 0:
+            factor = work[-1] / work[-2]
+        else:
+            factor = DEFAULT_BRANCHING
+        return min(max(factor, MIN_BRANCHING), MAX_BRANCHING)
+
+    def predicted_next(self):
+        """Durée prévue de la prochaine itération (0 avant la première)."""
+        if not self.durations:
+            return 0.0
+        return self.durations[-1] * self.branching_factor()
+
+    def next_iteration_fits(self):
+        """La prochaine itération a-t-elle le temps de se terminer ?"""
+        return self.predicted_next() <= self.remaining()
+
+
+# Lecture de l'horloge toutes les POLL_INTERVAL secondes de recherche environ
+POLL_INTERVAL = 0.001
+INITIAL_POLL_BATCH = 256
+MIN_POLL_BATCH, MAX_POLL_BATCH = 16, 1 << 16
+
+
+class SearchPoller:
+    """
+    Arrêt de la recherche sans lire l'horloge à chaque noeud.
+
+    L'appelant décrémente countdown à chaque unité de travail (noeud, itération
+    MCTS) avant de la faire, et appelle poll() quand il tombe à 0 :
+        poller.countdown -= 1
+        if poller.countdown <= 0 and poller.poll(): arrêter
+    poll() lit l'horloge et ajuste la taille des lots à la vitesse mesurée pour
+    une lecture toutes les POLL_INTERVAL secondes. Avec une limite de noeuds,
+    l'horloge n'est jamais lue et l'arrêt tombe exactement après node_limit
+    unités : la recherche est reproductible.
+    """
+
+    def __init__(self):
+        self.batch = INITIAL_POLL_BATCH
+        # Taille de lot adaptée à la vitesse, gardée d'une recherche chronométrée à l'autre
+        self._time_batch = INITIAL_POLL_BATCH
+        self.countdown = self.batch
+        self.nodes = 0
+        self.deadline = float("inf")
+        self.node_limit = None
+        self.stopped = False
+        self._last = time.monotonic()
+
+    def start(self, deadline=float("inf"), node_limit=None):
+        """Commence une recherche limitée par deadline (horloge monotone) ou par node_limit unités."""
+        self.nodes = 0
+        self.deadline = deadline
+        self.node_limit = node_limit
+        self.stopped = False
+        if node_limit is not None:
+            self.batch = min(MAX_POLL_BATCH, node_limit + 1)
+        else:
+            self.batch = self._time_batch
+        self.countdown = self.batch
+        self._last = time.monotonic()
+
+    def counted(self):
+        """Unités de travail faites depuis start (exact, même entre deux lectures)."""
+        return self.nodes + self.batch - self.countdown
+
+    def exhausted(self):
+        """Le temps ou le budget est-il épuisé ? (lecture directe, hors décompte)"""
+        if self.stopped:
+            return True
+        if self.node_limit is not None:
+            return self.counted() >= self.node_limit
+        return time.monotonic() >= self.deadline
+
+    def poll(self):
+        """Fin d'un lot : True si l'unité en cours dépasse le temps ou le budget (elle n'est pas faite)."""
+        if self.stopped:
+            return True
+        self.nodes += self.batch
+        if self.node_limit is not None:
+            if self.nodes > self.node_limit:
+                return self._stop()
+            self.batch = min(MAX_POLL_BATCH, self.node_limit - self.nodes + 1)
+        else:
+            now = time.monotonic()
+            if now >= self.deadline:
+                return self._stop()
+            elapsed = now - self._last
+            self._last = now
+            if elapsed > 0:
+                self.batch = min(max(int(self.batch * POLL_INTERVAL / elapsed), MIN_POLL_BATCH), MAX_POLL_BATCH)
+                self._time_batch = self.batch
+        self.countdown = self.batch
+        return False
+
+    def _stop(self):
+        self.stopped = True
+        self.nodes -= 1
+        self.countdown = self.batch
+        return True
@@ -0,0 +1,137 @@
+"""
+Moteur de tournoi : les parties d'un match sont réparties entre des processus.
+
+Chaque processus construit une seule fois son environnement PettingZoo et ses
+deux agents (compilation Numba comprise), puis joue les parties qu'on lui
+envoie. Les couleurs alternent d'une partie à l'autre : le premier agent joue
+player_0 dans les parties paires. Les résultats remontent au fil de l'eau et
+sont cumulés comme dans les scripts de tournoi :
+    {nom: {"wins": ..., "total_time": ..., "moves": ...}, ..., "Draw": ...}
+
+Un agent est décrit par sa classe et ses arguments, (classe, {"player_name": ...}),
+pour pouvoir être reconstruit dans chaque processus.
+"""
+
+import os
+import time
+import inspect
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from loguru import logger
+
+# Environnement et agents propres à chaque processus
+_worker_env = None
+_worker_agents = None
+
+
+def build_agents(specs, env):
+    """
+    Construit les agents décrits par specs [(classe, arguments), ...] sur env.
+    Un agent qui compile en arrière-plan (argument warm_up) attend ici la fin de
+    la compilation : ses premiers coups ne sont pas joués par son repli Python.
+    """
+    agents = []
+    for cls, kwargs in specs:
+        if "warm_up" in inspect.signature(cls).parameters:
+            kwargs = {"warm_up": "blocking", **kwargs}
+        agents.append(cls(env, **kwargs))
+    return agents
+
+
+def _init_worker(specs):
+    global _worker_env, _worker_agents
+    from pettingzoo.classic import connect_four_v3
+    _worker_env = connect_four_v3.env(render_mode=None)
+    _worker_env.reset()
+    _worker_agents = build_agents(specs, _worker_env)
+
+
+def play_game(env, agents, game_index):
+    """
+    Joue une partie ; agents[0] commence si game_index est pair.
+    Retourne (nom du gagnant ou None, {nom: [temps total, nombre de coups]}).
+    """
+    env.reset()
+    if game_index % 2 == 0:
+        players = {"player_0": agents[0], "player_1": agents[1]}
+    else:
+        players = {"player_0": agents[1], "player_1": agents[0]}
+    timing = {agent.player_name: [0.0, 0] for agent in agents}
+
+    game_winner = None
+    for agent_id in env.agent_iter():
+        obs, reward, term, trunc, _ = env.last()
+
+        if term or trunc:
+            if reward == 1:
+                game_winner = players[agent_id].player_name
+            env.step(None)
+        else:
+            current_agent = players[agent_id]
+            mask = obs["action_mask"]
+
+            start = time.time()
+            try:
+                action = current_agent.choose_action(obs, action_mask=mask)
+            except Exception as e:
+                logger.error(f"Crash {current_agent.player_name}: {e}")
+                env.step(None)
+                continue
+
+            timing[current_agent.player_name][0] += time.time() - start
+            timing[current_agent.player_name][1] += 1
+            env.step(action)
+
+    return game_winner, timing
+
+
+def _play_worker_game(game_index):
+    return play_game(_worker_env, _worker_agents, game_index)
+
+
+def new_stats(names):
+    return {**{name: {"wins": 0, "total_time": 0, "moves": 0} for name in names}, "Draw": 0}
+
+
+def add_result(stats, game_winner, timing):
+    """Cumule le résultat d'une partie dans stats."""
+    if game_winner:
+        stats[game_winner]["wins"] += 1
+    else:
+        stats["Draw"] += 1
+    for name, (total_time, moves) in timing.items():
+        stats[name]["total_time"] += total_time
+        stats[name]["moves"] += moves
+
+
+def run_match(specs, num_games, workers=None, on_result=None):
+    """
+    Fait jouer num_games parties entre les deux agents décrits par specs.
+    workers : nombre de processus (tous les coeurs par défaut ; 1 = dans ce processus).
+    on_result(stats) est appelé après chaque partie terminée.
+    Retourne les statistiques cumulées.
+    """
+    names = [kwargs["player_name"] for _, kwargs in specs]
+    stats = new_stats(names)
+    workers = min(workers or os.cpu_count() or 1, num_games)
+
+    if workers <= 1:
+        from pettingzoo.classic import connect_four_v3
+        env = connect_four_v3.env(render_mode=None)
+        env.reset()
+        agents = build_agents(specs, env)
+        for i in range(num_games):
+            add_result(stats, *play_game(env, agents, i))
+            if on_result:
+                on_result(stats)
+        return stats
+
+    # spawn : un fork après du code Numba parallèle (couche TBB) bloque la sortie de l'interpréteur
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(specs,)) as pool:
+        futures = [pool.submit(_play_worker_game, i) for i in range(num_games)]
+        for future in as_completed(futures):
+            add_result(stats, *future.result())
+            if on_result:
+                on_result(stats)
+    return stats